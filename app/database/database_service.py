@@ -1,6 +1,9 @@
 import mysql.connector
 import os
-from app.utils.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from app.utils.config import DB_HOST, DB_USER, DB_PASSWORD, DB_PORT
+
+# Incremental schema changes for existing databases, applied in file name order
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
 
 
 class DatabaseService:
@@ -8,13 +11,11 @@ class DatabaseService:
     def get_connection(use_db=True):
         """Get MySQL connection, optionally without selecting a database"""
         if use_db:
-            return mysql.connector.connect(
-                host=DB_HOST, 
-                user=DB_USER, 
-                password=DB_PASSWORD, 
-                database=DB_NAME,
-                port=DB_PORT
-            )
+            # Borrowed from the shared pool; close() returns it. Autocommit stays on
+            # (flipping it would reset the session and drop its cached prepared
+            # statements): call conn.start_transaction() around multi-statement writes
+            from app.services.data_service import DataService
+            return DataService.pool().acquire()
         else:
             return mysql.connector.connect(
                 host=DB_HOST, 
@@ -24,13 +25,13 @@ class DatabaseService:
             )
     
     @staticmethod
-    def execute_sql_file(file_path):
+    def execute_sql_file(file_path, use_db=False):
         """Execute SQL commands from a file"""
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"SQL file not found: {file_path}")
         
-        # Connect without database first
-        conn = DatabaseService.get_connection(use_db=False)
+        # Schema files create the database themselves, so connect without one by default
+        conn = DatabaseService.get_connection(use_db=use_db)
         cursor = conn.cursor()
         
         try:
@@ -61,8 +62,63 @@ class DatabaseService:
         """Run database migrations"""
         sql_file = "db/schema.sql"
         DatabaseService.execute_sql_file(sql_file)
+        # The schema file already contains every migration
+        for name in DatabaseService.list_migrations():
+            DatabaseService._record_migration(name)
         print("Database migration completed!")
     
+    @staticmethod
+    def list_migrations():
+        """Migration file names, oldest first"""
+        return sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith(".sql"))
+    
+    @staticmethod
+    def _ensure_migrations_table(conn):
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                migration VARCHAR(255) PRIMARY KEY,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
+        cursor.close()
+    
+    @staticmethod
+    def _record_migration(name):
+        conn = DatabaseService.get_connection()
+        try:
+            DatabaseService._ensure_migrations_table(conn)
+            cursor = conn.cursor()
+            cursor.execute("INSERT IGNORE INTO schema_migrations (migration) VALUES (%s)", (name,))
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def upgrade():
+        """Apply pending migrations to an existing database without dropping data"""
+        conn = DatabaseService.get_connection()
+        try:
+            DatabaseService._ensure_migrations_table(conn)
+            cursor = conn.cursor()
+            cursor.execute("SELECT migration FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+            cursor.close()
+        finally:
+            conn.close()
+        
+        pending = [name for name in DatabaseService.list_migrations() if name not in applied]
+        if not pending:
+            print("Nothing to migrate.")
+            return
+        for name in pending:
+            print(f"Migrating: {name}")
+            DatabaseService.execute_sql_file(os.path.join(MIGRATIONS_DIR, name), use_db=True)
+            DatabaseService._record_migration(name)
+        print(f"Applied {len(pending)} migration(s).")
+    
     @staticmethod
     def seed():
         """Run database seeders"""
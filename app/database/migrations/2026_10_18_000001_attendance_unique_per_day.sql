@@ -0,0 +1,20 @@
+-- One attendance row per student per day
+--
+-- Adds a stored attendance_date column and a UNIQUE(student_id, attendance_date)
+-- key so "present today" can be recorded with a single INSERT IGNORE.
+-- timestamp becomes DATETIME: a generated column may not depend on the
+-- session time zone, which TIMESTAMP values do.
+
+-- Keep the first row of any student/day that was recorded more than once
+DELETE newer FROM attendance newer
+JOIN attendance older
+  ON older.student_id = newer.student_id
+ AND DATE(older.timestamp) = DATE(newer.timestamp)
+ AND older.id < newer.id;
+
+ALTER TABLE attendance
+    MODIFY timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP;
+
+ALTER TABLE attendance
+    ADD COLUMN attendance_date DATE AS (DATE(timestamp)) STORED AFTER timestamp,
+    ADD UNIQUE KEY uq_attendance_student_day (student_id, attendance_date);
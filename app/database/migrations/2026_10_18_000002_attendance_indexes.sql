@@ -0,0 +1,13 @@
+-- Secondary indexes for the attendance date-range queries
+--
+-- AttendanceService filters with half-open timestamp ranges
+-- (timestamp >= day start AND timestamp < next day start), which these serve:
+-- - idx_attendance_timestamp:         today's log, date-range reports
+-- - idx_attendance_student_timestamp: one student's records on a day or range
+-- - idx_attendance_status_timestamp:  per-status counts for a day
+-- Check the plans with: python tests/test_query_plans.py
+
+ALTER TABLE attendance
+    ADD INDEX idx_attendance_timestamp (timestamp),
+    ADD INDEX idx_attendance_student_timestamp (student_id, timestamp),
+    ADD INDEX idx_attendance_status_timestamp (status, timestamp);
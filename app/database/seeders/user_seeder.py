@@ -37,7 +37,8 @@ class UserSeeder:
                 }
             ]
             
-            # Insert users
+            # Insert users (all or none)
+            conn.start_transaction()
             for user in users:
                 # Hash password
                 password_hash = bcrypt.hashpw(
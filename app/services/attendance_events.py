@@ -0,0 +1,98 @@
+"""
+Attendance events - recognition results on their way to AttendanceService
+Shared by the offline video processor and the live camera pipelines
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, date
+from typing import Dict, Optional, Tuple
+import threading
+
+
+@dataclass
+class AttendanceEvent:
+    """A single "student was seen" event"""
+    student_pk: int
+    timestamp: datetime
+    status: str = "present"
+    source: str = ""
+    confidence: float = 0.0
+    student_info: Optional[Dict] = field(default=None, repr=False)
+
+    @property
+    def attendance_date(self) -> date:
+        return self.timestamp.date()
+
+
+class AttendanceDeduplicator:
+    """
+    Keeps only the first event per student per day.
+
+    Thread-safe so several cameras or workers can offer events concurrently.
+    Live pipelines run for weeks: offer() drops earlier days' keys once an
+    event for a newer day arrives, so memory stays at one day's students.
+    """
+
+    def __init__(self):
+        self._seen: Dict[Tuple[int, date], AttendanceEvent] = {}
+        self._latest_date: Optional[date] = None
+        self._lock = threading.Lock()
+
+    def offer(self, event: AttendanceEvent) -> bool:
+        """Return True if the event is the first for its student and day"""
+        key = (event.student_pk, event.attendance_date)
+        with self._lock:
+            if self._latest_date is None or event.attendance_date > self._latest_date:
+                if self._latest_date is not None:
+                    self._prune(event.attendance_date)
+                self._latest_date = event.attendance_date
+            if key in self._seen:
+                return False
+            self._seen[key] = event
+            return True
+
+    def prune(self, before: date) -> int:
+        """Drop kept events dated before `before`; returns how many were dropped"""
+        with self._lock:
+            return self._prune(before)
+
+    def _prune(self, before: date) -> int:
+        stale = [key for key in self._seen if key[1] < before]
+        for key in stale:
+            del self._seen[key]
+        return len(stale)
+
+    def offer_earliest(self, event: AttendanceEvent) -> bool:
+        """
+        Keep the earliest event per student and day, even if offered out of order.
+
+        Used by batch processing where clips finish in arbitrary order.
+        Returns True if the event replaced (or became) the kept event.
+        """
+        key = (event.student_pk, event.attendance_date)
+        with self._lock:
+            current = self._seen.get(key)
+            if current is not None and current.timestamp <= event.timestamp:
+                return False
+            self._seen[key] = event
+            return True
+
+    def events(self):
+        """All kept events ordered by timestamp"""
+        with self._lock:
+            return sorted(self._seen.values(), key=lambda e: e.timestamp)
+
+    def forget(self, student_pk: int, attendance_date: Optional[date] = None):
+        """Allow a student to be recorded again (e.g. after a manual removal)"""
+        attendance_date = attendance_date or date.today()
+        with self._lock:
+            self._seen.pop((student_pk, attendance_date), None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._seen)
+
+    def clear(self):
+        with self._lock:
+            self._seen.clear()
+            self._latest_date = None
@@ -0,0 +1,115 @@
+"""
+AttendanceJobs - set-based end-of-day attendance processing
+
+mark_day runs two statements in one transaction, whatever the number of students:
+- UPDATE ... JOIN students: "present" records after the section's late
+  cutoff become "late"
+- INSERT IGNORE ... SELECT from students anti-joined against the day's
+  attendance: everyone without a record gets an "absent" row
+
+Both filter attendance by a half-open timestamp range, so they use the
+idx_attendance_* indexes; the unique student/day key makes re-runs no-ops.
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+import mysql.connector
+
+from app.services.data_service import DataService
+from app.services.attendance_service import AttendanceService
+from app.utils.config import ATTENDANCE_LATE_AFTER, ATTENDANCE_LATE_AFTER_BY_SECTION, ATTENDANCE_ABSENT_AFTER
+
+
+def _at(day: date, hh_mm: str) -> datetime:
+    return datetime.combine(day, datetime.strptime(hh_mm, "%H:%M").time())
+
+
+class AttendanceJobs:
+    """Scheduled attendance jobs"""
+
+    @staticmethod
+    def _section_filter(sections: Optional[List[str]], column: str = "s.section"):
+        if not sections:
+            return "", ()
+        return f" AND {column} IN ({', '.join(['%s'] * len(sections))})", tuple(sections)
+
+    @staticmethod
+    def mark_day(target_date: date = None, sections: Optional[List[str]] = None,
+                 late_after: str = None, late_after_by_section: Dict[str, str] = None,
+                 absent_after: str = None) -> Dict:
+        """
+        Apply late cutoffs and mark absentees for one day.
+
+        sections limits the job to those sections (default: all students).
+        Cutoffs default to the ATTENDANCE_* settings in app/utils/config.py.
+        Returns {"late": n, "absent": n, "elapsed_ms": ms, "error": None|str}.
+        """
+        target_date = target_date or date.today()
+        late_after = late_after or ATTENDANCE_LATE_AFTER
+        by_section = ATTENDANCE_LATE_AFTER_BY_SECTION if late_after_by_section is None else late_after_by_section
+        absent_at = _at(target_date, absent_after or ATTENDANCE_ABSENT_AFTER)
+        day_start, day_end = AttendanceService.day_range(target_date)
+        section_sql, section_params = AttendanceJobs._section_filter(sections)
+
+        # Per-section late cutoff as a CASE over the section, default last
+        cutoff_sql = "%s"
+        cutoff_params: tuple = (_at(target_date, late_after),)
+        if by_section:
+            cutoff_sql = "CASE s.section " + " ".join(["WHEN %s THEN %s"] * len(by_section)) + " ELSE %s END"
+            cutoff_params = tuple(
+                value for section, hh_mm in by_section.items() for value in (section, _at(target_date, hh_mm))
+            ) + cutoff_params
+
+        late_query = f"""
+            UPDATE attendance a
+            JOIN students s ON s.id = a.student_id
+            SET a.status = 'late'
+            WHERE a.timestamp >= %s AND a.timestamp < %s
+              AND a.status = 'present'
+              AND a.timestamp > {cutoff_sql}{section_sql}
+        """
+        late_params = (day_start, day_end) + cutoff_params + section_params
+
+        absent_query = f"""
+            INSERT IGNORE INTO attendance (student_id, status, timestamp)
+            SELECT s.id, 'absent', %s
+            FROM students s
+            LEFT JOIN attendance a
+              ON a.student_id = s.id AND a.timestamp >= %s AND a.timestamp < %s
+            WHERE a.id IS NULL{section_sql}
+        """
+        absent_params = (absent_at, day_start, day_end) + section_params
+
+        result = {"date": str(target_date), "late": 0, "absent": 0, "elapsed_ms": 0.0, "error": None}
+        conn = DataService.get_connection()
+        if not conn:
+            result["error"] = "database unavailable"
+            return result
+
+        started = time.perf_counter()
+        cursor = conn.cursor()
+        try:
+            conn.start_transaction()
+            cursor.execute(late_query, late_params)
+            result["late"] = cursor.rowcount
+            cursor.execute(absent_query, absent_params)
+            result["absent"] = cursor.rowcount
+            conn.commit()
+        except mysql.connector.Error as e:
+            conn.rollback()
+            result["error"] = str(e)
+            print(f"❌ End-of-day attendance job failed: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    @staticmethod
+    def next_run_at(now: datetime = None, absent_after: str = None) -> datetime:
+        """When the daily job should next run: today's absent cutoff, or tomorrow's if it has passed"""
+        now = now or datetime.now()
+        run_at = _at(now.date(), absent_after or ATTENDANCE_ABSENT_AFTER)
+        return run_at if run_at > now else run_at + timedelta(days=1)
@@ -0,0 +1,134 @@
+"""
+Durable local journal of attendance events (SQLite)
+
+The write-behind recorder appends every batch here before it tries MySQL,
+in a transaction committed with synchronous=FULL, so an event survives a
+MySQL outage, a crash or a power cut. Events are replayed into MySQL in
+bulk and marked as replayed once MySQL has them.
+
+Each event carries an idempotency key, "<student_pk>:<YYYY-MM-DD>". It is
+unique in the journal, so the same student and day is journaled once, and
+it maps onto MySQL's UNIQUE(student_id, attendance_date). Replaying a
+batch twice (e.g. after a crash between the INSERT and marking it) therefore
+never creates duplicate rows.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from app.services.attendance_events import AttendanceEvent
+from app.utils.config import ATTENDANCE_JOURNAL_PATH
+
+
+def idempotency_key(event: AttendanceEvent) -> str:
+    return f"{event.student_pk}:{event.attendance_date.isoformat()}"
+
+
+class AttendanceJournal:
+    """Append-only event journal; safe to share between threads"""
+
+    def __init__(self, path: str = ATTENDANCE_JOURNAL_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS attendance_journal (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                idempotency_key TEXT NOT NULL UNIQUE,
+                student_pk INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                source TEXT,
+                replayed_at TEXT
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_journal_pending ON attendance_journal (replayed_at, id)"
+        )
+        self._conn.commit()
+
+    def append(self, events: List[AttendanceEvent]) -> List[int]:
+        """
+        Durably store events; returns their journal ids in order.
+
+        An event whose idempotency key is already journaled reuses that entry;
+        if the entry was already replayed it is queued for replay again (the
+        student's record may have been removed and re-earned since).
+        """
+        rows = [
+            (idempotency_key(e), e.student_pk, e.status, e.timestamp.isoformat(sep=" "), e.source)
+            for e in events
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO attendance_journal (idempotency_key, student_pk, status, timestamp, source) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (idempotency_key) DO UPDATE SET status = excluded.status, "
+                "timestamp = excluded.timestamp, source = excluded.source, replayed_at = NULL "
+                "WHERE replayed_at IS NOT NULL",
+                rows,
+            )
+            ids = {}
+            keys = [row[0] for row in rows]
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                cursor = self._conn.execute(
+                    f"SELECT idempotency_key, id FROM attendance_journal "
+                    f"WHERE idempotency_key IN ({', '.join(['?'] * len(chunk))})",
+                    chunk,
+                )
+                ids.update(cursor.fetchall())
+        return [ids[key] for key in keys]
+
+    def pending(self, limit: int = 500) -> List[Tuple[int, AttendanceEvent]]:
+        """Oldest events not yet replayed into MySQL, as (journal id, event)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, student_pk, status, timestamp, source FROM attendance_journal "
+                "WHERE replayed_at IS NULL ORDER BY id LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [
+            (row[0], AttendanceEvent(student_pk=row[1], status=row[2],
+                                     timestamp=datetime.fromisoformat(row[3]), source=row[4] or ""))
+            for row in rows
+        ]
+
+    def mark_replayed(self, ids: List[int]):
+        if not ids:
+            return
+        now = datetime.now().isoformat(sep=" ")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE attendance_journal SET replayed_at = ? WHERE id = ?",
+                [(now, journal_id) for journal_id in ids],
+            )
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM attendance_journal WHERE replayed_at IS NULL"
+            ).fetchone()[0]
+
+    def prune(self, keep_days: int = 7) -> int:
+        """Delete replayed entries older than keep_days; returns the number removed"""
+        cutoff = (datetime.now() - timedelta(days=keep_days)).isoformat(sep=" ")
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM attendance_journal WHERE replayed_at IS NOT NULL AND replayed_at < ?",
+                (cutoff,),
+            )
+        return cursor.rowcount
+
+    def get_stats(self) -> Dict:
+        return {"path": self.path, "pending": self.pending_count()}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,262 @@
+"""
+Write-behind attendance recorder
+
+Recognition threads submit AttendanceEvents and return immediately. A single
+background writer collects them for flush_interval_ms and writes each batch
+with one multi-row INSERT, so database latency never stalls a camera loop.
+Events are deduplicated per student per day in memory before they are queued.
+
+With a journal (attendance_journal.py) every batch is stored locally before
+MySQL is tried. If MySQL is down the events stay in the journal and the
+writer replays them in bulk every replay_interval_ms until MySQL takes them;
+DataService's circuit breaker keeps those retries from waiting on timeouts.
+
+Callbacks run on the writer thread; UI code must marshal them (e.g. with
+widget.after) before touching widgets.
+"""
+import queue
+import threading
+import time
+from datetime import date
+from typing import Callable, Dict, List, Optional
+
+from app.services.attendance_events import AttendanceEvent, AttendanceDeduplicator
+from app.services.attendance_journal import AttendanceJournal
+from app.utils.performance_config import PerformanceConfig
+
+BatchWriter = Callable[[List[AttendanceEvent]], Optional[List[AttendanceEvent]]]
+
+
+def _default_writer(events: List[AttendanceEvent]) -> Optional[List[AttendanceEvent]]:
+    from app.services.attendance_service import AttendanceService
+    return AttendanceService.create_attendance_batch(events)
+
+
+class AttendanceRecorder:
+    """
+    Queue of attendance events drained by one background writer thread.
+
+    writer takes a batch and returns the events it actually wrote (events
+    already recorded in the database are left out and reported through
+    on_already_recorded), or None on failure.
+    Without a journal, failed events are forgotten by the deduplicator so the
+    next sighting of the student submits them again.
+    """
+
+    def __init__(
+        self,
+        flush_interval_ms: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        on_recorded: Optional[Callable[[AttendanceEvent], None]] = None,
+        on_already_recorded: Optional[Callable[[AttendanceEvent], None]] = None,
+        on_error: Optional[Callable[[List[AttendanceEvent], Optional[Exception]], None]] = None,
+        writer: Optional[BatchWriter] = None,
+        journal: Optional[AttendanceJournal] = None,
+    ):
+        config = PerformanceConfig.get_attendance_recorder_config()
+        self.flush_interval = (flush_interval_ms or config.get("flush_interval_ms", 250)) / 1000.0
+        self.max_batch = max(1, max_batch or config.get("max_batch", 100))
+        self.on_recorded = on_recorded
+        self.on_error = on_error
+        self.on_already_recorded = on_already_recorded
+        self.writer = writer or _default_writer
+        self.journal = journal
+        self.replay_interval = config.get("replay_interval_ms", 5000) / 1000.0
+        self._next_replay = 0.0  # Replay at once: a previous run may have left events behind
+        self.dedup = AttendanceDeduplicator()
+        self._queue: "queue.Queue[AttendanceEvent]" = queue.Queue(maxsize=queue_size or config.get("queue_size", 1000))
+        self._pending = 0
+        self._idle = threading.Condition()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {
+            "submitted": 0, "duplicates": 0, "dropped": 0, "batches": 0,
+            "written": 0, "already_recorded": 0, "errors": 0, "last_batch_ms": 0.0,
+            "deferred": 0, "replayed": 0, "cancelled": 0,
+        }
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        if self.journal is not None:
+            self.journal.prune()
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Write whatever is still queued, then stop the writer thread"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def submit(self, event: AttendanceEvent) -> bool:
+        """
+        Queue an event without blocking.
+
+        Returns False if the student was already submitted for that day or the
+        queue is full.
+        """
+        if not self.dedup.offer(event):
+            self._stats["duplicates"] += 1
+            return False
+        with self._idle:
+            try:
+                self._queue.put_nowait(event)
+            except queue.Full:
+                self.dedup.forget(event.student_pk, event.attendance_date)
+                self._stats["dropped"] += 1
+                return False
+            self._pending += 1
+        self._stats["submitted"] += 1
+        return True
+
+    def forget(self, student_pk: int, attendance_date: Optional[date] = None):
+        """Allow a student to be submitted again (e.g. after their record was removed)"""
+        self.dedup.forget(student_pk, attendance_date)
+
+    def cancel(self, student_pk: int, attendance_date: Optional[date] = None) -> bool:
+        """
+        Drop a student's queued, not yet written event (e.g. their card was removed).
+
+        Returns False if none was queued; an event already taken by the writer
+        cannot be cancelled and has to be deleted once written.
+        """
+        attendance_date = attendance_date or date.today()
+        with self._idle:
+            with self._queue.mutex:
+                queued = self._queue.queue
+                kept = [e for e in queued if not (e.student_pk == student_pk and e.attendance_date == attendance_date)]
+                removed = len(queued) - len(kept)
+                if removed:
+                    queued.clear()
+                    queued.extend(kept)
+            if removed:
+                self._pending -= removed
+                self._idle.notify_all()
+        if not removed:
+            return False
+        self.dedup.forget(student_pk, attendance_date)
+        self._stats["cancelled"] += removed
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write queued events now and wait for them; returns False on timeout (blocks: not for the UI thread)"""
+        self._wake.set()
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            stopping = self._stop.is_set()
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+            if self.journal is not None and time.monotonic() >= self._next_replay:
+                self._replay()
+            if stopping:
+                break
+
+    def _drain(self) -> List[AttendanceEvent]:
+        batch = []
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[AttendanceEvent]):
+        started = time.perf_counter()
+        journal_ids = None
+        if self.journal is not None:
+            try:
+                journal_ids = self.journal.append(batch)
+            except Exception as e:
+                print(f"⚠️ Attendance journal write failed: {e}")
+        error = None
+        try:
+            written = self.writer(batch)
+        except Exception as e:
+            written, error = None, e
+        self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self._stats["batches"] += 1
+
+        if written is None and journal_ids is not None:
+            # Durable locally; the replay picks these up once MySQL is back
+            self._stats["deferred"] += len(batch)
+            self._next_replay = time.monotonic() + self.replay_interval
+            print(f"⚠️ Database unavailable, {len(batch)} attendance event(s) kept in the local journal")
+        elif written is None:
+            self._stats["errors"] += 1
+            for event in batch:
+                self.dedup.forget(event.student_pk, event.attendance_date)
+            print(f"❌ Failed to record {len(batch)} attendance event(s): {error or 'database error'}")
+            self._notify(self.on_error, batch, error)
+        else:
+            if journal_ids is not None:
+                self.journal.mark_replayed(journal_ids)
+            self._stats["written"] += len(written)
+            self._stats["already_recorded"] += len(batch) - len(written)
+            self._report(batch, written)
+
+        with self._idle:
+            self._pending -= len(batch)
+            self._idle.notify_all()
+
+    def _replay(self):
+        """Push journaled events that MySQL has not taken yet, one batch per call"""
+        self._next_replay = time.monotonic() + self.replay_interval
+        try:
+            pending = self.journal.pending(self.max_batch)
+        except Exception as e:
+            print(f"⚠️ Attendance journal read failed: {e}")
+            return
+        if not pending:
+            return
+        events = [event for _, event in pending]
+        try:
+            written = self.writer(events)
+        except Exception:
+            written = None
+        if written is None:
+            return
+        self.journal.mark_replayed([journal_id for journal_id, _ in pending])
+        self._stats["replayed"] += len(events)
+        self._stats["written"] += len(written)
+        self._stats["already_recorded"] += len(events) - len(written)
+        print(f"✅ Replayed {len(events)} journaled attendance event(s) into the database")
+        self._report(events, written)
+        if len(pending) == self.max_batch:
+            self._next_replay = 0.0  # More waiting; continue on the next pass
+
+    def _report(self, batch: List[AttendanceEvent], written: List[AttendanceEvent]):
+        written_ids = {id(event) for event in written}
+        for event in batch:
+            if id(event) in written_ids:
+                self._notify(self.on_recorded, event)
+            else:
+                self._notify(self.on_already_recorded, event)
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠️ Attendance recorder callback failed: {e}")
+
+    def get_stats(self) -> Dict:
+        stats = {**self._stats, "queued": self._pending}
+        if self.journal is not None:
+            stats["journal_pending"] = self.journal.pending_count()
+        return stats
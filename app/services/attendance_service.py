@@ -3,13 +3,26 @@ AttendanceService - Specific operations for attendance data
 Built on top of DataService for reusable database operations
 """
 
-from typing import List, Dict, Optional
-from datetime import datetime, date
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, date, time, timedelta
 from app.services.data_service import DataService
+from app.services.attendance_events import AttendanceEvent
 
 class AttendanceService:
     """Service class for attendance-related database operations"""
     
+    @staticmethod
+    def day_range(start_date: date, end_date: date = None) -> Tuple[datetime, datetime]:
+        """
+        Half-open [start, end) timestamp bounds covering start_date..end_date inclusive.
+
+        Filter with `timestamp >= %s AND timestamp < %s` rather than DATE(timestamp),
+        which hides the column from its indexes.
+        """
+        start = datetime.combine(start_date, time.min)
+        end = datetime.combine(end_date or start_date, time.min) + timedelta(days=1)
+        return start, end
+    
     @staticmethod
     def get_all_attendance(limit: int = 100) -> List[Dict]:
         """Get all attendance records with student info"""
@@ -46,10 +59,10 @@ class AttendanceService:
                 s.section
             FROM attendance a
             JOIN students s ON a.student_id = s.id
-            WHERE DATE(a.timestamp) = %s
+            WHERE a.timestamp >= %s AND a.timestamp < %s
             ORDER BY a.timestamp DESC
         """
-        return DataService.execute_query(query, (today,)) or []
+        return DataService.execute_query(query, AttendanceService.day_range(today)) or []
     
     @staticmethod
     def get_attendance_by_student(student_id: int, limit: int = 50) -> List[Dict]:
@@ -71,36 +84,86 @@ class AttendanceService:
         return DataService.execute_query(query, (student_id, limit)) or []
     
     @staticmethod
-    def create_attendance(student_id: int, status: str = "present") -> bool:
-        """Create new attendance record"""
+    def create_attendance(student_id: int, status: str = "present", timestamp: datetime = None) -> bool:
+        """Create new attendance record (timestamp defaults to now)"""
         attendance_data = {
             "student_id": student_id,
             "status": status,
-            "timestamp": datetime.now()
+            "timestamp": timestamp or datetime.now()
         }
         return DataService.create("attendance", attendance_data)
 
     @staticmethod
-    def create_today_once(student_id: int, status: str = "present") -> bool:
+    def record_once_per_day(student_id: int, status: str = "present", timestamp: datetime = None) -> bool:
+        """
+        Record attendance unless the student already has a record that day.
+
+        A single INSERT IGNORE against the UNIQUE(student_id, attendance_date)
+        key, so it stays correct when several gates record the same student.
+        Returns True if a new record was created, False if one already existed or on error.
+        """
+        # DATETIME keeps whole seconds; truncate so the stored value matches the event
+        timestamp = (timestamp or datetime.now()).replace(microsecond=0)
+        query = "INSERT IGNORE INTO attendance (student_id, status, timestamp) VALUES (%s, %s, %s)"
+        result = DataService.execute_query(query, (student_id, status, timestamp), fetch=False, prepared=True)
+        return result is not None and result > 0
+
+    @staticmethod
+    def create_today_once(student_id: int, status: str = "present", timestamp: datetime = None) -> bool:
         """
         Create attendance for today only once per student.
+        Pass timestamp to record an event from another moment (e.g. recorded video);
+        the once-per-day check then applies to that timestamp's date.
         Returns True if a new record was created, False if already exists or on error.
         """
         try:
-            today = date.today()
-            # Check existing record for today
-            check_query = """
-                SELECT id FROM attendance
-                WHERE student_id = %s AND DATE(timestamp) = %s
-                LIMIT 1
-            """
-            exists = DataService.execute_query(check_query, (student_id, today))
-            if exists:
-                return False
-            return AttendanceService.create_attendance(student_id, status)
+            return AttendanceService.record_once_per_day(student_id, status, timestamp)
         except Exception:
             return False
-    
+
+    @staticmethod
+    def create_attendance_batch(events: List[AttendanceEvent]) -> Optional[List[AttendanceEvent]]:
+        """
+        Record a batch of events, at most one per student per day.
+
+        One multi-row INSERT IGNORE; students who already have a record that
+        day are skipped by the unique key. Only when some rows were skipped is
+        a second query run to tell which events were written.
+        Returns the events that were written, or None if the database failed.
+        """
+        if not events:
+            return []
+
+        rows = [(event.student_pk, event.status, event.timestamp.replace(microsecond=0)) for event in events]
+        inserted = DataService.insert_many("attendance", ["student_id", "status", "timestamp"], rows, ignore=True)
+        if inserted is None:
+            return None
+        if inserted == len(events):
+            return list(events)
+
+        # Some rows collided: an event was written if the stored row carries its timestamp
+        student_ids = sorted({event.student_pk for event in events})
+        dates = sorted({event.attendance_date for event in events})
+        check_query = f"""
+            SELECT student_id, timestamp FROM attendance
+            WHERE student_id IN ({', '.join(['%s'] * len(student_ids))})
+              AND attendance_date IN ({', '.join(['%s'] * len(dates))})
+        """
+        stored = DataService.execute_query(check_query, tuple(student_ids) + tuple(dates))
+        if stored is None:
+            return None
+        stored_rows = {(row["student_id"], row["timestamp"]) for row in stored}
+        return [event for event, row in zip(events, rows) if (row[0], row[2]) in stored_rows]
+
+    @staticmethod
+    def get_marked_student_ids(target_date: date = None) -> Optional[Set[int]]:
+        """Students with any attendance record on a date (None if the database failed)"""
+        query = "SELECT student_id FROM attendance WHERE timestamp >= %s AND timestamp < %s"
+        rows = DataService.execute_query(query, AttendanceService.day_range(target_date or date.today()))
+        if rows is None:
+            return None
+        return {row["student_id"] for row in rows}
+
     @staticmethod
     def update_attendance(attendance_id: int, status: str) -> bool:
         """Update attendance status"""
@@ -123,10 +186,10 @@ class AttendanceService:
                 status,
                 COUNT(*) as count
             FROM attendance 
-            WHERE DATE(timestamp) = %s
+            WHERE timestamp >= %s AND timestamp < %s
             GROUP BY status
         """
-        results = DataService.execute_query(query, (target_date,)) or []
+        results = DataService.execute_query(query, AttendanceService.day_range(target_date)) or []
         
         # Convert to dictionary with default values
         stats = {"present": 0, "late": 0, "absent": 0}
@@ -202,25 +265,33 @@ class AttendanceService:
         search_param = f"%{search_term}%"
         return DataService.execute_query(query, (search_param, search_param, search_param, limit)) or []
     
+    _DATE_RANGE_QUERY = """
+        SELECT 
+            a.id,
+            a.student_id AS student_pk,
+            a.timestamp,
+            a.status,
+            s.student_id AS student_no,
+            s.first_name,
+            s.last_name,
+            s.section
+        FROM attendance a
+        JOIN students s ON a.student_id = s.id
+        WHERE a.timestamp >= %s AND a.timestamp < %s
+        ORDER BY a.timestamp DESC
+    """
+    
     @staticmethod
     def get_attendance_by_date_range(start_date: date, end_date: date) -> List[Dict]:
         """Get attendance records within date range"""
-        query = """
-            SELECT 
-                a.id,
-                a.student_id AS student_pk,
-                a.timestamp,
-                a.status,
-                s.student_id AS student_no,
-                s.first_name,
-                s.last_name,
-                s.section
-            FROM attendance a
-            JOIN students s ON a.student_id = s.id
-            WHERE DATE(a.timestamp) BETWEEN %s AND %s
-            ORDER BY a.timestamp DESC
-        """
-        return DataService.execute_query(query, (start_date, end_date)) or []
+        query = AttendanceService._DATE_RANGE_QUERY
+        return DataService.execute_query(query, AttendanceService.day_range(start_date, end_date)) or []
+    
+    @staticmethod
+    def iter_attendance_by_date_range(start_date: date, end_date: date, batch_size: int = 500) -> Iterator[Dict]:
+        """Like get_attendance_by_date_range, streamed for reports over long ranges (raises on database errors)"""
+        return DataService.stream(AttendanceService._DATE_RANGE_QUERY,
+                                  AttendanceService.day_range(start_date, end_date), batch_size)
 
 # Convenience functions for easy access
 def get_today_attendance():
@@ -0,0 +1,104 @@
+"""
+In-memory "already marked today" state for the current school day
+
+The set of students with a record today is loaded from the database in one
+query when a session starts, then kept up to date from the write-behind
+recorder's confirmations. Checking a student costs no database round trip.
+When the date changes, the set is cleared and the new day is loaded in the
+background; until then unknown students are simply submitted again, and the
+unique student/day key keeps that correct.
+"""
+import threading
+from datetime import date
+from typing import Callable, Dict, Optional, Set
+
+MarkedLoader = Callable[[date], Optional[Set[int]]]
+
+
+def _default_loader(target_date: date) -> Optional[Set[int]]:
+    from app.services.attendance_service import AttendanceService
+    return AttendanceService.get_marked_student_ids(target_date)
+
+
+class AttendanceDayState:
+    """Thread-safe set of student PKs marked on the current day"""
+
+    def __init__(self, loader: Optional[MarkedLoader] = None, today: Optional[Callable[[], date]] = None):
+        self.loader = loader or _default_loader
+        self.today = today or date.today
+        self._lock = threading.Lock()
+        self._day = self.today()
+        self._marked: Set[int] = set()
+        self._loaded = False
+        self._stats = {"checks": 0, "hits": 0, "loads": 0, "load_failures": 0, "rollovers": 0}
+
+    @property
+    def day(self) -> date:
+        return self._day
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self) -> bool:
+        """Load today's marked students from the database (blocking)"""
+        with self._lock:
+            day = self._day
+        try:
+            marked = self.loader(day)
+        except Exception as e:
+            print(f"⚠️ Could not load today's attendance: {e}")
+            marked = None
+        with self._lock:
+            if day != self._day:
+                return False  # Rolled over while loading; the new day loads separately
+            if marked is None:
+                self._stats["load_failures"] += 1
+                return False
+            # Keep marks confirmed while the query was running
+            self._marked |= marked
+            self._loaded = True
+            self._stats["loads"] += 1
+        print(f"✅ Loaded {len(marked)} student(s) already marked on {day}")
+        return True
+
+    def load_async(self):
+        """Load in a background thread so the caller (e.g. the UI) never waits on the database"""
+        threading.Thread(target=self.load, name="attendance-state-load", daemon=True).start()
+
+    def is_marked(self, student_pk: int) -> bool:
+        """True if the student already has a record today; never touches the database"""
+        self._roll_over_if_needed()
+        with self._lock:
+            self._stats["checks"] += 1
+            if student_pk in self._marked:
+                self._stats["hits"] += 1
+                return True
+            return False
+
+    def mark(self, student_pk: int, on: Optional[date] = None):
+        """Record a confirmed write; marks for another day are ignored"""
+        self._roll_over_if_needed()
+        with self._lock:
+            if (on or self._day) == self._day:
+                self._marked.add(student_pk)
+
+    def unmark(self, student_pk: int):
+        """Forget a student (e.g. after their record was removed)"""
+        with self._lock:
+            self._marked.discard(student_pk)
+
+    def _roll_over_if_needed(self):
+        today = self.today()
+        with self._lock:
+            if today == self._day:
+                return
+            self._day = today
+            self._marked = set()
+            self._loaded = False
+            self._stats["rollovers"] += 1
+        self.load_async()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "day": str(self._day), "marked": len(self._marked), "loaded": self._loaded}
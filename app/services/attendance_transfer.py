@@ -0,0 +1,152 @@
+"""
+AttendanceTransferService - bulk attendance import and export (CSV)
+
+Import reads the CSV row by row and writes chunks of chunk_size rows with
+executemany (sent as one multi-row INSERT IGNORE per chunk), each chunk in
+its own transaction. Export streams a date range through DataService.stream
+(an unbuffered, server-side cursor) straight into the CSV file. Neither keeps more than one
+chunk in memory, whatever the number of rows.
+"""
+
+import csv
+import time
+from datetime import date, datetime
+from typing import Dict, Optional
+
+import mysql.connector
+
+from app.services.data_service import DataService
+from app.services.attendance_service import AttendanceService
+
+EXPORT_COLUMNS = ["id", "student_no", "first_name", "last_name", "section", "timestamp", "status"]
+STATUSES = ("present", "late", "absent")
+
+
+class AttendanceTransferService:
+    """Bulk attendance import/export"""
+
+    @staticmethod
+    def _student_pks_by_number() -> Optional[Dict[str, int]]:
+        try:
+            return {str(row["student_id"]): row["id"]
+                    for row in DataService.stream("SELECT id, student_id FROM students")}
+        except mysql.connector.Error as e:
+            print(f"❌ Could not load students: {e}")
+            return None
+
+    @staticmethod
+    def import_csv(path: str, chunk_size: int = 1000) -> Dict:
+        """
+        Import attendance rows from a CSV file.
+
+        Columns: student_no (or student_pk), timestamp (YYYY-MM-DD HH:MM:SS),
+        status (optional, default present). Files written by export_csv can
+        be imported as they are. Rows for a student who already has a record
+        that day are skipped by the unique student/day key, so re-running an
+        import is safe.
+        """
+        summary = {"rows": 0, "inserted": 0, "skipped": 0, "invalid": 0, "unknown_students": 0,
+                   "chunks": 0, "elapsed_s": 0.0, "error": None}
+        started = time.perf_counter()
+
+        pks_by_number = AttendanceTransferService._student_pks_by_number()
+        if pks_by_number is None:
+            summary["error"] = "database unavailable"
+            return summary
+        known_pks = set(pks_by_number.values())
+
+        conn = DataService.get_connection()
+        if not conn:
+            summary["error"] = "database unavailable"
+            return summary
+
+        query = "INSERT IGNORE INTO attendance (student_id, status, timestamp) VALUES (%s, %s, %s)"
+        cursor = conn.cursor()
+        chunk = []
+
+        def flush():
+            conn.start_transaction()
+            cursor.executemany(query, chunk)
+            conn.commit()
+            summary["inserted"] += cursor.rowcount
+            summary["skipped"] += len(chunk) - cursor.rowcount
+            summary["chunks"] += 1
+            chunk.clear()
+
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    summary["rows"] += 1
+                    student_pk = AttendanceTransferService._resolve_student(row, pks_by_number, known_pks)
+                    if student_pk is None:
+                        summary["unknown_students"] += 1
+                        continue
+                    try:
+                        timestamp = datetime.fromisoformat(row["timestamp"].strip()).replace(microsecond=0)
+                    except (KeyError, AttributeError, ValueError):
+                        summary["invalid"] += 1
+                        continue
+                    status = (row.get("status") or "present").strip().lower()
+                    if status not in STATUSES:
+                        summary["invalid"] += 1
+                        continue
+
+                    chunk.append((student_pk, status, timestamp))
+                    if len(chunk) >= chunk_size:
+                        flush()
+                if chunk:
+                    flush()
+        except mysql.connector.Error as e:
+            # Earlier chunks stay committed; re-running skips them
+            conn.rollback()
+            summary["error"] = str(e)
+            print(f"❌ Import stopped after {summary['inserted']} rows: {e}")
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            # Unreadable file: rows of the unfinished chunk are not written
+            summary["error"] = f"could not read {path}: {e}"
+            print(f"❌ Import stopped after {summary['inserted']} rows: {summary['error']}")
+        finally:
+            cursor.close()
+            conn.close()
+
+        summary["elapsed_s"] = round(time.perf_counter() - started, 2)
+        return summary
+
+    @staticmethod
+    def _resolve_student(row: Dict, pks_by_number: Dict[str, int], known_pks: set) -> Optional[int]:
+        student_no = (row.get("student_no") or "").strip()
+        if student_no:
+            return pks_by_number.get(student_no)
+        try:
+            student_pk = int(row.get("student_pk") or "")
+        except ValueError:
+            return None
+        return student_pk if student_pk in known_pks else None
+
+    @staticmethod
+    def export_csv(path: str, start_date: date, end_date: date, batch_size: int = 1000) -> Dict:
+        """Stream attendance between start_date and end_date (inclusive) into a CSV file"""
+        started = time.perf_counter()
+        query = """
+            SELECT a.id, s.student_id AS student_no, s.first_name, s.last_name, s.section,
+                   a.timestamp, a.status
+            FROM attendance a
+            JOIN students s ON a.student_id = s.id
+            WHERE a.timestamp >= %s AND a.timestamp < %s
+            ORDER BY a.timestamp
+        """
+        rows_written = 0
+        error = None
+        try:
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+                writer.writeheader()
+                params = AttendanceService.day_range(start_date, end_date)
+                for rows in DataService.stream(query, params, batch_size=batch_size, batches=True):
+                    writer.writerows(rows)
+                    rows_written += len(rows)
+        except mysql.connector.Error as e:
+            error = str(e)
+            print(f"❌ Export failed after {rows_written} rows: {e}")
+
+        return {"rows": rows_written, "elapsed_s": round(time.perf_counter() - started, 2), "error": error}
@@ -0,0 +1,75 @@
+"""
+Circuit breaker for calls to an unreliable dependency (the MySQL server)
+
+closed:    calls go through; consecutive failures are counted
+open:      after failure_threshold failures, calls are refused immediately
+           for reset_seconds instead of each waiting out a timeout
+half-open: after reset_seconds one probe call is let through; success closes
+           the breaker, failure opens it again
+"""
+import threading
+import time
+from typing import Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 3, reset_seconds: float = 15.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may be attempted now"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self._stats["rejected"] += 1
+            return False
+
+    def cancel(self):
+        """Give back a permission from allow() that was never used for a call"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print("✅ Database reachable again")
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._stats["opened"] += 1
+                    print(f"⚠️ Database unreachable, pausing connection attempts for {self.reset_seconds:.0f}s")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, "state": self._state, "failures": self._failures}
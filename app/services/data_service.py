@@ -5,8 +5,13 @@ Now with pagination support!
 """
 
 import mysql.connector
-from typing import List, Dict, Any, Optional, Tuple
-from app.utils.config import DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from app.utils.config import (
+    DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT,
+    DB_CONNECT_TIMEOUT, DB_BREAKER_FAILURES, DB_BREAKER_RESET_SECONDS,
+)
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.db_pool import ConnectionPool, get_pool
 from app.services.pagination import PaginationParams, PaginationResult, PaginationService
 import logging
 
@@ -16,24 +21,54 @@ class DataService:
     Provides common CRUD operations na pwedeng gamitin anywhere
     """
     
+    # Refuses connection attempts for a while after repeated failures; the pool
+    # reports failed connects and lost connections (queries included) to it
+    breaker = CircuitBreaker(DB_BREAKER_FAILURES, DB_BREAKER_RESET_SECONDS)
+    
+    @staticmethod
+    def _connect():
+        """Open a new physical connection (used by the pool)"""
+        return mysql.connector.connect(
+            host=DB_HOST,
+            user=DB_USER,
+            password=DB_PASSWORD,
+            database=DB_NAME,
+            port=DB_PORT,
+            autocommit=True,
+            connection_timeout=DB_CONNECT_TIMEOUT
+        )
+    
+    @staticmethod
+    def pool() -> ConnectionPool:
+        """The process-wide connection pool"""
+        return get_pool(DataService._connect, DataService.breaker)
+    
     @staticmethod
     def get_connection():
-        """Get database connection"""
+        """
+        Borrow a pooled database connection (None if the server is unreachable)
+        
+        close() returns it to the pool.
+        """
         try:
-            return mysql.connector.connect(
-                host=DB_HOST,
-                user=DB_USER,
-                password=DB_PASSWORD,
-                database=DB_NAME,
-                port=DB_PORT,
-                autocommit=True
-            )
+            return DataService.pool().acquire()
         except mysql.connector.Error as e:
             print(f"❌ Database connection error: {e}")
             return None
     
     @staticmethod
-    def execute_query(query: str, params: tuple = None, fetch: bool = True) -> Optional[List[Dict]]:
+    def connection():
+        """Context manager: with DataService.connection() as conn: ... (raises if unreachable)"""
+        return DataService.pool().connection()
+    
+    @staticmethod
+    def get_pool_stats() -> Dict:
+        """Pool metrics: checkouts, wait/use times in ms, open and idle connections"""
+        return DataService.pool().get_stats()
+    
+    @staticmethod
+    def execute_query(query: str, params: tuple = None, fetch: bool = True,
+                      prepared: bool = False) -> Optional[List[Dict]]:
         """
         Execute SQL query and return results
         
@@ -41,6 +76,8 @@ class DataService:
             query: SQL query string
             params: Query parameters (optional)
             fetch: Whether to fetch results (default True)
+            prepared: Run as a server-side prepared statement cached on the
+                pooled connection (for hot queries with a fixed SQL text)
             
         Returns:
             List of dictionaries for SELECT queries, None for INSERT/UPDATE/DELETE
@@ -49,26 +86,79 @@ class DataService:
         if not conn:
             return None
             
+        cursor = None
         try:
-            cursor = conn.cursor(dictionary=True)
-            cursor.execute(query, params or ())
+            if prepared:
+                # Cached on the connection: parsed once, not closed here
+                cursor = conn.prepared_cursor(query)
+                cursor.execute(params or ())
+            else:
+                cursor = conn.cursor(dictionary=True)
+                cursor.execute(query, params or ())
             
             if fetch:
-                results = cursor.fetchall()
-                cursor.close()
-                conn.close()
-                return results
-            else:
-                affected_rows = cursor.rowcount
-                cursor.close()
-                conn.close()
-                return affected_rows
+                return cursor.fetchall()
+            return cursor.rowcount
                 
         except mysql.connector.Error as e:
             print(f"❌ Query execution error: {e}")
-            if conn:
-                conn.close()
+            if prepared:
+                conn.discard_statement(query)
+            if isinstance(e, (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)):
+                conn.broken = True  # Lost connection: do not return it to the pool
             return None
+        except Exception:
+            if prepared:
+                conn.discard_statement(query)
+            raise
+        finally:
+            # Always hand the connection back, or the pool slot is lost for good
+            if cursor is not None and not prepared:
+                try:
+                    cursor.close()
+                except Exception:
+                    conn.broken = True
+            conn.close()
+    
+    @staticmethod
+    def stream(query: str, params: tuple = None, batch_size: int = 500,
+               batches: bool = False) -> Iterator:
+        """
+        Yield rows (dicts) from an unbuffered, server-side cursor
+        
+        Rows are fetched batch_size at a time, so memory stays flat whatever
+        the result size. With batches=True each item is a list of up to
+        batch_size rows. The pooled connection is held until the generator
+        is exhausted or closed; use contextlib.closing() when stopping early.
+        A stream stopped early closes its connection instead of reading the
+        rest of the result (which could be millions of rows) just to reuse it.
+        
+        Unlike execute_query, errors (including an unreachable database) are
+        raised: a truncated stream must not look like a complete one.
+        """
+        conn = DataService.pool().acquire()
+        try:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            try:
+                cursor.execute(query, params or ())
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    if batches:
+                        yield rows
+                    else:
+                        yield from rows
+            finally:
+                if conn.unread_result:
+                    conn.reusable = False  # Stopped early: drop the connection, not drain it
+                else:
+                    cursor.close()
+        except (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError):
+            conn.broken = True
+            raise
+        finally:
+            conn.close()
     
     # CRUD Operations - Generic methods
     
@@ -82,11 +172,19 @@ class DataService:
         results = DataService.execute_query(query)
         return results or []
     
+    @staticmethod
+    def iter_all(table: str, order_by: str = None, batch_size: int = 500) -> Iterator[Dict]:
+        """Like get_all, streamed row by row (see stream)"""
+        query = f"SELECT * FROM {table}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        return DataService.stream(query, batch_size=batch_size)
+    
     @staticmethod
     def get_by_id(table: str, id_value: Any, id_column: str = "id") -> Optional[Dict]:
         """SELECT * FROM table WHERE id = ?"""
         query = f"SELECT * FROM {table} WHERE {id_column} = %s"
-        results = DataService.execute_query(query, (id_value,))
+        results = DataService.execute_query(query, (id_value,), prepared=True)
         return results[0] if results else None
     
     @staticmethod
@@ -102,7 +200,24 @@ class DataService:
         query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
         result = DataService.execute_query(query, tuple(values), fetch=False)
         return result is not None and result > 0
-    
+
+    @staticmethod
+    def insert_many(table: str, columns: List[str], rows: List[tuple], ignore: bool = False) -> Optional[int]:
+        """
+        INSERT INTO table (...) VALUES (...), (...), ... in one statement
+
+        With ignore=True rows that collide with a unique key are skipped (INSERT IGNORE).
+        Returns the number of inserted rows, or None on error.
+        """
+        if not rows:
+            return 0
+
+        row_placeholder = "(" + ', '.join(['%s'] * len(columns)) + ")"
+        verb = "INSERT IGNORE" if ignore else "INSERT"
+        query = f"{verb} INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_placeholder] * len(rows))}"
+        params = tuple(value for row in rows for value in row)
+        return DataService.execute_query(query, params, fetch=False)
+
     @staticmethod
     def update(table: str, id_value: Any, data: Dict, id_column: str = "id") -> bool:
         """UPDATE table SET ... WHERE id = ?"""
@@ -191,8 +306,9 @@ class DataService:
                 pagination_params, allowed_sort_columns
             )
             
-            # Build LIMIT clause
-            limit_clause = PaginationService.build_limit_clause(pagination_params)
+            # LIMIT/OFFSET as parameters so every page shares one prepared statement
+            limit_clause = "LIMIT %s OFFSET %s"
+            limit_params = (pagination_params.limit, pagination_params.offset)
             
             # Build data query
             data_query = f"""
@@ -211,8 +327,8 @@ class DataService:
             """
             
             # Execute queries
-            data_results = DataService.execute_query(data_query, tuple(where_params))
-            count_result = DataService.execute_query(count_query, tuple(where_params))
+            data_results = DataService.execute_query(data_query, tuple(where_params) + limit_params, prepared=True)
+            count_result = DataService.execute_query(count_query, tuple(where_params), prepared=True)
             
             # Extract total count
             total_count = count_result[0].get('COUNT(*)', 0) if count_result else 0
@@ -253,8 +369,9 @@ class DataService:
                 pagination_params, allowed_sort_columns
             )
             
-            # Build LIMIT clause
-            limit_clause = PaginationService.build_limit_clause(pagination_params)
+            # LIMIT/OFFSET as parameters so every page shares one prepared statement
+            limit_clause = "LIMIT %s OFFSET %s"
+            limit_params = (pagination_params.limit, pagination_params.offset)
             
             # Build full query
             data_query = f"{base_query} {order_clause} {limit_clause}"
@@ -263,8 +380,8 @@ class DataService:
             count_query = PaginationService.build_count_query(base_query)
             
             # Execute queries
-            data_results = DataService.execute_query(data_query, query_params)
-            count_result = DataService.execute_query(count_query, query_params)
+            data_results = DataService.execute_query(data_query, tuple(query_params or ()) + limit_params, prepared=True)
+            count_result = DataService.execute_query(count_query, query_params, prepared=True)
             
             # Extract total count
             total_count = count_result[0].get('COUNT(*)', 0) if count_result else 0
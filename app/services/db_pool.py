@@ -0,0 +1,322 @@
+"""
+Process-wide MySQL connection pool
+
+Opening a MySQL connection costs a TCP connect plus authentication. The pool
+keeps up to `size` connections open and hands them out:
+
+- acquire() waits up to `timeout` seconds for a free connection, opening a
+  new one while fewer than `size` exist
+- connections idle for longer than health_check_seconds are pinged before
+  reuse; dead ones are replaced
+- release() consumes unread results and rolls back an open transaction so
+  the next borrower starts clean; the session itself is only reset (which
+  also drops prepared statements) when a borrower changed autocommit
+- prepared_cursor(sql) keeps server-side prepared statements per
+  connection, keyed by SQL text, evicting the least recently used beyond
+  statement_cache_size
+- connection() is a context manager; PooledConnection.close() also returns
+  the connection, so code written for plain connections keeps working
+
+With a breaker (app/services/circuit_breaker.py), acquire() is refused
+while it is open; failed connects and connections returned as broken count
+as failures, connections returned healthy as successes. Wait and use times
+are recorded for get_stats(). The pool belongs to the
+process that created it; a forked worker gets a fresh one.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from mysql.connector import errors
+
+from app.utils.config import (
+    DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_HEALTH_CHECK_SECONDS, DB_STATEMENT_CACHE_SIZE,
+)
+
+
+class PoolTimeout(errors.PoolError):
+    """No connection became free within the timeout"""
+
+
+class _Entry:
+    __slots__ = ("conn", "last_used", "statements", "session_changed")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_used = time.monotonic()
+        self.statements: "OrderedDict[str, Any]" = OrderedDict()  # SQL text -> prepared cursor
+        self.session_changed = False
+
+
+class _PreparedCursor:
+    """A cached prepared cursor; execute() always passes the cached SQL object"""
+    __slots__ = ("cursor", "sql")
+
+    def __init__(self, cursor, sql: str):
+        self.cursor = cursor
+        self.sql = sql
+
+    def execute(self, params=()):
+        self.cursor.execute(self.sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+class PooledConnection:
+    """A borrowed connection; close() hands it back to the pool instead of disconnecting"""
+
+    def __init__(self, pool: "ConnectionPool", entry: _Entry, wait_ms: float):
+        self._pool = pool
+        self._entry = entry
+        self._borrowed_at = time.perf_counter()
+        self.wait_ms = wait_ms
+        self.broken = False  # Set by callers that saw the connection fail; it is then discarded
+        self.reusable = True  # Cleared by callers that leave it in a state too costly to reset
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise errors.InterfaceError("Connection was returned to the pool")
+        return getattr(entry.conn, name)
+
+    @property
+    def raw(self):
+        """The underlying mysql.connector connection"""
+        return self._entry.conn
+
+    @property
+    def autocommit(self):
+        return self.raw.autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        self._entry.session_changed = True  # Restored by a session reset on return
+        self.raw.autocommit = value
+
+    def prepared_cursor(self, sql: str):
+        """
+        Dictionary cursor holding a server-side prepared statement for sql.
+
+        The cursor stays cached on this connection: the statement is parsed
+        once and later calls with the same SQL text only send parameters.
+        Do not close it; read all rows before running another statement.
+        """
+        return self._pool._prepared_cursor(self._entry, sql)
+
+    def discard_statement(self, sql: str):
+        """Drop a cached statement (e.g. after it failed)"""
+        self._pool._close_statement(self._entry, sql)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, (time.perf_counter() - self._borrowed_at) * 1000,
+                                self.broken, self.reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if isinstance(exc, (errors.OperationalError, errors.InterfaceError)):
+            self.broken = True
+        self.close()
+
+
+class ConnectionPool:
+    def __init__(self, factory: Callable[[], Any], size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT,
+                 health_check_seconds: float = DB_POOL_HEALTH_CHECK_SECONDS,
+                 statement_cache_size: int = DB_STATEMENT_CACHE_SIZE, breaker=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_check_seconds = health_check_seconds
+        self.statement_cache_size = statement_cache_size
+        self.breaker = breaker
+        self._idle: List[_Entry] = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0, "created": 0, "discarded": 0, "health_check_failures": 0, "timeouts": 0,
+            "wait_ms_total": 0.0, "wait_ms_max": 0.0, "use_ms_total": 0.0, "use_ms_max": 0.0,
+            "statements_prepared": 0, "statement_cache_hits": 0, "statements_evicted": 0,
+        }
+
+    def acquire(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Borrow a connection; raises PoolTimeout, PoolError while the breaker is open,
+        or the factory's error if connecting fails"""
+        if self.breaker is not None and not self.breaker.allow():
+            raise errors.PoolError("Database unreachable (circuit breaker open)")
+        started = time.perf_counter()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            with self._cond:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        if self.breaker is not None:
+                            self.breaker.cancel()  # Says nothing about the server
+                        raise PoolTimeout(f"No database connection free within {self.timeout}s (pool size {self.size})")
+                    self._cond.wait(remaining)
+                entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    self._open += 1  # Reserve the slot before connecting outside the lock
+
+            if entry is None:
+                try:
+                    entry = _Entry(self.factory())
+                except Exception:
+                    self._drop_slot()
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    raise
+                self._count("created")
+            elif not self._healthy(entry):
+                self._discard(entry.conn)
+                self._drop_slot()
+                self._count("health_check_failures")
+                continue
+
+            wait_ms = (time.perf_counter() - started) * 1000
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            return PooledConnection(self, entry, wait_ms)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """with pool.connection() as conn: ...  (returned to the pool afterwards)"""
+        conn = self.acquire(timeout)
+        with conn:
+            yield conn
+
+    def _healthy(self, entry: _Entry) -> bool:
+        if time.monotonic() - entry.last_used < self.health_check_seconds:
+            return True
+        try:
+            entry.conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _prepared_cursor(self, entry: _Entry, sql: str):
+        statements = entry.statements
+        if sql in statements:
+            statements.move_to_end(sql)
+            self._count("statement_cache_hits")
+            return statements[sql]
+        while len(statements) >= self.statement_cache_size:
+            self._close_statement(entry, next(iter(statements)))
+            self._count("statements_evicted")
+        cursor = entry.conn.cursor(prepared=True, dictionary=True)
+        # The cursor re-prepares unless it sees the very same str object again,
+        # so the wrapper always executes with the cached one
+        statements[sql] = _PreparedCursor(cursor, sql)
+        self._count("statements_prepared")
+        return statements[sql]
+
+    def _close_statement(self, entry: _Entry, sql: str):
+        prepared = entry.statements.pop(sql, None)
+        if prepared is not None:
+            try:
+                prepared.cursor.close()  # Deallocates the server-side statement
+            except Exception:
+                pass
+
+    def _reset(self, entry: _Entry) -> bool:
+        """Make a returned connection safe for the next borrower"""
+        conn = entry.conn
+        try:
+            if conn.unread_result:
+                conn.consume_results()
+            if conn.in_transaction:
+                conn.rollback()
+            if entry.session_changed:
+                # Restores session variables (autocommit included) to the server
+                # defaults; the server also deallocates prepared statements
+                for sql in list(entry.statements):
+                    self._close_statement(entry, sql)
+                conn.reset_session()
+                entry.session_changed = False
+            return True
+        except Exception:
+            return False
+
+    def _release(self, entry: _Entry, use_ms: float, broken: bool, reusable: bool = True):
+        with self._cond:
+            self._stats["use_ms_total"] += use_ms
+            self._stats["use_ms_max"] = max(self._stats["use_ms_max"], use_ms)
+        if not broken and not reusable:
+            # Healthy but not worth resetting: close it without blaming the server
+            self._discard(entry.conn)
+            self._drop_slot()
+            return
+        if broken or not self._reset(entry):
+            if self.breaker is not None:
+                self.breaker.record_failure()
+            self._discard(entry.conn)
+            self._drop_slot()
+            return
+        if self.breaker is not None:
+            self.breaker.record_success()
+        entry.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    def _discard(self, conn):
+        self._count("discarded")
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _drop_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def _count(self, key: str):
+        with self._cond:
+            self._stats[key] += 1
+
+    def close_all(self):
+        """Close idle connections (borrowed ones are closed when returned)"""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for entry in idle:
+            self._discard(entry.conn)
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            stats = dict(self._stats)
+            checkouts = stats["checkouts"] or 1
+            stats.update({
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "wait_ms_avg": round(stats["wait_ms_total"] / checkouts, 3),
+                "use_ms_avg": round(stats["use_ms_total"] / checkouts, 3),
+            })
+        return stats
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(factory: Callable[[], Any], breaker=None) -> ConnectionPool:
+    """The process-wide pool, created on first use with the given connection factory and breaker"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = ConnectionPool(factory, breaker=breaker)
+            _pool_pid = os.getpid()
+        return _pool
@@ -10,6 +10,7 @@ import time
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import PCA
 import pickle
+from app.services.face.model_registry import ModelRegistry, FRONTAL_FACE
 
 class AdvancedFaceRecognition:
     """Advanced face recognition with multiple models and techniques"""
@@ -67,15 +68,16 @@ class AdvancedFaceRecognition:
         from app.services.face.image_preprocessor import ImagePreprocessor
         preprocessor = ImagePreprocessor()
         
-        for student_folder in os.listdir(students_dir):
+        folders = [name for name in os.listdir(students_dir) if os.path.isdir(os.path.join(students_dir, name))]
+        students_by_last_name = self._lookup_students(folders)
+        
+        for student_folder in folders:
             student_path = os.path.join(students_dir, student_folder)
-            if not os.path.isdir(student_path):
-                continue
             
             print(f"   Processing {student_folder}...")
             
             # Get student info
-            student_info = self._get_student_info(student_folder)
+            student_info = self._get_student_info(student_folder, students_by_last_name)
             
             # Process all images for this student
             for file_name in os.listdir(student_path):
@@ -107,17 +109,22 @@ class AdvancedFaceRecognition:
         
         print(f"✅ Loaded {len(self.known_encodings)} face encodings for {len(set(self.known_student_ids))} students")
     
-    def _get_student_info(self, student_folder: str) -> Dict:
-        """Get student information from database or folder name"""
+    def _lookup_students(self, folders: List[str]) -> Dict[str, Dict]:
+        """Database records for the given folders (last names), fetched in one streamed pass"""
         try:
             from app.services.students_service import StudentsService
-            matches = StudentsService.search_students(student_folder)
-            if matches:
-                for match in matches:
-                    if match.get('last_name', '').upper() == student_folder.upper():
-                        return match
+            return StudentsService.get_students_by_last_name(folders)
         except Exception as e:
-            print(f"⚠️ Error searching for student {student_folder}: {e}")
+            print(f"⚠️ Error looking up students: {e}")
+            return {}
+    
+    def _get_student_info(self, student_folder: str, students_by_last_name: Dict[str, Dict] = None) -> Dict:
+        """Get student information from database or folder name"""
+        if students_by_last_name is None:
+            students_by_last_name = self._lookup_students([student_folder])
+        match = students_by_last_name.get(student_folder.upper())
+        if match:
+            return match
         
         # Fallback to folder name
         return {
@@ -240,6 +247,7 @@ class AdvancedFaceRecognition:
         labels = []
         label_map = {}
         current_label = 0
+        face_cascade = ModelRegistry.get_cascade(FRONTAL_FACE)
         
         for student_folder in os.listdir(students_dir):
             student_path = os.path.join(students_dir, student_folder)
@@ -260,7 +268,6 @@ class AdvancedFaceRecognition:
                     continue
                 
                 # Detect and crop face
-                face_cascade = cv2.CascadeClassifier("app/models/haarcascade_frontalface_default.xml")
                 faces_detected = face_cascade.detectMultiScale(image, 1.1, 5)
                 
                 for (x, y, w, h) in faces_detected:
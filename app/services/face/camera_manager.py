@@ -0,0 +1,322 @@
+"""
+Multi-camera capture feeding one shared recognition service
+
+- CameraSource: one capture thread per camera, keeping only the latest frame
+- RecognitionService: a single FaceRecognitionEngine (one in-memory gallery)
+  serving all cameras with round-robin scheduling
+- CameraManager: wires sources to the service, with central attendance dedup
+"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Optional, Callable, Union
+
+import cv2
+import numpy as np
+
+from app.services.face.recognition_algorithm import FaceRecognitionEngine
+from app.services.face.model_registry import ModelRegistry
+from app.services.attendance_events import AttendanceEvent, AttendanceDeduplicator
+from app.services.attendance_recorder import AttendanceRecorder
+from app.services.attendance_journal import AttendanceJournal
+
+CameraSpec = Union[int, str]
+
+
+class CameraSource:
+    """Reads frames from a camera index or video file on its own thread"""
+
+    def __init__(self, source: CameraSpec, camera_id: Optional[str] = None, realtime_files: bool = True):
+        self.source = source
+        self.camera_id = camera_id or (f"cam{source}" if isinstance(source, int) else str(source))
+        self.realtime_files = realtime_files
+        self._cap = None
+        self._thread = None
+        self._running = False
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_seq = 0
+        self._frame_time = 0.0
+        self.frames_captured = 0
+
+    def start(self) -> bool:
+        """Open the source and start the capture thread"""
+        if self._running:
+            return True
+        cap = cv2.VideoCapture(self.source)
+        if not cap or not cap.isOpened():
+            print(f"❌ Unable to open camera source: {self.source}")
+            return False
+        self._cap = cap
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        if self._cap is not None:
+            try:
+                self._cap.release()
+            except Exception:
+                pass
+            self._cap = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def latest(self):
+        """Return (frame, seq, capture_monotonic) of the newest frame"""
+        with self._lock:
+            return self._frame, self._frame_seq, self._frame_time
+
+    def _capture_loop(self):
+        # Video files are paced at their native fps so they behave like a live gate
+        is_file = isinstance(self.source, str) and not self.source.startswith(("rtsp://", "http://", "https://"))
+        frame_interval = 0.0
+        if is_file and self.realtime_files:
+            fps = self._cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_interval = 1.0 / fps
+
+        try:
+            while self._running and self._cap is not None:
+                ret, frame = self._cap.read()
+                if not ret or frame is None:
+                    if is_file:
+                        break  # End of file
+                    time.sleep(0.02)
+                    continue
+                with self._lock:
+                    self._frame = frame
+                    self._frame_seq += 1
+                    self._frame_time = time.monotonic()
+                self.frames_captured += 1
+                if frame_interval:
+                    time.sleep(frame_interval)
+        except Exception as e:
+            print(f"❌ Capture error on {self.camera_id}: {e}")
+        finally:
+            self._running = False
+
+
+class CameraStats:
+    """Per-camera throughput and latency over a sliding window"""
+
+    def __init__(self, window: int = 100):
+        self.processed_times = deque(maxlen=window)
+        self.latencies_ms = deque(maxlen=window)
+        self.frames_processed = 0
+        self.faces = 0
+
+    def record(self, latency_ms: float, faces: int):
+        self.processed_times.append(time.monotonic())
+        self.latencies_ms.append(latency_ms)
+        self.frames_processed += 1
+        self.faces += faces
+
+    def snapshot(self, frames_captured: int) -> Dict:
+        fps = 0.0
+        if len(self.processed_times) > 1:
+            span = self.processed_times[-1] - self.processed_times[0]
+            fps = (len(self.processed_times) - 1) / span if span > 0 else 0.0
+        latencies = sorted(self.latencies_ms)
+        return {
+            "fps": round(fps, 2),
+            "latency_ms": round(sum(latencies) / len(latencies), 1) if latencies else 0,
+            "latency_p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1) if latencies else 0,
+            "frames_processed": self.frames_processed,
+            "frames_skipped": max(0, frames_captured - self.frames_processed),
+            "faces": self.faces,
+        }
+
+
+class RecognitionService:
+    """
+    One recognition engine shared by every camera.
+
+    Cameras are visited round-robin and each turn processes that camera's newest
+    frame, so a busy camera cannot starve the others and stale frames are skipped.
+    """
+
+    def __init__(
+        self,
+        engine: FaceRecognitionEngine,
+        on_detections: Optional[Callable[[str, np.ndarray, List[Dict]], None]] = None,
+        on_attendance: Optional[Callable[[AttendanceEvent], None]] = None,
+    ):
+        self.engine = engine
+        self.on_detections = on_detections
+        self.on_attendance = on_attendance
+        self.dedup = AttendanceDeduplicator()
+        self._sources: Dict[str, CameraSource] = {}
+        self._last_seq: Dict[str, int] = {}
+        self._stats: Dict[str, CameraStats] = {}
+        self._order: List[str] = []
+        self._cursor = 0
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def add_source(self, source: CameraSource):
+        with self._lock:
+            self._sources[source.camera_id] = source
+            self._last_seq[source.camera_id] = 0
+            self._stats[source.camera_id] = CameraStats()
+            self._order.append(source.camera_id)
+
+    def remove_source(self, camera_id: str):
+        with self._lock:
+            self._sources.pop(camera_id, None)
+            self._last_seq.pop(camera_id, None)
+            self._stats.pop(camera_id, None)
+            if camera_id in self._order:
+                self._order.remove(camera_id)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+
+    def _next_job(self):
+        """Pick the next camera (round-robin) that has a frame newer than the last one processed"""
+        with self._lock:
+            count = len(self._order)
+            for offset in range(count):
+                camera_id = self._order[(self._cursor + offset) % count]
+                frame, seq, captured_at = self._sources[camera_id].latest()
+                if frame is not None and seq > self._last_seq[camera_id]:
+                    self._cursor = (self._cursor + offset + 1) % count
+                    self._last_seq[camera_id] = seq
+                    return camera_id, frame, captured_at
+        return None
+
+    def _run(self):
+        # Cascades are per thread: parse them here, not on the first frame
+        ModelRegistry.warm_up_thread()
+        while self._running:
+            job = self._next_job()
+            if job is None:
+                time.sleep(0.005)
+                continue
+
+            camera_id, frame, captured_at = job
+            try:
+                detections = self.engine.analyze_frame(frame, stream_id=camera_id)
+            except Exception as e:
+                print(f"⚠️ Recognition error on {camera_id}: {e}")
+                continue
+
+            latency_ms = (time.monotonic() - captured_at) * 1000.0
+            stats = self._stats.get(camera_id)
+            if stats is not None:
+                stats.record(latency_ms, len(detections))
+
+            # A failing callback must not end the only recognition thread
+            self._notify(self.on_detections, camera_id, frame, detections)
+            try:
+                self._emit_attendance(camera_id, detections)
+            except Exception as e:
+                print(f"⚠️ Attendance emit error on {camera_id}: {e}")
+
+    def _emit_attendance(self, camera_id: str, detections: List[Dict]):
+        """Central dedup: one event per student per day across all gates"""
+        for d in detections:
+            student_info = d.get("student_info") or {}
+            if not d.get("is_known") or student_info.get("id") is None:
+                continue
+            event = AttendanceEvent(
+                student_pk=int(student_info["id"]),
+                timestamp=datetime.now(),
+                source=camera_id,
+                confidence=d.get("confidence", 0.0),
+                student_info=student_info,
+            )
+            if self.dedup.offer(event):
+                self._notify(self.on_attendance, event)
+
+    @staticmethod
+    def _notify(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"⚠️ Recognition callback failed: {e}")
+
+    def get_camera_stats(self) -> Dict[str, Dict]:
+        """Per-camera fps, latency and skipped-frame counts"""
+        with self._lock:
+            return {
+                camera_id: self._stats[camera_id].snapshot(self._sources[camera_id].frames_captured)
+                for camera_id in self._order
+            }
+
+
+class CameraManager:
+    """Runs N camera sources against one shared RecognitionService"""
+
+    def __init__(
+        self,
+        engine: FaceRecognitionEngine,
+        on_detections: Optional[Callable[[str, np.ndarray, List[Dict]], None]] = None,
+        on_attendance: Optional[Callable[[AttendanceEvent], None]] = None,
+    ):
+        # Without a custom handler, events go to a write-behind recorder so the
+        # recognition thread never waits on the database
+        self.recorder = None
+        if on_attendance is None:
+            self.recorder = AttendanceRecorder(on_recorded=self._on_recorded, journal=AttendanceJournal())
+            on_attendance = self.recorder.submit
+        self.service = RecognitionService(engine, on_detections, on_attendance)
+        self.sources: Dict[str, CameraSource] = {}
+
+    @staticmethod
+    def _on_recorded(event: AttendanceEvent):
+        print(f"✅ Logged attendance for student ID {event.student_pk} at {event.source}")
+
+    def add_camera(self, source: CameraSpec, camera_id: Optional[str] = None) -> Optional[str]:
+        """Open a camera (index or file path) and register it; returns its camera_id"""
+        camera = CameraSource(source, camera_id)
+        if camera.camera_id in self.sources:
+            print(f"ℹ️ Camera already registered: {camera.camera_id}")
+            return camera.camera_id
+        if not camera.start():
+            return None
+        self.sources[camera.camera_id] = camera
+        self.service.add_source(camera)
+        return camera.camera_id
+
+    def remove_camera(self, camera_id: str):
+        camera = self.sources.pop(camera_id, None)
+        if camera:
+            self.service.remove_source(camera_id)
+            camera.stop()
+
+    def start(self):
+        if self.recorder:
+            self.recorder.start()
+        self.service.start()
+
+    def stop(self):
+        self.service.stop()
+        for camera in self.sources.values():
+            camera.stop()
+        self.sources.clear()
+        if self.recorder:
+            self.recorder.stop()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        return self.service.get_camera_stats()
@@ -2,11 +2,11 @@
 Advanced confidence scoring and validation for face recognition
 """
 import numpy as np
-from typing import List, Dict, Tuple, Optional
+from typing import Callable, List, Dict, Tuple, Optional
 import cv2
-from sklearn.metrics.pairwise import cosine_similarity
 import time
 from collections import deque
+from app.services.face.head_pose import HeadPose
 
 class ConfidenceValidator:
     """Advanced confidence scoring and validation system"""
@@ -14,15 +14,28 @@ class ConfidenceValidator:
     def __init__(self, 
                  min_confidence: float = 0.6,
                  temporal_window: int = 5,
-                 consistency_threshold: float = 0.8):
+                 consistency_threshold: float = 0.8,
+                 distance_fn: Optional[Callable[[np.ndarray, np.ndarray], np.ndarray]] = None,
+                 match_threshold: float = 0.5):
         self.min_confidence = min_confidence
         self.temporal_window = temporal_window
         self.consistency_threshold = consistency_threshold
-        
-        # Temporal tracking
-        self.detection_history = deque(maxlen=temporal_window)
+        # Distance of the embedding backend (euclidean for dlib) and its match
+        # threshold, which maps to a basic confidence of 0.5
+        self.distance_fn = distance_fn or self._euclidean
+        self.match_threshold = match_threshold
+        
+        # Temporal tracking: L2-normalized encodings in a preallocated ring matrix
+        # (allocated on the first update, once the encoding size is known)
+        self._history_matrix: Optional[np.ndarray] = None
+        self._history_size = 0
+        self._history_next = 0
         self.confidence_history = deque(maxlen=temporal_window)
         
+        # Stacked gallery, rebuilt only when a different gallery object is passed in
+        self._gallery_source = None
+        self._gallery_matrix = np.empty((0, 0))
+        
         # Quality metrics
         self.face_quality_weights = {
             'brightness': 0.2,
@@ -36,16 +49,20 @@ class ConfidenceValidator:
                                     face_encoding: np.ndarray,
                                     known_encodings: List[np.ndarray],
                                     face_region: Tuple[int, int, int, int],
-                                    frame: np.ndarray) -> Dict:
+                                    frame: np.ndarray,
+                                    head_pose: Optional[HeadPose] = None) -> Dict:
         """Calculate advanced confidence score with multiple factors"""
         
         # Basic distance-based confidence
-        distances = np.linalg.norm(known_encodings - face_encoding, axis=1)
-        min_distance = np.min(distances)
-        basic_confidence = max(0, 1 - min_distance)
+        gallery = self._as_matrix(known_encodings)
+        if len(gallery):
+            min_distance = float(np.min(self.distance_fn(gallery, face_encoding)))
+            basic_confidence = max(0, 1 - 0.5 * min_distance / self.match_threshold)
+        else:
+            basic_confidence = 0.0
         
         # Face quality assessment
-        quality_score = self._assess_face_quality(face_region, frame)
+        quality_score = self._assess_face_quality(face_region, frame, head_pose)
         
         # Temporal consistency
         temporal_score = self._calculate_temporal_consistency(face_encoding)
@@ -65,8 +82,21 @@ class ConfidenceValidator:
             'is_valid': advanced_confidence >= self.min_confidence
         }
     
+    @staticmethod
+    def _euclidean(gallery: np.ndarray, embedding: np.ndarray) -> np.ndarray:
+        return np.linalg.norm(gallery - embedding, axis=1)
+    
+    def _as_matrix(self, known_encodings) -> np.ndarray:
+        """Return the gallery as a 2-D array, stacking a list only when the gallery changes"""
+        if isinstance(known_encodings, np.ndarray):
+            return known_encodings
+        if known_encodings is not self._gallery_source or len(known_encodings) != len(self._gallery_matrix):
+            self._gallery_source = known_encodings
+            self._gallery_matrix = np.array(known_encodings) if len(known_encodings) else np.empty((0, 0))
+        return self._gallery_matrix
+    
     def _assess_face_quality(self, face_region: Tuple[int, int, int, int], 
-                           frame: np.ndarray) -> float:
+                           frame: np.ndarray, head_pose: Optional[HeadPose] = None) -> float:
         """Assess face quality based on multiple factors"""
         x, y, w, h = face_region
         face_crop = frame[y:y+h, x:x+w]
@@ -94,7 +124,7 @@ class ConfidenceValidator:
         size_score = min(1.0, face_area / (100 * 100))  # Normalize to 100x100
         
         # Angle assessment (face orientation)
-        angle_score = self._assess_face_angle(face_crop)
+        angle_score = self._assess_face_angle(head_pose)
         
         # Weighted quality score
         quality_score = (
@@ -107,55 +137,47 @@ class ConfidenceValidator:
         
         return quality_score
     
-    def _assess_face_angle(self, face_crop: np.ndarray) -> float:
-        """Assess face angle (prefer frontal faces)"""
-        try:
-            # Use face landmarks to determine angle
-            # This is a simplified version - you could use dlib's landmark detection
-            gray = cv2.cvtColor(face_crop, cv2.COLOR_BGR2GRAY)
-            
-            # Detect eyes
-            eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-            eyes = eye_cascade.detectMultiScale(gray, 1.1, 3)
-            
-            if len(eyes) >= 2:
-                # Calculate angle between eyes
-                eye_centers = [(x + w//2, y + h//2) for (x, y, w, h) in eyes]
-                if len(eye_centers) >= 2:
-                    # Simple angle calculation
-                    dx = abs(eye_centers[1][0] - eye_centers[0][0])
-                    dy = abs(eye_centers[1][1] - eye_centers[0][1])
-                    angle = np.arctan2(dy, dx)
-                    
-                    # Prefer horizontal eye alignment (frontal face)
-                    angle_score = 1.0 - abs(angle) / (np.pi / 2)
-                    return max(0.0, angle_score)
-            
-            return 0.5  # Default score if eyes not detected
-        except:
-            return 0.5
+    def _assess_face_angle(self, head_pose: Optional[HeadPose]) -> float:
+        """Assess face angle (prefer frontal faces) from the landmark-based head pose"""
+        if head_pose is None:
+            return 0.5  # Default score if no landmarks were available
+        return head_pose.score()
     
     def _calculate_temporal_consistency(self, face_encoding: np.ndarray) -> float:
         """Calculate temporal consistency score"""
-        if not self.detection_history:
+        if not self._history_size:
             return 0.5  # Neutral score for first detection
         
-        # Calculate similarity with recent detections
-        similarities = []
-        for prev_encoding in self.detection_history:
-            if prev_encoding is not None:
-                similarity = cosine_similarity([face_encoding], [prev_encoding])[0][0]
-                similarities.append(similarity)
-        
-        if not similarities:
-            return 0.5
+        # Cosine similarity with every recent detection in one matrix-vector product
+        similarities = self._history_matrix[:self._history_size] @ self._normalize(face_encoding)
         
         # Return average similarity as consistency score
-        return np.mean(similarities)
+        return float(similarities.mean())
+    
+    @staticmethod
+    def _normalize(encoding: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(encoding)
+        return encoding / norm if norm > 0 else np.zeros_like(encoding, dtype=np.float64)
+    
+    @property
+    def detection_history(self) -> List[np.ndarray]:
+        """Recent (normalized) encodings, oldest first"""
+        if not self._history_size:
+            return []
+        order = np.roll(np.arange(self._history_size), -self._history_next) \
+            if self._history_size == self.temporal_window else np.arange(self._history_size)
+        return list(self._history_matrix[order])
     
     def update_temporal_history(self, face_encoding: np.ndarray, confidence: float):
         """Update temporal history for consistency tracking"""
-        self.detection_history.append(face_encoding)
+        if face_encoding is not None:
+            if self._history_matrix is None or self._history_matrix.shape[1] != len(face_encoding):
+                self._history_matrix = np.zeros((self.temporal_window, len(face_encoding)))
+                self._history_size = 0
+                self._history_next = 0
+            self._history_matrix[self._history_next] = self._normalize(face_encoding)
+            self._history_next = (self._history_next + 1) % self.temporal_window
+            self._history_size = min(self._history_size + 1, self.temporal_window)
         self.confidence_history.append(confidence)
     
     def validate_detection(self, detection: Dict) -> Dict:
@@ -214,69 +236,130 @@ class ConfidenceValidator:
     
     def reset_history(self):
         """Reset temporal history"""
-        self.detection_history.clear()
+        self._history_size = 0
+        self._history_next = 0
         self.confidence_history.clear()
 
+class _StudentWindow:
+    """Recent detections of one student with running mean/variance (Welford)"""
+    
+    __slots__ = ("entries", "count", "mean", "m2")
+    
+    def __init__(self, max_samples: int):
+        self.entries = deque(maxlen=max_samples)  # (timestamp, frame_id, confidence, detection)
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def push(self, entry: Tuple[float, int, float, Dict]):
+        if len(self.entries) == self.entries.maxlen:
+            self.pop_oldest()
+        self.entries.append(entry)
+        x = entry[2]
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+    
+    def pop_oldest(self):
+        x = self.entries.popleft()[2]
+        self.count -= 1
+        if self.count == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self.m2 = max(0.0, self.m2 - delta * (x - self.mean))
+    
+    def evict_before(self, cutoff: float):
+        while self.entries and self.entries[0][0] < cutoff:
+            self.pop_oldest()
+    
+    @property
+    def std(self) -> float:
+        # Population standard deviation, as np.std
+        return (self.m2 / self.count) ** 0.5 if self.count else 0.0
+
 class MultiFrameValidator:
-    """Validate detections across multiple frames"""
+    """
+    Validate detections across multiple frames.
     
-    def __init__(self, required_frames: int = 3, confidence_threshold: float = 0.7):
+    Each student keeps at most max_samples detections from the last
+    window_seconds, so memory stays flat during all-day sessions. Mean and
+    variance of the confidences are maintained incrementally, making
+    validate_student O(1).
+    """
+    
+    def __init__(self, required_frames: int = 3, confidence_threshold: float = 0.7,
+                 max_samples: int = 30, window_seconds: float = 10.0):
         self.required_frames = required_frames
         self.confidence_threshold = confidence_threshold
-        self.frame_detections = {}
-        self.validated_detections = {}
+        self.max_samples = max(required_frames, max_samples)
+        self.window_seconds = window_seconds
+        self._windows: Dict[str, _StudentWindow] = {}
     
-    def add_detection(self, frame_id: int, detection: Dict):
+    def add_detection(self, frame_id: int, detection: Dict, timestamp: Optional[float] = None):
         """Add detection from a frame"""
         student_id = detection.get('student_id')
         if not student_id:
             return
         
-        if student_id not in self.frame_detections:
-            self.frame_detections[student_id] = []
-        
-        self.frame_detections[student_id].append({
-            'frame_id': frame_id,
-            'confidence': detection.get('confidence', 0.0),
-            'detection': detection
-        })
+        now = time.monotonic() if timestamp is None else timestamp
+        window = self._windows.get(student_id)
+        if window is None:
+            window = self._windows[student_id] = _StudentWindow(self.max_samples)
+        window.evict_before(now - self.window_seconds)
+        window.push((now, frame_id, float(detection.get('confidence', 0.0)), detection))
+    
+    def _current_window(self, student_id: str, now: Optional[float]) -> Optional[_StudentWindow]:
+        window = self._windows.get(student_id)
+        if window is None:
+            return None
+        window.evict_before((time.monotonic() if now is None else now) - self.window_seconds)
+        if not window.count:
+            # Forget students who left, so the dict only holds recently seen faces
+            del self._windows[student_id]
+            return None
+        return window
     
-    def validate_student(self, student_id: str) -> bool:
+    def validate_student(self, student_id: str, now: Optional[float] = None) -> bool:
         """Validate if student has enough consistent detections"""
-        if student_id not in self.frame_detections:
-            return False
-        
-        detections = self.frame_detections[student_id]
+        window = self._current_window(student_id, now)
         
         # Check if we have enough frames
-        if len(detections) < self.required_frames:
+        if window is None or window.count < self.required_frames:
             return False
         
         # Check confidence consistency
-        confidences = [d['confidence'] for d in detections]
-        avg_confidence = np.mean(confidences)
-        
-        if avg_confidence < self.confidence_threshold:
+        if window.mean < self.confidence_threshold:
             return False
         
         # Check for consistency (low variance)
-        confidence_std = np.std(confidences)
-        if confidence_std > 0.3:  # High variance indicates inconsistency
+        if window.std > 0.3:  # High variance indicates inconsistency
             return False
         
         return True
     
-    def get_validated_detections(self) -> Dict:
+    def get_validated_detections(self, now: Optional[float] = None) -> Dict:
         """Get all validated detections"""
         validated = {}
-        for student_id in self.frame_detections:
-            if self.validate_student(student_id):
-                detections = self.frame_detections[student_id]
+        for student_id in list(self._windows):
+            if self.validate_student(student_id, now):
                 # Get the most recent detection
-                latest = max(detections, key=lambda x: x['frame_id'])
-                validated[student_id] = latest['detection']
+                validated[student_id] = self._windows[student_id].entries[-1][3]
         
         return validated
+    
+    def get_stats(self) -> Dict:
+        """Number of tracked students and buffered detections"""
+        return {
+            'students': len(self._windows),
+            'buffered_detections': sum(w.count for w in self._windows.values()),
+        }
+    
+    def reset(self):
+        self._windows.clear()
 
 # Example usage
 if __name__ == "__main__":
@@ -1,15 +1,12 @@
-import cv2
+from app.services.face.detector_backends import HaarFaceDetector
 
-face_cascade = cv2.CascadeClassifier("app/models/haarcascade_frontalface_default.xml")
+_haar_detector = HaarFaceDetector(
+    scale_factor=1.1,  # Smaller steps for better accuracy
+    min_neighbors=3,   # Reduced for faster detection
+    min_size=(80, 80), # Smaller minimum size for better detection
+)
 
 
 def detect_faces(gray_frame):
-    # Optimized parameters for faster detection
-    faces = face_cascade.detectMultiScale(
-        gray_frame, 
-        scaleFactor=1.1,  # Smaller steps for better accuracy
-        minNeighbors=3,   # Reduced for faster detection
-        minSize=(80, 80), # Smaller minimum size for better detection
-        flags=cv2.CASCADE_SCALE_IMAGE  # Use optimized scaling
-    )
-    return faces
+    # Haar backend of the pluggable detectors, returns (x, y, w, h) boxes
+    return _haar_detector.detect_gray(gray_frame)
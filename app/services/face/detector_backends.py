@@ -0,0 +1,266 @@
+"""
+Pluggable face detector backends
+
+All backends take an RGB image and return face locations as
+(top, right, bottom, left) tuples, the format face_recognition uses.
+
+- haar:    OpenCV Haar cascade (fastest, lowest recall)
+- hog:     dlib HOG through face_recognition (previous default)
+- cnn:     dlib CNN through face_recognition (slow on CPU)
+- dnn_ssd: OpenCV DNN res10 SSD (Caffe model files in app/models)
+- yunet:   OpenCV YuNet (ONNX model file in app/models)
+
+DNN model files are not bundled; download them into app/models:
+- deploy.prototxt + res10_300x300_ssd_iter_140000.caffemodel (OpenCV face_detector sample)
+- face_detection_yunet_2023mar.onnx (opencv_zoo)
+"""
+import os
+from typing import List, Tuple, Dict, Optional
+
+import cv2
+import numpy as np
+
+from app.services.face.model_registry import ModelRegistry, MODELS_DIR, FRONTAL_FACE
+from app.services.face.tracker import box_iou
+
+Location = Tuple[int, int, int, int]  # (top, right, bottom, left)
+
+SSD_PROTOTXT = os.path.join(MODELS_DIR, "deploy.prototxt")
+SSD_WEIGHTS = os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+YUNET_MODEL = os.path.join(MODELS_DIR, "face_detection_yunet_2023mar.onnx")
+
+
+class FaceDetector:
+    """Interface for face detector backends"""
+
+    name = "base"
+
+    def detect(self, rgb_image: np.ndarray) -> List[Location]:
+        """Return (top, right, bottom, left) face locations found in an RGB image"""
+        raise NotImplementedError
+
+    def landmarks_for(self, location: Location) -> Optional[np.ndarray]:
+        """
+        Five alignment landmarks (eyes, nose tip, mouth corners, as in the chip
+        template) the last detect() call found for a location, or None
+        """
+        return None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether the backend's dependencies and model files are present"""
+        return True
+
+
+def _clip_location(x1: int, y1: int, x2: int, y2: int, width: int, height: int) -> Location:
+    return (max(0, y1), min(width, x2), min(height, y2), max(0, x1))
+
+
+class HaarFaceDetector(FaceDetector):
+    name = "haar"
+
+    def __init__(self, scale_factor: float = 1.1, min_neighbors: int = 3, min_size: Tuple[int, int] = (40, 40)):
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def detect_gray(self, gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Haar detection on a grayscale image, returning (x, y, w, h) boxes"""
+        cascade = ModelRegistry.get_cascade(FRONTAL_FACE)
+        return cascade.detectMultiScale(
+            gray,
+            scaleFactor=self.scale_factor,
+            minNeighbors=self.min_neighbors,
+            minSize=self.min_size,
+            flags=cv2.CASCADE_SCALE_IMAGE,
+        )
+
+    def detect(self, rgb_image: np.ndarray) -> List[Location]:
+        gray = cv2.cvtColor(rgb_image, cv2.COLOR_RGB2GRAY)
+        return [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in self.detect_gray(gray)]
+
+
+class DlibFaceDetector(FaceDetector):
+    name = "hog"
+
+    def __init__(self, model: str = "hog", upsample: int = 1):
+        self.model = model
+        self.name = model
+        self.upsample = upsample
+
+    def detect(self, rgb_image: np.ndarray) -> List[Location]:
+        import face_recognition
+        return face_recognition.face_locations(rgb_image, number_of_times_to_upsample=self.upsample, model=self.model)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import face_recognition  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+
+class DnnSsdFaceDetector(FaceDetector):
+    """res10 SSD on OpenCV's DNN module, CPU target"""
+
+    name = "dnn_ssd"
+
+    def __init__(self, confidence_threshold: float = 0.6, input_size: Tuple[int, int] = (300, 300)):
+        self.confidence_threshold = confidence_threshold
+        self.input_size = input_size
+
+    @staticmethod
+    def _load():
+        net = cv2.dnn.readNetFromCaffe(SSD_PROTOTXT, SSD_WEIGHTS)
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        return net
+
+    def detect(self, rgb_image: np.ndarray) -> List[Location]:
+        net = ModelRegistry.get_dnn("res10_ssd", self._load)
+        height, width = rgb_image.shape[:2]
+        # The model was trained on BGR input; swapRB converts our RGB frame
+        # (the mean is given in the model's BGR order)
+        blob = cv2.dnn.blobFromImage(
+            cv2.resize(rgb_image, self.input_size), 1.0, self.input_size,
+            (104.0, 117.0, 123.0), swapRB=True, crop=False
+        )
+        net.setInput(blob)
+        detections = net.forward()
+
+        locations = []
+        for i in range(detections.shape[2]):
+            if detections[0, 0, i, 2] < self.confidence_threshold:
+                continue
+            x1, y1, x2, y2 = (detections[0, 0, i, 3:7] * np.array([width, height, width, height])).astype(int)
+            if x2 > x1 and y2 > y1:
+                locations.append(_clip_location(x1, y1, x2, y2, width, height))
+        return locations
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return os.path.isfile(SSD_PROTOTXT) and os.path.isfile(SSD_WEIGHTS)
+
+
+class YuNetFaceDetector(FaceDetector):
+    """YuNet (cv2.FaceDetectorYN), CPU"""
+
+    name = "yunet"
+
+    def __init__(self, score_threshold: float = 0.7, nms_threshold: float = 0.3):
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+        self.last_faces: Optional[np.ndarray] = None  # Raw rows incl. 5 landmarks, for alignment
+        self._landmarks: Dict[Location, np.ndarray] = {}
+
+    def _load(self):
+        return cv2.FaceDetectorYN.create(YUNET_MODEL, "", (320, 320), self.score_threshold, self.nms_threshold)
+
+    def detect(self, rgb_image: np.ndarray) -> List[Location]:
+        # One net per thread is shared by all YuNet detectors: apply this one's thresholds
+        detector = ModelRegistry.get_dnn("yunet", self._load)
+        detector.setScoreThreshold(self.score_threshold)
+        detector.setNMSThreshold(self.nms_threshold)
+        height, width = rgb_image.shape[:2]
+        detector.setInputSize((width, height))
+        _, faces = detector.detect(cv2.cvtColor(rgb_image, cv2.COLOR_RGB2BGR))
+        self.last_faces = faces
+
+        locations = []
+        self._landmarks = {}
+        if faces is not None:
+            for face in faces:
+                x, y, w, h = face[:4].astype(int)
+                if w > 0 and h > 0:
+                    location = _clip_location(x, y, x + w, y + h, width, height)
+                    locations.append(location)
+                    self._landmarks[location] = face[4:14].reshape(5, 2).astype(np.float32)
+        return locations
+
+    def landmarks_for(self, location: Location) -> Optional[np.ndarray]:
+        return self._landmarks.get(tuple(location))
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return os.path.isfile(YUNET_MODEL) and hasattr(cv2, "FaceDetectorYN")
+
+
+# name -> (class, default constructor arguments)
+DETECTOR_BACKENDS = {
+    "haar": (HaarFaceDetector, {}),
+    "hog": (DlibFaceDetector, {"model": "hog"}),
+    "cnn": (DlibFaceDetector, {"model": "cnn"}),
+    "dnn_ssd": (DnnSsdFaceDetector, {}),
+    "yunet": (YuNetFaceDetector, {}),
+}
+
+
+def available_backends() -> List[str]:
+    return [name for name, (cls, _) in DETECTOR_BACKENDS.items() if cls.is_available()]
+
+
+def create_face_detector(name: str = "hog", fallback: str = "hog", **kwargs) -> FaceDetector:
+    """
+    Build a detector backend by name.
+
+    Falls back to `fallback` (with a warning) if the backend's model files are missing.
+    """
+    if name not in DETECTOR_BACKENDS:
+        raise ValueError(f"Unknown face detector backend: {name}. Use one of {list(DETECTOR_BACKENDS)}")
+    if not DETECTOR_BACKENDS[name][0].is_available():
+        print(f"⚠️ Face detector '{name}' is not available (missing model files?), using '{fallback}'")
+        name = fallback
+    cls, defaults = DETECTOR_BACKENDS[name]
+    return cls(**{**defaults, **kwargs})
+
+
+def count_matches(detected: List[Location], expected: List[Location], min_iou: float = 0.5) -> int:
+    """Expected boxes matched one-to-one by a detection with IoU >= min_iou (greedy, best pairs first)"""
+    pairs = sorted(
+        ((box_iou(d, e), i, j) for i, d in enumerate(detected) for j, e in enumerate(expected)),
+        reverse=True,
+    )
+    used_detected, used_expected = set(), set()
+    for iou, i, j in pairs:
+        if iou < min_iou:
+            break
+        if i not in used_detected and j not in used_expected:
+            used_detected.add(i)
+            used_expected.add(j)
+    return len(used_expected)
+
+
+def benchmark_detector(detector: FaceDetector, rgb_images: List[np.ndarray],
+                       ground_truth: List[Optional[List[Location]]], repeats: int = 1,
+                       min_iou: float = 0.5) -> Dict:
+    """
+    Measure latency per megapixel and recall of a detector.
+
+    ground_truth gives the expected face boxes of each image. A box counts as
+    found only if a detection overlaps it with IoU >= min_iou, each detection
+    matching at most one box. None stands for one face whose box is unknown
+    (an unannotated enrollment photo); any detection counts for it.
+    """
+    import time
+    ms_per_mp = []
+    found = 0
+    for image, expected in zip(rgb_images, ground_truth):
+        megapixels = image.shape[0] * image.shape[1] / 1e6
+        locations = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            locations = detector.detect(image)
+            ms_per_mp.append((time.perf_counter() - started) * 1000 / megapixels)
+        if expected is None:
+            found += min(len(locations), 1)
+        else:
+            found += count_matches(locations, expected, min_iou)
+
+    total_expected = sum(1 if boxes is None else len(boxes) for boxes in ground_truth)
+    return {
+        "backend": detector.name,
+        "images": len(rgb_images),
+        "ms_per_megapixel": round(float(np.median(ms_per_mp)), 1) if ms_per_mp else 0.0,
+        "recall": round(found / total_expected, 3) if total_expected else 0.0,
+    }
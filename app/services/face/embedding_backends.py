@@ -0,0 +1,376 @@
+"""
+Pluggable face embedding backends
+
+All backends turn face locations, given as (top, right, bottom, left) in an
+RGB image, into fixed-length embeddings:
+
+- dlib:  dlib ResNet through face_recognition (128-d, euclidean distance).
+         Faces are encoded one at a time.
+- sface: OpenCV DNN SFace (128-d, cosine distance). Chips are aligned and
+         sent through the network as one batch per call.
+
+Embeddings from different backends are not comparable, even when their
+dimensions match. EmbeddingGallery records the backend that produced it,
+and mixing backends raises ValueError.
+
+The SFace model file is not bundled. Download it into app/models:
+- face_recognition_sface_2021dec.onnx (opencv_zoo)
+"""
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from app.services.face.model_registry import ModelRegistry, MODELS_DIR
+from app.services.face.detector_backends import FaceDetector, HaarFaceDetector
+from app.services.face.head_pose import landmarks_from_dlib
+
+Location = Tuple[int, int, int, int]  # (top, right, bottom, left)
+
+SFACE_MODEL = os.path.join(MODELS_DIR, "face_recognition_sface_2021dec.onnx")
+
+# Five-point landmark template (eyes, nose tip, mouth corners) of a 112x112 chip
+CHIP_SIZE = 112
+CHIP_TEMPLATE = np.array([
+    [38.2946, 51.6963],
+    [73.5318, 51.5014],
+    [56.0252, 71.7366],
+    [41.5493, 92.3655],
+    [70.7299, 92.2041],
+], dtype=np.float32)
+
+
+class EmbeddingBackend:
+    """Interface for face embedding backends"""
+
+    name = "base"
+    dim = 0
+    default_threshold = 0.5  # Largest distance still accepted as a match
+
+    def encode(self, rgb_image: np.ndarray, locations: List[Location],
+               landmarks: Optional[List[np.ndarray]] = None) -> List[np.ndarray]:
+        """Return one embedding per location, in order"""
+        raise NotImplementedError
+
+    def encode_with_landmarks(self, rgb_image: np.ndarray, locations: List[Location],
+                              alignment: Optional[List[Optional[np.ndarray]]] = None
+                              ) -> Tuple[List[np.ndarray], List[Optional[np.ndarray]]]:
+        """
+        Like encode, plus the dlib 5-point landmarks found along the way (None
+        if the backend has none). alignment optionally gives the detector's
+        five template-order landmarks per location (None where it has none).
+        """
+        return self.encode(rgb_image, locations, alignment), [None] * len(locations)
+
+    def distance(self, gallery: np.ndarray, embedding: np.ndarray) -> np.ndarray:
+        """Distances from embedding to every row of gallery (smaller is closer)"""
+        raise NotImplementedError
+
+    def encode_image(self, rgb_image: np.ndarray, detector: Optional[FaceDetector] = None) -> List[np.ndarray]:
+        """
+        Find and encode faces in a whole image (used for enrollment photos).
+
+        detector (a FaceDetector, Haar by default) should be the engine's, so
+        gallery rows are detected and aligned the same way as live faces.
+        """
+        detector = detector or HaarFaceDetector()
+        locations = detector.detect(rgb_image)
+        alignment = [detector.landmarks_for(location) for location in locations]
+        return self.encode_with_landmarks(rgb_image, locations, alignment)[0]
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether the backend's dependencies and model files are present"""
+        return True
+
+
+class DlibEmbeddingBackend(EmbeddingBackend):
+    name = "dlib"
+    dim = 128
+    default_threshold = 0.5
+
+    def encode(self, rgb_image: np.ndarray, locations: List[Location],
+               landmarks: Optional[List[np.ndarray]] = None) -> List[np.ndarray]:
+        import face_recognition
+        if not locations:
+            return []
+        return face_recognition.face_encodings(rgb_image, locations)
+
+    def encode_with_landmarks(self, rgb_image: np.ndarray, locations: List[Location],
+                              alignment: Optional[List[Optional[np.ndarray]]] = None
+                              ) -> Tuple[List[np.ndarray], List[Optional[np.ndarray]]]:
+        # Same steps as face_recognition.face_encodings, keeping the 5-point
+        # landmarks the encoder aligns with (reused for head pose)
+        if not locations:
+            return [], []
+        shapes = self._landmark_shapes(rgb_image, locations)
+        from face_recognition import api
+        encodings = [np.array(api.face_encoder.compute_face_descriptor(rgb_image, shape, 1)) for shape in shapes]
+        return encodings, [landmarks_from_dlib(shape) for shape in shapes]
+
+    def landmarks(self, rgb_image: np.ndarray, locations: List[Location]) -> List[np.ndarray]:
+        """5-point landmarks only, without encoding"""
+        return [landmarks_from_dlib(shape) for shape in self._landmark_shapes(rgb_image, locations)]
+
+    @staticmethod
+    def _landmark_shapes(rgb_image: np.ndarray, locations: List[Location]):
+        from face_recognition import api
+        return api._raw_face_landmarks(rgb_image, locations, model="small")
+
+    def distance(self, gallery: np.ndarray, embedding: np.ndarray) -> np.ndarray:
+        if len(gallery) == 0:
+            return np.empty((0,))
+        return np.linalg.norm(np.asarray(gallery) - embedding, axis=1)
+
+    def encode_image(self, rgb_image: np.ndarray, detector: Optional[FaceDetector] = None) -> List[np.ndarray]:
+        # dlib galleries keep face_recognition's own HOG detection
+        import face_recognition
+        return face_recognition.face_encodings(rgb_image)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import face_recognition  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+
+def alignment_from_dlib(points: np.ndarray) -> np.ndarray:
+    """
+    Eye centres (image-left first) and nose from dlib's 5-point landmarks,
+    matching the first three chip template points. dlib marks the nose base
+    rather than the tip, a few pixels off, which the similarity fit absorbs.
+    """
+    points = np.asarray(points, dtype=np.float32).reshape(5, 2)
+    eyes = sorted((points[0:2].mean(axis=0), points[2:4].mean(axis=0)), key=lambda p: p[0])
+    return np.array([eyes[0], eyes[1], points[4]], dtype=np.float32)
+
+
+def align_chip(rgb_image: np.ndarray, location: Location, landmarks: Optional[np.ndarray] = None,
+               size: int = CHIP_SIZE) -> np.ndarray:
+    """
+    Cut a size x size face chip.
+
+    With five template-order landmarks (e.g. YuNet's), or the first three of
+    them (see alignment_from_dlib), the face is warped onto the chip template;
+    otherwise a square crop around the box is resized.
+    """
+    if landmarks is not None and len(landmarks) in (3, 5):
+        points = len(landmarks)
+        matrix, _ = cv2.estimateAffinePartial2D(
+            np.asarray(landmarks, dtype=np.float32).reshape(points, 2),
+            CHIP_TEMPLATE[:points] * (size / CHIP_SIZE),
+            method=cv2.LMEDS,
+        )
+        if matrix is not None:
+            return cv2.warpAffine(rgb_image, matrix, (size, size))
+
+    top, right, bottom, left = location
+    height, width = rgb_image.shape[:2]
+    side = max(right - left, bottom - top) * 1.1
+    cx, cy = (left + right) / 2.0, (top + bottom) / 2.0
+    x1, y1 = int(max(0, cx - side / 2)), int(max(0, cy - side / 2))
+    x2, y2 = int(min(width, cx + side / 2)), int(min(height, cy + side / 2))
+    crop = rgb_image[y1:y2, x1:x2]
+    if crop.size == 0:
+        crop = rgb_image
+    return cv2.resize(crop, (size, size))
+
+
+class SFaceEmbeddingBackend(EmbeddingBackend):
+    """SFace on OpenCV's DNN module, CPU target, batched forward pass"""
+
+    name = "sface"
+    dim = 128
+    default_threshold = 0.363  # 1 - 0.637, OpenCV's recommended cosine similarity cut-off
+
+    @staticmethod
+    def _load():
+        net = cv2.dnn.readNet(SFACE_MODEL)
+        net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        return net
+
+    def encode(self, rgb_image: np.ndarray, locations: List[Location],
+               landmarks: Optional[List[np.ndarray]] = None) -> List[np.ndarray]:
+        if not locations:
+            return []
+        chips = [
+            align_chip(rgb_image, location, landmarks[i] if landmarks is not None else None)
+            for i, location in enumerate(locations)
+        ]
+        return list(self.encode_chips(chips))
+
+    def encode_with_landmarks(self, rgb_image: np.ndarray, locations: List[Location],
+                              alignment: Optional[List[Optional[np.ndarray]]] = None
+                              ) -> Tuple[List[np.ndarray], List[Optional[np.ndarray]]]:
+        if not locations:
+            return [], []
+        chips, pose_landmarks = self.aligned_chips(rgb_image, locations, alignment)
+        return list(self.encode_chips(chips)), pose_landmarks
+
+    def aligned_chips(self, rgb_image: np.ndarray, locations: List[Location],
+                      alignment: Optional[List[Optional[np.ndarray]]] = None
+                      ) -> Tuple[List[np.ndarray], List[Optional[np.ndarray]]]:
+        """
+        Template-aligned chips for the locations, plus dlib landmarks (for head
+        pose) where they were computed. SFace expects aligned chips: the
+        detector's landmarks are used where given, else dlib's 5-point ones.
+        """
+        alignment = list(alignment) if alignment is not None else [None] * len(locations)
+        pose_landmarks: List[Optional[np.ndarray]] = [None] * len(locations)
+        missing = [i for i, points in enumerate(alignment) if points is None]
+        if missing and DlibEmbeddingBackend.is_available():
+            found = DlibEmbeddingBackend().landmarks(rgb_image, [locations[i] for i in missing])
+            for i, points in zip(missing, found):
+                pose_landmarks[i] = points
+                alignment[i] = alignment_from_dlib(points)
+        chips = [align_chip(rgb_image, location, points) for location, points in zip(locations, alignment)]
+        return chips, pose_landmarks
+
+    def encode_chips(self, chips: List[np.ndarray]) -> np.ndarray:
+        """Encode aligned RGB chips in one forward pass; rows are L2-normalized"""
+        net = ModelRegistry.get_dnn("sface", self._load)
+        # The network takes RGB input; the chips already are RGB
+        blob = cv2.dnn.blobFromImages(chips, 1.0, (CHIP_SIZE, CHIP_SIZE), (0, 0, 0), swapRB=False, crop=False)
+        net.setInput(blob)
+        features = net.forward().reshape(len(chips), -1).astype(np.float64)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return features / np.maximum(norms, 1e-12)
+
+    def distance(self, gallery: np.ndarray, embedding: np.ndarray) -> np.ndarray:
+        if len(gallery) == 0:
+            return np.empty((0,))
+        # Both sides are unit vectors, so cosine distance is 1 - dot product
+        return 1.0 - np.asarray(gallery) @ embedding
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return os.path.isfile(SFACE_MODEL)
+
+
+EMBEDDING_BACKENDS = {
+    "dlib": DlibEmbeddingBackend,
+    "sface": SFaceEmbeddingBackend,
+}
+
+
+def available_embedding_backends() -> List[str]:
+    return [name for name, cls in EMBEDDING_BACKENDS.items() if cls.is_available()]
+
+
+def create_embedding_backend(name: str = "dlib", fallback: str = "dlib") -> EmbeddingBackend:
+    """
+    Build an embedding backend by name.
+
+    Falls back to `fallback` (with a warning) if the backend's model file is missing.
+    """
+    if name not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {name}. Use one of {list(EMBEDDING_BACKENDS)}")
+    if not EMBEDDING_BACKENDS[name].is_available():
+        print(f"⚠️ Embedding backend '{name}' is not available (missing model file?), using '{fallback}'")
+        name = fallback
+    return EMBEDDING_BACKENDS[name]()
+
+
+class EmbeddingGallery:
+    """
+    Known-face embeddings tagged with the backend and dimension that produced them.
+
+    Unpacks like the (encodings, student_ids, student_info) tuple returned by
+    earlier versions of load_known_faces_from_directory.
+    """
+
+    def __init__(self, backend: str, dim: int):
+        self.backend = backend
+        self.dim = dim
+        self.encodings: List[np.ndarray] = []
+        self.student_ids: List[str] = []
+        self.student_info: List[Dict] = []
+
+    def add(self, encoding: np.ndarray, student_id: str, student_info: Dict):
+        encoding = np.asarray(encoding)
+        if encoding.shape != (self.dim,):
+            raise ValueError(
+                f"Embedding of shape {encoding.shape} does not fit a {self.backend} gallery of dimension {self.dim}"
+            )
+        self.encodings.append(encoding)
+        self.student_ids.append(student_id)
+        self.student_info.append(student_info)
+
+    def check_compatible(self, backend: EmbeddingBackend):
+        """Raise ValueError if this gallery was built by a different backend"""
+        if self.backend != backend.name or self.dim != backend.dim:
+            raise ValueError(
+                f"Gallery was built with '{self.backend}' ({self.dim}-d) embeddings; "
+                f"it cannot be matched with '{backend.name}' ({backend.dim}-d). Rebuild the gallery."
+            )
+
+    @property
+    def size(self) -> int:
+        return len(self.encodings)
+
+    def __iter__(self):
+        return iter((self.encodings, self.student_ids, self.student_info))
+
+    def __getitem__(self, index):
+        return (self.encodings, self.student_ids, self.student_info)[index]
+
+
+def benchmark_embedding_backend(backend: EmbeddingBackend,
+                                samples: List[Tuple[np.ndarray, Location, str]],
+                                batch_size: int = 16,
+                                alignment: Optional[List[Optional[np.ndarray]]] = None) -> Dict:
+    """
+    Measure throughput and leave-one-out identification accuracy.
+
+    samples are (rgb_image, face_location, label) triples, e.g. the enrollment
+    photos with one face each; alignment optionally gives the detector's
+    landmarks per sample (FaceDetector.landmarks_for). Faces go through the
+    same encode_with_landmarks path as live frames, in batches of batch_size
+    (dlib still encodes them one by one inside a batch). A sample counts as
+    correct when its nearest other sample has the same label and lies within
+    the backend's default threshold.
+    """
+    if alignment is None:
+        alignment = [None] * len(samples)
+    embeddings: List[np.ndarray] = []
+    elapsed = 0.0
+    for start in range(0, len(samples), batch_size):
+        batch = list(zip(samples[start:start + batch_size], alignment[start:start + batch_size]))
+        started = time.perf_counter()
+        if isinstance(backend, SFaceEmbeddingBackend):
+            # Align per image, then one forward pass for the batch
+            chips = [backend.aligned_chips(image, [location], [points])[0][0]
+                     for (image, location, _), points in batch]
+            encoded = list(backend.encode_chips(chips))
+        else:
+            encoded = [backend.encode_with_landmarks(image, [location], [points])[0][0]
+                       for (image, location, _), points in batch]
+        elapsed += time.perf_counter() - started
+        embeddings.extend(encoded)
+
+    labels = [label for _, _, label in samples]
+    matrix = np.array(embeddings)
+    correct = 0
+    evaluated = 0
+    for i, embedding in enumerate(embeddings):
+        distances = backend.distance(matrix, embedding)
+        distances[i] = np.inf
+        # Only faces whose identity appears elsewhere in the set can be identified
+        if labels.count(labels[i]) < 2:
+            continue
+        evaluated += 1
+        nearest = int(np.argmin(distances))
+        if labels[nearest] == labels[i] and distances[nearest] <= backend.default_threshold:
+            correct += 1
+
+    return {
+        "backend": backend.name,
+        "faces": len(samples),
+        "faces_per_second": round(len(samples) / elapsed, 1) if elapsed > 0 else 0.0,
+        "accuracy": round(correct / evaluated, 3) if evaluated else 0.0,
+    }
@@ -0,0 +1,218 @@
+"""
+Shared-memory frame ring buffer for passing frames between processes
+
+Capture processes write frames into preallocated slots of one
+multiprocessing.shared_memory block; recognition workers receive only
+(slot, seq) pairs and read the pixels in place, so a 640x480x3 frame is
+never pickled and one camera can fan out to several workers.
+
+Each slot has a sequence number in the header. The writer marks a slot as
+busy (-1) while copying, then publishes the new sequence number; readers
+compare the sequence before and after reading to detect frames that were
+overwritten in the meantime (seqlock).
+"""
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Overwrite policies
+OVERWRITE_OLDEST = "overwrite"   # Always write; readers of stale slots get None
+SKIP_IF_UNREAD = "skip_unread"   # Drop the new frame if the next slot was never read
+
+_WRITING = -1
+
+
+class SharedFrameRing:
+    """Fixed-size ring of uint8 frames in shared memory"""
+
+    def __init__(self, slots: int = 8, frame_shape: Tuple[int, int, int] = (480, 640, 3),
+                 name: Optional[str] = None, create: bool = True, policy: str = OVERWRITE_OLDEST):
+        if policy not in (OVERWRITE_OLDEST, SKIP_IF_UNREAD):
+            raise ValueError(f"Unknown overwrite policy: {policy}")
+        self.slots = int(slots)
+        self.frame_shape = tuple(frame_shape)
+        self.policy = policy
+        self.owner = create
+
+        frame_bytes = int(np.prod(self.frame_shape))
+        # Header: seq per slot, read flag per slot, write counter, frames dropped
+        header_items = 2 * self.slots + 2
+        header_bytes = header_items * 8
+        size = header_bytes + self.slots * frame_bytes
+
+        if create:
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = _attach_shm(name)
+
+        self._header = np.ndarray((header_items,), dtype=np.int64, buffer=self._shm.buf)
+        self._seqs = self._header[:self.slots]
+        self._read_flags = self._header[self.slots:2 * self.slots]
+        self._frames = np.ndarray(
+            (self.slots,) + self.frame_shape, dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes
+        )
+        if create:
+            self._header[:] = 0
+            self._read_flags[:] = 1  # Empty slots may be overwritten
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def handle(self) -> Dict:
+        """Picklable description used to attach from another process"""
+        return {"name": self.name, "slots": self.slots, "frame_shape": self.frame_shape, "policy": self.policy}
+
+    @classmethod
+    def attach(cls, handle: Dict) -> "SharedFrameRing":
+        """Attach to a ring created by another process"""
+        return cls(slots=handle["slots"], frame_shape=handle["frame_shape"], name=handle["name"],
+                   create=False, policy=handle.get("policy", OVERWRITE_OLDEST))
+
+    # ========== WRITER ==========
+
+    def write(self, frame: np.ndarray) -> Optional[Tuple[int, int]]:
+        """
+        Copy a frame into the next slot.
+
+        Returns (slot, seq) to hand to readers, or None if the frame was dropped
+        by the SKIP_IF_UNREAD policy. Only one process may write to a ring.
+        """
+        if frame.shape != self.frame_shape or frame.dtype != np.uint8:
+            raise ValueError(f"Frame must be uint8 {self.frame_shape}, got {frame.dtype} {frame.shape}")
+
+        counter = self._header[2 * self.slots]
+        slot = int(counter % self.slots)
+        if self.policy == SKIP_IF_UNREAD and not self._read_flags[slot]:
+            self._header[2 * self.slots + 1] += 1
+            return None
+
+        seq = int(counter) + 1
+        self._seqs[slot] = _WRITING
+        self._frames[slot][...] = frame
+        self._read_flags[slot] = 0
+        self._seqs[slot] = seq
+        self._header[2 * self.slots] = seq
+        return slot, seq
+
+    # ========== READERS ==========
+
+    def read(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """Return a private copy of the frame, or None if the slot was overwritten"""
+        if self._seqs[slot] != seq:
+            return None
+        frame = self._frames[slot].copy()
+        if self._seqs[slot] != seq:
+            return None  # Overwritten while copying
+        self._read_flags[slot] = 1
+        return frame
+
+    def view(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """
+        Zero-copy, read-only view of the slot.
+
+        The writer may overwrite the slot at any time; call is_current(slot, seq)
+        after using the view and discard the result if it returns False.
+        """
+        if self._seqs[slot] != seq:
+            return None
+        view = self._frames[slot]
+        view.flags.writeable = False
+        self._read_flags[slot] = 1
+        return view
+
+    def is_current(self, slot: int, seq: int) -> bool:
+        return bool(self._seqs[slot] == seq)
+
+    def latest(self) -> Optional[Tuple[int, int]]:
+        """(slot, seq) of the most recently written frame"""
+        seq = int(self._header[2 * self.slots])
+        if seq == 0:
+            return None
+        return (seq - 1) % self.slots, seq
+
+    def stats(self) -> Dict:
+        return {
+            "frames_written": int(self._header[2 * self.slots]),
+            "frames_dropped": int(self._header[2 * self.slots + 1]),
+            "slots": self.slots,
+        }
+
+    # ========== CLEANUP ==========
+
+    def close(self):
+        """Detach this process; the owner also removes the shared block"""
+        if self._shm is None:
+            return
+        # Drop numpy views first, otherwise the buffer cannot be released
+        self._header = self._seqs = self._read_flags = self._frames = None
+        try:
+            self._shm.close()
+            if self.owner:
+                self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _attach_shm(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without taking ownership of it.
+
+    Python 3.13+ can skip resource tracking for attached blocks. On older
+    versions, processes started through multiprocessing share the creator's
+    resource tracker, so the extra registration is harmless.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name, create=False)
+
+
+def capture_to_ring(source, handle: Dict, frame_queues, stop_event, fps_limit: float = 0.0):
+    """
+    Capture process target: read frames from a camera/file into the ring and
+    announce (slot, seq, capture_time) on every worker queue.
+
+    Frames are resized to the ring's frame shape if needed.
+    """
+    import cv2
+    ring = SharedFrameRing.attach(handle)
+    cap = cv2.VideoCapture(source)
+    height, width = ring.frame_shape[:2]
+    interval = 1.0 / fps_limit if fps_limit > 0 else 0.0
+    try:
+        while not stop_event.is_set() and cap.isOpened():
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                break
+            if frame.shape[:2] != (height, width):
+                frame = cv2.resize(frame, (width, height))
+            ref = ring.write(frame)
+            if ref is None:
+                continue
+            message = (ref[0], ref[1], time.time())
+            for queue in frame_queues:
+                try:
+                    queue.put_nowait(message)
+                except Exception:
+                    pass  # Worker is behind; it will skip to newer frames
+            if interval:
+                time.sleep(interval)
+    finally:
+        cap.release()
+        ring.close()
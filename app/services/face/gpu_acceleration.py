@@ -1,124 +1,114 @@
 """
-GPU acceleration for face recognition
+Hardware acceleration and performance monitoring for face recognition
 """
 import cv2
 import numpy as np
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import time
+from app.services.face.model_registry import ModelRegistry, FRONTAL_FACE
 
-class GPUAcceleratedRecognition:
-    """GPU-accelerated face recognition using OpenCV DNN and CUDA"""
-    
-    def __init__(self):
-        self.gpu_available = self._check_gpu_support()
-        self.face_detector = None
-        self.face_recognizer = None
-        self._init_models()
-    
-    def _check_gpu_support(self) -> bool:
-        """Check if GPU acceleration is available"""
+class TransparentAccelerator:
+    """
+    CPU-first acceleration through OpenCV's transparent API (T-API).
+
+    Images are wrapped in cv2.UMat so resize, color conversion, CLAHE and
+    Haar detection run as OpenCL kernels when a device is present (integrated
+    GPUs included). Without OpenCL the same calls run on plain ndarrays.
+    Every public method takes and returns ndarrays.
+
+    mode: "auto" (UMat only if OpenCL is usable), "umat" (always UMat, which
+    OpenCV runs on the CPU when OpenCL is missing) or "numpy" (never UMat).
+    """
+    
+    MODES = ("auto", "umat", "numpy")
+    
+    def __init__(self, mode: str = "auto"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown accelerator mode: {mode}. Use one of {self.MODES}")
+        previous_use_opencl = cv2.ocl.useOpenCL()
+        self.opencl_available = self._check_opencl_support()
+        if mode == "auto":
+            self.use_umat = self.opencl_available
+        else:
+            self.use_umat = mode == "umat"
+        # setUseOpenCL is process-wide: leave it on only for the UMat path
+        if not (self.use_umat and self.opencl_available):
+            cv2.ocl.setUseOpenCL(previous_use_opencl)
+        self.mode = mode
+        self._clahe = {}
+    
+    @staticmethod
+    def _check_opencl_support() -> bool:
+        """Enable OpenCL in OpenCV if a device is present"""
         try:
-            # Check OpenCV CUDA support
-            if cv2.cuda.getCudaEnabledDeviceCount() > 0:
-                print("✅ CUDA GPU support detected")
-                return True
-            else:
-                print("⚠️ No CUDA GPU support in OpenCV")
+            if not cv2.ocl.haveOpenCL():
                 return False
+            cv2.ocl.setUseOpenCL(True)
+            return cv2.ocl.useOpenCL()
         except Exception as e:
-            print(f"⚠️ GPU check failed: {e}")
+            print(f"⚠️ OpenCL check failed: {e}")
             return False
     
-    def _init_models(self):
-        """Initialize GPU-accelerated models"""
-        if self.gpu_available:
+    @property
+    def backend_name(self) -> str:
+        if not self.use_umat:
+            return "numpy"
+        if self.opencl_available:
             try:
-                # Load DNN face detection model
-                self._load_dnn_face_detector()
-                print("✅ GPU-accelerated models loaded")
-            except Exception as e:
-                print(f"⚠️ Failed to load GPU models: {e}")
-                self.gpu_available = False
-    
-    def _load_dnn_face_detector(self):
-        """Load DNN-based face detector for GPU acceleration"""
-        # You can download these models from OpenCV's GitHub
-        # For now, we'll use a placeholder approach
-        try:
-            # Example: OpenPose or other DNN models
-            # This is a simplified version - you'd need actual model files
-            print("🔄 Loading DNN face detector...")
-            # self.face_detector = cv2.dnn.readNetFromTensorflow('face_detector.pb')
-            # self.face_detector.setPreferableBackend(cv2.dnn.DNN_BACKEND_CUDA)
-            # self.face_detector.setPreferableTarget(cv2.dnn.DNN_TARGET_CUDA)
-        except Exception as e:
-            print(f"⚠️ DNN model loading failed: {e}")
-    
-    def detect_faces_gpu(self, frame: np.ndarray) -> List[tuple]:
-        """Detect faces using GPU acceleration"""
-        if not self.gpu_available or self.face_detector is None:
-            # Fallback to CPU detection
-            return self._detect_faces_cpu(frame)
-        
-        try:
-            # Create blob from image
-            blob = cv2.dnn.blobFromImage(
-                frame, 1.0, (300, 300), 
-                [104, 117, 123], swapRB=False, crop=False
-            )
-            
-            # Set input and run inference
-            self.face_detector.setInput(blob)
-            detections = self.face_detector.forward()
-            
-            # Process detections
-            faces = []
-            h, w = frame.shape[:2]
-            
-            for i in range(detections.shape[2]):
-                confidence = detections[0, 0, i, 2]
-                if confidence > 0.5:  # Confidence threshold
-                    x1 = int(detections[0, 0, i, 3] * w)
-                    y1 = int(detections[0, 0, i, 4] * h)
-                    x2 = int(detections[0, 0, i, 5] * w)
-                    y2 = int(detections[0, 0, i, 6] * h)
-                    faces.append((x1, y1, x2-x1, y2-y1))
-            
-            return faces
-            
-        except Exception as e:
-            print(f"⚠️ GPU face detection failed: {e}")
-            return self._detect_faces_cpu(frame)
-    
-    def _detect_faces_cpu(self, frame: np.ndarray) -> List[tuple]:
-        """Fallback CPU face detection"""
-        face_cascade = cv2.CascadeClassifier("app/models/haarcascade_frontalface_default.xml")
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 5)
-        return [(x, y, w, h) for (x, y, w, h) in faces]
-    
-    def process_frame_gpu(self, frame: np.ndarray) -> np.ndarray:
-        """Process frame with GPU acceleration"""
-        if not self.gpu_available:
-            return frame
-        
-        try:
-            # Upload frame to GPU
-            gpu_frame = cv2.cuda_GpuMat()
-            gpu_frame.upload(frame)
-            
-            # Apply GPU operations
-            # Example: Gaussian blur on GPU
-            gpu_blurred = cv2.cuda.GaussianBlur(gpu_frame, (5, 5), 0)
-            
-            # Download result back to CPU
-            result = gpu_blurred.download()
-            
-            return result
-            
-        except Exception as e:
-            print(f"⚠️ GPU processing failed: {e}")
-            return frame
+                return f"opencl ({cv2.ocl.Device.getDefault().name()})"
+            except Exception:
+                return "opencl"
+        return "umat (cpu)"
+    
+    def _upload(self, image):
+        if self.use_umat and not isinstance(image, cv2.UMat):
+            return cv2.UMat(image)
+        return image
+    
+    @staticmethod
+    def _download(image) -> np.ndarray:
+        return image.get() if isinstance(image, cv2.UMat) else image
+    
+    def _get_clahe(self, clip_limit: float, tile_grid_size: Tuple[int, int]):
+        key = (clip_limit, tile_grid_size)
+        clahe = self._clahe.get(key)
+        if clahe is None:
+            clahe = self._clahe[key] = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=tile_grid_size)
+        return clahe
+    
+    def resize(self, image: np.ndarray, fx: float, fy: Optional[float] = None,
+               interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        return self._download(cv2.resize(self._upload(image), (0, 0), fx=fx, fy=fy or fx,
+                                         interpolation=interpolation))
+    
+    def cvt_color(self, image: np.ndarray, code: int) -> np.ndarray:
+        return self._download(cv2.cvtColor(self._upload(image), code))
+    
+    def clahe(self, gray: np.ndarray, clip_limit: float = 2.0,
+              tile_grid_size: Tuple[int, int] = (8, 8)) -> np.ndarray:
+        return self._download(self._get_clahe(clip_limit, tile_grid_size).apply(self._upload(gray)))
+    
+    def equalize_lightness(self, image_bgr: np.ndarray, clip_limit: float = 2.0,
+                           tile_grid_size: Tuple[int, int] = (8, 8)) -> np.ndarray:
+        """CLAHE on the L channel in LAB space (the preprocessor's lighting normalization)"""
+        lab = cv2.cvtColor(self._upload(image_bgr), cv2.COLOR_BGR2LAB)
+        l, a, b = cv2.split(lab)
+        l = self._get_clahe(clip_limit, tile_grid_size).apply(l)
+        return self._download(cv2.cvtColor(cv2.merge([l, a, b]), cv2.COLOR_LAB2BGR))
+    
+    def downscale_to_rgb(self, image_bgr: np.ndarray, factor: float) -> np.ndarray:
+        """Resize and convert BGR->RGB with a single upload/download"""
+        small = cv2.resize(self._upload(image_bgr), (0, 0), fx=factor, fy=factor)
+        return self._download(cv2.cvtColor(small, cv2.COLOR_BGR2RGB))
+    
+    def detect_faces(self, image_bgr: np.ndarray, scale_factor: float = 1.1, min_neighbors: int = 5,
+                     min_size: Tuple[int, int] = (30, 30)) -> List[tuple]:
+        """Haar face detection, returning (x, y, w, h) boxes"""
+        face_cascade = ModelRegistry.get_cascade(FRONTAL_FACE)
+        gray = cv2.cvtColor(self._upload(image_bgr), cv2.COLOR_BGR2GRAY)
+        faces = face_cascade.detectMultiScale(gray, scale_factor, min_neighbors, minSize=min_size)
+        return [tuple(int(v) for v in face) for face in faces]
+
 
 class PerformanceMonitor:
     """Monitor face recognition performance"""
@@ -128,6 +118,15 @@ class PerformanceMonitor:
         self.detection_times = []
         self.recognition_times = []
         self.fps_history = []
+        self.counters = {}
+        
+        try:
+            from app.utils.performance_config import PerformanceConfig
+            thread_budget = PerformanceConfig.get_applied_thread_budget()
+            if thread_budget:
+                self.counters["thread_budget"] = thread_budget
+        except ImportError:
+            pass
     
     def start_frame_timer(self):
         """Start timing a frame"""
@@ -144,6 +143,10 @@ class PerformanceMonitor:
         if len(self.fps_history) > 100:
             self.fps_history = self.fps_history[-100:]
     
+    def update_counters(self, name: str, values: Dict):
+        """Publish a named group of counters (e.g. quality gate rejections)"""
+        self.counters[name] = values
+    
     def get_average_fps(self) -> float:
         """Get average FPS over recent frames"""
         if not self.fps_history:
@@ -153,7 +156,7 @@ class PerformanceMonitor:
     def get_performance_stats(self) -> Dict:
         """Get comprehensive performance statistics"""
         if not self.fps_history:
-            return {"fps": 0, "frame_time": 0, "status": "No data"}
+            return {"fps": 0, "frame_time": 0, "status": "No data", **self.counters}
         
         avg_fps = self.get_average_fps()
         avg_frame_time = sum(self.frame_times) / len(self.frame_times) if self.frame_times else 0
@@ -164,7 +167,8 @@ class PerformanceMonitor:
             "fps": round(avg_fps, 2),
             "frame_time_ms": round(avg_frame_time * 1000, 2),
             "status": status,
-            "samples": len(self.fps_history)
+            "samples": len(self.fps_history),
+            **self.counters
         }
 
 def optimize_for_gpu():
@@ -183,6 +187,15 @@ def optimize_for_gpu():
     except ImportError:
         print("ℹ️ PyTorch not installed")
     
+    # Check OpenCV OpenCL (used by TransparentAccelerator)
+    try:
+        if cv2.ocl.haveOpenCL():
+            print("✅ OpenCV OpenCL available (transparent API / UMat)")
+        else:
+            print("ℹ️ No OpenCL device - transparent API runs on the CPU")
+    except Exception:
+        print("⚠️ OpenCV OpenCL check failed")
+    
     # Check OpenCV CUDA
     try:
         if cv2.cuda.getCudaEnabledDeviceCount() > 0:
@@ -200,15 +213,16 @@ def optimize_for_gpu():
     print("5. Consider using TensorRT for NVIDIA GPUs")
 
 if __name__ == "__main__":
-    # Test GPU acceleration
-    gpu_recognition = GPUAcceleratedRecognition()
+    # Test transparent API acceleration
+    accelerator = TransparentAccelerator()
     monitor = PerformanceMonitor()
+    print(f"Accelerator backend: {accelerator.backend_name}")
     
     # Test with sample frame
     test_frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
     
     monitor.start_frame_timer()
-    faces = gpu_recognition.detect_faces_gpu(test_frame)
+    faces = accelerator.detect_faces(test_frame)
     monitor.end_frame_timer()
     
     stats = monitor.get_performance_stats()
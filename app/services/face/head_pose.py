@@ -0,0 +1,109 @@
+"""
+Head pose from facial landmarks
+
+Yaw, pitch and roll come from cv2.solvePnP on the landmarks dlib already
+computes for the face encoder (the 5-point model used by
+face_recognition.face_encodings, or the 68-point model). No extra detector
+runs per face; a pose costs roughly 0.1-0.2 ms.
+
+Angles are in degrees. For a face looking straight at the camera all three
+are near 0; yaw is positive when the face turns towards the image's right,
+pitch is positive when it looks up, and roll is positive when it tilts clockwise.
+"""
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+# Generic face model in millimetres, origin at the bottom of the nose,
+# x to the image's right, y down and z away from the camera.
+# dlib 5-point order: image-right eye (outer, inner), image-left eye (outer, inner), nose base.
+MODEL_POINTS_5 = np.array([
+    [45.0, -38.0, 33.0],
+    [15.0, -38.0, 20.0],
+    [-45.0, -38.0, 33.0],
+    [-15.0, -38.0, 20.0],
+    [0.0, 0.0, 0.0],
+], dtype=np.float64)
+
+# 68-point indexes used from the iBUG layout, with matching model points
+LANDMARKS_68 = [30, 8, 36, 45, 48, 54]  # nose tip, chin, eye outer corners, mouth corners
+MODEL_POINTS_68 = np.array([
+    [0.0, -5.0, -15.0],    # nose tip
+    [0.0, 70.0, 12.0],     # chin
+    [-45.0, -38.0, 33.0],  # image-left eye outer corner
+    [45.0, -38.0, 33.0],   # image-right eye outer corner
+    [-28.0, 28.0, 22.0],   # image-left mouth corner
+    [28.0, 28.0, 22.0],    # image-right mouth corner
+], dtype=np.float64)
+
+
+@dataclass
+class HeadPose:
+    yaw: float
+    pitch: float
+    roll: float
+
+    def score(self, max_yaw: float = 45.0, max_pitch: float = 30.0, max_roll: float = 30.0) -> float:
+        """1.0 for a frontal face, falling linearly to 0.0 at the given limits"""
+        penalties = (abs(self.yaw) / max_yaw, abs(self.pitch) / max_pitch, abs(self.roll) / max_roll)
+        return float(max(0.0, 1.0 - max(penalties)))
+
+    def is_frontal(self, max_yaw: float = 20.0, max_pitch: float = 20.0, max_roll: float = 20.0) -> bool:
+        return abs(self.yaw) <= max_yaw and abs(self.pitch) <= max_pitch and abs(self.roll) <= max_roll
+
+    def as_dict(self) -> Dict[str, float]:
+        return {"yaw": round(self.yaw, 1), "pitch": round(self.pitch, 1), "roll": round(self.roll, 1)}
+
+
+def _order_5_point(points: np.ndarray) -> np.ndarray:
+    """Put each eye's outer corner first, whatever order the predictor used"""
+    right_eye, left_eye = points[0:2], points[2:4]
+    if right_eye[:, 0].mean() < left_eye[:, 0].mean():
+        right_eye, left_eye = left_eye, right_eye
+    right_eye = right_eye[np.argsort(-right_eye[:, 0])]  # Outer corner is the rightmost
+    left_eye = left_eye[np.argsort(left_eye[:, 0])]      # Outer corner is the leftmost
+    return np.vstack([right_eye, left_eye, points[4:5]])
+
+
+def estimate_head_pose(landmarks: Sequence[Tuple[float, float]],
+                       image_size: Tuple[int, int]) -> Optional[HeadPose]:
+    """
+    Estimate head pose from 5 (dlib small model) or 68 landmarks.
+
+    image_size is (height, width) of the image the landmarks are in; the
+    camera is approximated with focal length = image width. Returns None if
+    the landmark count is unsupported or solvePnP fails.
+    """
+    points = np.asarray(landmarks, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 5:
+        image_points, model_points = _order_5_point(points), MODEL_POINTS_5
+        method = cv2.SOLVEPNP_SQPNP if hasattr(cv2, "SOLVEPNP_SQPNP") else cv2.SOLVEPNP_EPNP
+    elif len(points) == 68:
+        image_points, model_points = points[LANDMARKS_68], MODEL_POINTS_68
+        method = cv2.SOLVEPNP_ITERATIVE
+    else:
+        return None
+
+    height, width = image_size[:2]
+    camera_matrix = np.array([[width, 0, width / 2.0], [0, width, height / 2.0], [0, 0, 1]], dtype=np.float64)
+    try:
+        ok, rvec, _ = cv2.solvePnP(model_points, image_points, camera_matrix, np.zeros(4), flags=method)
+    except cv2.error:
+        return None
+    if not ok:
+        return None
+
+    rotation, _ = cv2.Rodrigues(rvec)
+    angles = cv2.RQDecomp3x3(rotation)[0]  # Rotations about x (pitch), y (yaw), z (roll)
+    pitch, yaw, roll = (float(a) for a in angles)
+    # Fold the 180 degree ambiguity of the decomposition back towards a frontal pose
+    pitch = (pitch + 90.0) % 180.0 - 90.0
+    return HeadPose(yaw=-yaw, pitch=-pitch, roll=roll)
+
+
+def landmarks_from_dlib(shape) -> np.ndarray:
+    """Convert a dlib full_object_detection to an (n, 2) array"""
+    return np.array([(shape.part(i).x, shape.part(i).y) for i in range(shape.num_parts)], dtype=np.float64)
+
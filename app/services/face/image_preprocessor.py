@@ -6,29 +6,37 @@ import numpy as np
 from typing import Tuple, List, Optional
 import os
 from PIL import Image, ImageEnhance
+from app.services.face.detector_backends import FaceDetector, HaarFaceDetector
 
 class ImagePreprocessor:
     """Advanced image preprocessing for better face recognition accuracy"""
     
-    def __init__(self):
-        self.face_cascade = cv2.CascadeClassifier("app/models/haarcascade_frontalface_default.xml")
+    def __init__(self, accelerator=None, detector: Optional[FaceDetector] = None):
+        # Optional TransparentAccelerator; CLAHE runs through cv2.UMat when set
+        self.accelerator = accelerator
+        # Detector backend used for cropping; pass the engine's so the whole
+        # pipeline follows the selected backend (default: strict Haar cascade)
+        self.detector = detector or HaarFaceDetector(min_neighbors=5, min_size=(100, 100))
+    
+    def _equalize_lightness(self, image: np.ndarray, clip_limit: float) -> np.ndarray:
+        """CLAHE on the L channel of the LAB image"""
+        if self.accelerator is not None:
+            return self.accelerator.equalize_lightness(image, clip_limit=clip_limit)
+        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+        clahe = cv2.createCLAHE(clipLimit=clip_limit, tileGridSize=(8, 8))
+        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
     
     def detect_and_crop_face(self, image: np.ndarray, target_size: Tuple[int, int] = (224, 224)) -> Optional[np.ndarray]:
         """Detect face and crop to target size with padding"""
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(
-            gray, 
-            scaleFactor=1.1, 
-            minNeighbors=5, 
-            minSize=(100, 100)
-        )
-        
-        if len(faces) == 0:
+        locations = self.detector.detect(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+        
+        if len(locations) == 0:
             return None
             
         # Get the largest face
-        largest_face = max(faces, key=lambda x: x[2] * x[3])
-        x, y, w, h = largest_face
+        top, right, bottom, left = max(locations, key=lambda l: (l[1] - l[3]) * (l[2] - l[0]))
+        x, y, w, h = left, top, right - left, bottom - top
         
         # Add padding around face
         padding = 0.2
@@ -63,25 +71,12 @@ class ImagePreprocessor:
         enhanced = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
         
         # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization)
-        lab = cv2.cvtColor(enhanced, cv2.COLOR_BGR2LAB)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-        enhanced = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-        
-        return enhanced
+        return self._equalize_lightness(enhanced, clip_limit=2.0)
     
     def normalize_lighting(self, image: np.ndarray) -> np.ndarray:
         """Normalize lighting conditions"""
-        # Convert to LAB color space
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        
-        # Apply CLAHE to L channel
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        lab[:, :, 0] = clahe.apply(lab[:, :, 0])
-        
-        # Convert back to BGR
-        normalized = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
-        return normalized
+        # CLAHE on the L channel in LAB color space
+        return self._equalize_lightness(image, clip_limit=3.0)
     
     def augment_image(self, image: np.ndarray) -> List[np.ndarray]:
         """Generate augmented versions of the image"""
@@ -0,0 +1,328 @@
+"""
+Caches that let the engine skip gallery matching
+
+- TrackIdentityCache: once a track is confirmed as a student with a clear
+  margin, later frames of the same track reuse that identity. It is
+  re-verified against the full gallery every few seconds, or sooner if the
+  track's embedding drifts away from the one it was confirmed with.
+- HotGallery: an LRU set of recently matched students, probed before the
+  full gallery together with each hot student's nearest rivals (the closest
+  rows of other students). Only clear, unambiguous hot matches are
+  accepted, and every Nth hot match is cross-checked against the full gallery.
+- UnknownFaceCache: a short-lived negative cache per track, so a face that
+  is confidently not enrolled stops triggering full-gallery searches.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+DistanceFn = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+@dataclass
+class CachedIdentity:
+    """Identity confirmed for one track"""
+    student_index: int
+    student_id: str
+    student_info: Optional[Dict]
+    distance: float
+    confidence: float
+    margin: float
+    reference: np.ndarray  # Embedding the identity was confirmed with
+    verified_at: float
+
+
+class TrackIdentityCache:
+    """
+    Per-track identity memoization.
+
+    Keys are any hashable track key, e.g. (stream_id, track_id). lookup()
+    returns the cached identity while it is fresh and the new embedding is
+    within drift_threshold of the reference; otherwise it returns None and
+    the caller runs a full match and calls confirm() again.
+    """
+
+    def __init__(self, reverify_seconds: float = 3.0, drift_threshold: float = 0.3, min_margin: float = 0.08):
+        self.reverify_seconds = reverify_seconds
+        self.drift_threshold = drift_threshold
+        self.min_margin = min_margin
+        self._entries: Dict[Hashable, CachedIdentity] = {}
+        self.reset_stats()
+
+    def lookup(self, key: Hashable, embedding: np.ndarray, distance_fn: DistanceFn,
+               now: Optional[float] = None) -> Optional[CachedIdentity]:
+        self.lookups += 1
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now - entry.verified_at >= self.reverify_seconds:
+            self.reverifications += 1
+            return None
+
+        drift = float(distance_fn(entry.reference[np.newaxis, :], embedding)[0])
+        if drift > self.drift_threshold:
+            self.drift_invalidations += 1
+            del self._entries[key]
+            return None
+
+        self.hits += 1
+        return entry
+
+    def confirm(self, key: Hashable, student_index: int, student_id: str, student_info: Optional[Dict],
+                distance: float, confidence: float, margin: float, embedding: np.ndarray,
+                now: Optional[float] = None) -> bool:
+        """Cache an identity if its margin over the runner-up student is large enough"""
+        if margin < self.min_margin:
+            self._entries.pop(key, None)
+            return False
+        self._entries[key] = CachedIdentity(
+            student_index=student_index,
+            student_id=student_id,
+            student_info=student_info,
+            distance=distance,
+            confidence=confidence,
+            margin=margin,
+            reference=np.asarray(embedding, dtype=np.float64),
+            verified_at=time.monotonic() if now is None else now,
+        )
+        return True
+
+    def forget(self, key: Hashable):
+        """Drop a track's identity (e.g. when the track ends)"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """'hits' is the number of gallery matches avoided"""
+        return {
+            "tracks": len(self._entries),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "reverifications": self.reverifications,
+            "drift_invalidations": self.drift_invalidations,
+        }
+
+    def reset_stats(self):
+        self.lookups = 0
+        self.hits = 0
+        self.reverifications = 0
+        self.drift_invalidations = 0
+
+
+class HotGallery:
+    """
+    LRU "hot set" of recently matched students.
+
+    Stores gallery row indexes per student, plus the rival_rows gallery rows
+    of other students closest to them (found once, when the student becomes
+    hot). The probe sub-matrix is rebuilt only when membership changes.
+
+    A probe is accepted when its nearest probed row belongs to a hot student,
+    its distance is below accept_ratio x threshold, and it beats every other
+    probed student (hot or rival) by min_margin; otherwise the caller falls
+    through to the full gallery. Without the rivals a lone hot student would
+    have no competitor and any face near it would be accepted.
+    """
+
+    def __init__(self, capacity: int = 32, accept_ratio: float = 0.8, min_margin: float = 0.08,
+                 cross_check_every: int = 10, rival_rows: int = 8):
+        self.capacity = max(1, capacity)
+        self.accept_ratio = accept_ratio
+        self.min_margin = min_margin
+        self.cross_check_every = max(1, cross_check_every)
+        self.rival_rows = max(1, rival_rows)
+        self._students: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()  # (own, rival rows)
+        self._gallery_ids: Optional[np.ndarray] = None
+        self._rows: Optional[np.ndarray] = None  # Gallery rows probed: hot students and their rivals
+        self._row_ids: Optional[np.ndarray] = None
+        self.reset_stats()
+
+    def probe(self, embedding: np.ndarray, gallery: np.ndarray, distance_fn: DistanceFn,
+              threshold: float) -> Optional[Tuple[int, float, float]]:
+        """Return (gallery_index, distance, margin) for a confident hot match, else None"""
+        self.probes += 1
+        if not self._students:
+            self.misses += 1
+            return None
+        if self._rows is None:
+            self._rows = np.unique(np.concatenate([np.concatenate(rows) for rows in self._students.values()]))
+            self._row_ids = self._gallery_ids[self._rows]
+
+        distances = distance_fn(gallery[self._rows], embedding)
+        best = int(np.argmin(distances))
+        best_distance = float(distances[best])
+        if best_distance > threshold * self.accept_ratio or self._row_ids[best] not in self._students:
+            # Too far, or closest to a rival that is not hot
+            self.misses += 1
+            return None
+        margin = match_margin(distances, self._row_ids, best)
+        if margin < self.min_margin:
+            self.ambiguous += 1
+            return None
+
+        self.hits += 1
+        self._students.move_to_end(self._row_ids[best])
+        return int(self._rows[best]), best_distance, margin
+
+    def cross_check_due(self) -> bool:
+        """True for every cross_check_every-th hot hit; the caller then runs the full match"""
+        return self.hits % self.cross_check_every == 0
+
+    def record_cross_check(self, student_id: str, agreed: bool):
+        self.cross_checks += 1
+        if not agreed:
+            self.cross_check_failures += 1
+            self.evict(student_id)
+
+    def touch(self, student_id: str, student_ids: np.ndarray, gallery: np.ndarray, distance_fn: DistanceFn):
+        """Mark a student as just matched, adding their gallery rows and nearest rivals"""
+        if student_id in self._students:
+            self._students.move_to_end(student_id)
+            return
+        own = np.flatnonzero(student_ids == student_id)
+        others = np.flatnonzero(student_ids != student_id)
+        rivals = others[:0]
+        if len(others):
+            nearest = np.full(len(others), np.inf)
+            for row in own:
+                nearest = np.minimum(nearest, distance_fn(gallery[others], gallery[row]))
+            count = min(self.rival_rows, len(others))
+            rivals = others[np.argpartition(nearest, count - 1)[:count]]
+        self._gallery_ids = student_ids
+        self._students[student_id] = (own, rivals)
+        while len(self._students) > self.capacity:
+            self._students.popitem(last=False)
+        self._rows = None
+
+    def evict(self, student_id: str):
+        if self._students.pop(student_id, None) is not None:
+            self._rows = None
+
+    def clear(self):
+        self._students.clear()
+        self._gallery_ids = None
+        self._rows = None
+
+    def get_stats(self) -> Dict:
+        return {
+            "students": len(self._students),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.probes, 3) if self.probes else 0.0,
+            "ambiguous": self.ambiguous,
+            "cross_checks": self.cross_checks,
+            "cross_check_failures": self.cross_check_failures,
+        }
+
+    def reset_stats(self):
+        self.probes = 0
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self.cross_checks = 0
+        self.cross_check_failures = 0
+
+
+@dataclass
+class _UnknownEntry:
+    reference: np.ndarray
+    distance: float
+    streak: int
+    expires_at: Optional[float] = None  # Set once the face is confirmed unknown
+
+
+class UnknownFaceCache:
+    """
+    Negative cache of unknown faces, keyed per track.
+
+    A track whose best gallery distance is at least unknown_threshold for
+    min_frames consecutive searches is cached as unknown for ttl_seconds.
+    While cached (and its embedding stays within drift_threshold of the one
+    it was cached with) the caller skips the gallery search.
+    """
+
+    def __init__(self, unknown_threshold: float = 0.6, ttl_seconds: float = 10.0, min_frames: int = 2,
+                 drift_threshold: float = 0.3):
+        self.unknown_threshold = unknown_threshold
+        self.ttl_seconds = ttl_seconds
+        self.min_frames = max(1, min_frames)
+        self.drift_threshold = drift_threshold
+        self._entries: Dict[Hashable, _UnknownEntry] = {}
+        self.reset_stats()
+
+    def lookup(self, key: Hashable, embedding: np.ndarray, distance_fn: DistanceFn,
+               now: Optional[float] = None) -> Optional[float]:
+        """Return the cached best distance if the track is a known-unknown, else None"""
+        self.lookups += 1
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now >= entry.expires_at:
+            self.expirations += 1
+            del self._entries[key]
+            return None
+
+        if float(distance_fn(entry.reference[np.newaxis, :], embedding)[0]) > self.drift_threshold:
+            self.drift_invalidations += 1
+            del self._entries[key]
+            return None
+
+        self.hits += 1
+        return entry.distance
+
+    def observe(self, key: Hashable, embedding: np.ndarray, best_distance: float,
+                now: Optional[float] = None):
+        """Record the result of a full search for an unmatched face"""
+        if best_distance < self.unknown_threshold:
+            # Ambiguous: close to someone in the gallery, keep searching
+            self._entries.pop(key, None)
+            return
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _UnknownEntry(np.asarray(embedding, dtype=np.float64), best_distance, 0)
+        entry.streak += 1
+        entry.distance = min(entry.distance, best_distance)
+        if entry.streak >= self.min_frames and entry.expires_at is None:
+            entry.reference = np.asarray(embedding, dtype=np.float64)
+            entry.expires_at = (time.monotonic() if now is None else now) + self.ttl_seconds
+
+    def forget(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """'hits' is the number of full-gallery searches skipped for unknown faces"""
+        return {
+            "tracks": sum(1 for e in self._entries.values() if e.expires_at is not None),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "expirations": self.expirations,
+            "drift_invalidations": self.drift_invalidations,
+        }
+
+    def reset_stats(self):
+        self.lookups = 0
+        self.hits = 0
+        self.expirations = 0
+        self.drift_invalidations = 0
+
+
+def match_margin(distances: np.ndarray, student_ids: np.ndarray, best_index: int) -> float:
+    """Distance gap between the best match and the closest entry of any other student"""
+    others = student_ids != student_ids[best_index]
+    if not others.any():
+        return float("inf")
+    return float(distances[others].min() - distances[best_index])
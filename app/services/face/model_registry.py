@@ -0,0 +1,171 @@
+"""
+Process-wide registry of detectors and classifiers
+
+Haar cascades and LBPH models are parsed from XML/YAML files that are
+hundreds of KB each, so they must not be constructed inside per-image or
+per-face loops. The registry loads each model lazily, once, and hands out
+cached instances. OpenCV's CascadeClassifier and LBPH recognizer are not
+safe to share between threads, so those are cached per thread. A shared
+generation counter per model makes invalidation reach every thread's copy,
+and warm_up_thread() preloads the warmed models into worker threads.
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+MODELS_DIR = os.path.join(_PROJECT_ROOT, "app", "models")
+
+# Cascade names
+FRONTAL_FACE = "frontalface_default"
+EYE = "eye"
+
+DEFAULT_LBPH_PATH = os.path.join(_PROJECT_ROOT, "app", "services", "face", "trainer.yml")
+
+
+def resolve_cascade_path(name: str) -> str:
+    """Map a cascade name (or path) to a file, preferring app/models over OpenCV's bundled data"""
+    if os.path.isfile(name):
+        return name
+    file_name = name if name.endswith(".xml") else f"haarcascade_{name}.xml"
+    local_path = os.path.join(MODELS_DIR, file_name)
+    if os.path.isfile(local_path):
+        return local_path
+    return os.path.join(cv2.data.haarcascades, file_name)
+
+
+class ModelRegistry:
+    """Lazily loaded, cached models shared across the process"""
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    _stats: Dict[str, int] = {"cascade_loads": 0, "lbph_loads": 0, "dnn_loads": 0, "invalidations": 0}
+    _load_times_ms: Dict[str, float] = {}
+    # Bumped by invalidation; a thread's copy from an older generation is reloaded
+    _generations: Dict[Tuple[str, str], int] = {}
+    # Models passed to warm_up, preloaded by warm_up_thread
+    _warm_cascades: Tuple[str, ...] = ()
+    _warm_lbph_path: Optional[str] = None
+
+    @classmethod
+    def _thread_cache(cls) -> Dict:
+        cache = getattr(cls._local, "models", None)
+        if cache is None:
+            cache = cls._local.models = {}
+        return cache
+
+    @classmethod
+    def _cached(cls, key: Tuple[str, str], load: Callable[[], Any]) -> Any:
+        """This thread's model for key, (re)loaded if missing or invalidated since"""
+        cache = cls._thread_cache()
+        generation = cls._generations.get(key, 0)
+        entry = cache.get(key)
+        if entry is None or entry[0] != generation:
+            entry = cache[key] = (generation, load())
+        return entry[1]
+
+    @classmethod
+    def get_cascade(cls, name: str = FRONTAL_FACE) -> cv2.CascadeClassifier:
+        """Return this thread's CascadeClassifier for the given cascade name or path"""
+        def load():
+            path = resolve_cascade_path(name)
+            started = time.perf_counter()
+            cascade = cv2.CascadeClassifier(path)
+            if cascade.empty():
+                raise FileNotFoundError(f"Could not load Haar cascade: {path}")
+            cls._record_load("cascade_loads", name, started)
+            return cascade
+        return cls._cached(("cascade", name), load)
+
+    @classmethod
+    def get_lbph(cls, path: str = DEFAULT_LBPH_PATH):
+        """Return this thread's LBPH recognizer loaded from a trained model file"""
+        def load():
+            started = time.perf_counter()
+            recognizer = cv2.face.LBPHFaceRecognizer_create()
+            recognizer.read(path)
+            cls._record_load("lbph_loads", path, started)
+            return recognizer
+        return cls._cached(("lbph", path), load)
+
+    @classmethod
+    def get_dnn(cls, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return this thread's instance of a DNN model (cv2.dnn.Net, FaceDetectorYN, ...).
+
+        factory builds the model from its files; it runs once per thread and key.
+        """
+        def load():
+            started = time.perf_counter()
+            model = factory()
+            cls._record_load("dnn_loads", key, started)
+            return model
+        return cls._cached(("dnn", key), load)
+
+    @classmethod
+    def invalidate_lbph(cls, path: str = DEFAULT_LBPH_PATH):
+        """Make every thread reload the LBPH model on its next use (e.g. after retraining)"""
+        key = ("lbph", path)
+        with cls._lock:
+            cls._generations[key] = cls._generations.get(key, 0) + 1
+            cls._stats["invalidations"] += 1
+
+    @classmethod
+    def _record_load(cls, counter: str, name: str, started: float):
+        with cls._lock:
+            cls._stats[counter] += 1
+            cls._load_times_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    @classmethod
+    def warm_up(cls, cascades=(FRONTAL_FACE,), lbph_path: Optional[str] = None, dlib_models: bool = True):
+        """
+        Load models at startup so the first frame does not pay for parsing.
+
+        Cascades and LBPH models are cached for the calling thread and
+        remembered; camera and recognition threads call warm_up_thread() when
+        they start to build their own copies before the first frame. Importing
+        face_recognition loads dlib's detector and encoder once per process.
+        """
+        started = time.perf_counter()
+        with cls._lock:
+            cls._warm_cascades = tuple(cascades)
+            cls._warm_lbph_path = lbph_path
+        for name in cascades:
+            try:
+                cls.get_cascade(name)
+            except Exception as e:
+                print(f"⚠️ Could not warm cascade '{name}': {e}")
+        if lbph_path and os.path.isfile(lbph_path):
+            try:
+                cls.get_lbph(lbph_path)
+            except Exception as e:
+                print(f"⚠️ Could not warm LBPH model: {e}")
+        if dlib_models:
+            try:
+                import face_recognition  # noqa: F401 - loads dlib models once
+            except ImportError:
+                pass
+        print(f"✅ Models warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    @classmethod
+    def warm_up_thread(cls):
+        """Load the models passed to warm_up into the calling thread's cache"""
+        for name in cls._warm_cascades:
+            try:
+                cls.get_cascade(name)
+            except Exception as e:
+                print(f"⚠️ Could not warm cascade '{name}': {e}")
+        lbph_path = cls._warm_lbph_path
+        if lbph_path and os.path.isfile(lbph_path):
+            try:
+                cls.get_lbph(lbph_path)
+            except Exception as e:
+                print(f"⚠️ Could not warm LBPH model: {e}")
+
+    @classmethod
+    def get_stats(cls) -> Dict:
+        with cls._lock:
+            return {**cls._stats, "load_times_ms": dict(cls._load_times_ms)}
@@ -1,9 +1,8 @@
 import os
-from typing import List, Tuple, Dict, Optional
+from typing import List, Tuple, Dict, Optional, Hashable
 
 import cv2
 import numpy as np
-import face_recognition
 import time
 
 # Check for GPU availability
@@ -28,20 +27,47 @@ except ImportError:
                 "min_detection_interval_ms": 100,
                 "detection_cache_duration": 0.5,
                 "use_hog_model": True,
+                "detector_backend": "hog",
+                "embedding_backend": "dlib",
             }
 
+        @classmethod
+        def get_quality_gate_config(cls):
+            return {"enabled": True}
+
+        @classmethod
+        def get_identity_cache_config(cls):
+            return {"enabled": True}
+
+        @classmethod
+        def get_hot_gallery_config(cls):
+            return {"enabled": True}
+
+        @classmethod
+        def get_negative_cache_config(cls):
+            return {"enabled": True}
+
+from app.services.face.quality_gate import FaceQualityGate, REJECTION_LABELS
+from app.services.face.detector_backends import FaceDetector, create_face_detector
+from app.services.face.embedding_backends import EmbeddingBackend, EmbeddingGallery, create_embedding_backend
+from app.services.face.head_pose import estimate_head_pose
+from app.services.face.match_cache import TrackIdentityCache, HotGallery, UnknownFaceCache, match_margin
+from app.services.face.tracker import FaceTracker
+
 # Import advanced modules
 try:
     from app.services.face.image_preprocessor import ImagePreprocessor
     from app.services.face.confidence_validator import ConfidenceValidator, MultiFrameValidator
-    from app.services.face.gpu_acceleration import GPUAcceleratedRecognition, PerformanceMonitor
+    from app.services.face.gpu_acceleration import TransparentAccelerator, PerformanceMonitor
     ADVANCED_FEATURES_AVAILABLE = True
 except ImportError:
     ADVANCED_FEATURES_AVAILABLE = False
     print("⚠️ Advanced features not available. Install required dependencies.")
 
 
-def load_known_faces_from_directory(students_dir: str) -> Tuple[List[np.ndarray], List[str], List[Dict]]:
+def load_known_faces_from_directory(students_dir: str,
+                                    embedding_backend: Optional[EmbeddingBackend] = None,
+                                    face_detector: Optional[FaceDetector] = None) -> EmbeddingGallery:
     """
     Load student images from a directory structure and build face encodings.
 
@@ -50,12 +76,14 @@ def load_known_faces_from_directory(students_dir: str) -> Tuple[List[np.ndarray]
         StudentNameA/ image1.jpg, image2.png, ...
         StudentNameB/ ...
 
-    Returns three parallel lists: encodings, student_ids, and student_info.
-    Images that fail to load or have no detectable face are skipped.
+    Returns an EmbeddingGallery tagged with the embedding backend (dlib by
+    default); it unpacks into three parallel lists: encodings, student_ids,
+    and student_info. Images that fail to load or have no detectable face
+    are skipped. face_detector should be the engine's, so enrollment faces
+    are found and aligned like live ones (see EmbeddingBackend.encode_image).
     """
-    known_encodings: List[np.ndarray] = []
-    known_student_ids: List[str] = []
-    known_student_info: List[Dict] = []
+    backend = embedding_backend or create_embedding_backend("dlib")
+    gallery = EmbeddingGallery(backend.name, backend.dim)
 
     if not os.path.isdir(students_dir):
         raise FileNotFoundError(f"Student images folder not found: {students_dir}")
@@ -67,25 +95,19 @@ def load_known_faces_from_directory(students_dir: str) -> Tuple[List[np.ndarray]
         print("⚠️ Could not import StudentsService, using folder names only")
         StudentsService = None
 
-    for student_folder_name in os.listdir(students_dir):
+    folder_names = [name for name in os.listdir(students_dir) if os.path.isdir(os.path.join(students_dir, name))]
+
+    # Match folders (student last names) to database records in one streamed pass
+    students_by_last_name = {}
+    if StudentsService:
+        try:
+            students_by_last_name = StudentsService.get_students_by_last_name(folder_names)
+        except Exception as e:
+            print(f"⚠️ Error looking up students for {students_dir}: {e}")
+
+    for student_folder_name in folder_names:
         student_folder = os.path.join(students_dir, student_folder_name)
-        if not os.path.isdir(student_folder):
-            continue
-
-        # Try to find student in database by folder name
-        student_info = None
-        if StudentsService:
-            try:
-                # Search for student by last name (folder name)
-                matches = StudentsService.search_students(student_folder_name)
-                if matches:
-                    # Find exact match by last name
-                    for match in matches:
-                        if match.get('last_name', '').upper() == student_folder_name.upper():
-                            student_info = match
-                            break
-            except Exception as e:
-                print(f"⚠️ Error searching for student {student_folder_name}: {e}")
+        student_info = students_by_last_name.get(student_folder_name.upper())
 
         # If no database match, create a basic info dict
         if not student_info:
@@ -106,13 +128,11 @@ def load_known_faces_from_directory(students_dir: str) -> Tuple[List[np.ndarray]
                 continue
 
             image_rgb = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2RGB)
-            encodings = face_recognition.face_encodings(image_rgb)
+            encodings = backend.encode_image(image_rgb, face_detector)
             if encodings:
-                known_encodings.append(encodings[0])
-                known_student_ids.append(str(student_info.get('id', student_folder_name)))
-                known_student_info.append(student_info)
+                gallery.add(encodings[0], str(student_info.get('id', student_folder_name)), student_info)
 
-    return known_encodings, known_student_ids, known_student_info
+    return gallery
 
 
 def get_students_base_dir(project_root: str) -> str:
@@ -152,15 +172,28 @@ class FaceRecognitionEngine:
         downscale_factor: Optional[float] = None,
         min_detection_interval_ms: Optional[int] = None,
         performance_mode: str = "balanced",
-        use_advanced_features: bool = True
+        use_advanced_features: bool = True,
+        embedding_backend: Optional[str] = None,
     ) -> None:
         # Load configuration
         config = PerformanceConfig.get_config(performance_mode)
         
-        self.known_encodings = known_encodings or []
-        self.known_student_ids = known_student_ids or []
-        self.known_student_info = known_student_info or []
-        self.match_threshold = match_threshold if match_threshold is not None else config["match_threshold"]
+        self.embedding_backend = create_embedding_backend(embedding_backend or config.get("embedding_backend", "dlib"))
+        self.known_encodings = []
+        self.known_student_ids = []
+        self.known_student_info = []
+        if isinstance(known_encodings, EmbeddingGallery):
+            self.set_gallery(known_encodings)
+        else:
+            self._check_dimensions(known_encodings or [])
+            self.known_encodings = known_encodings or []
+            self.known_student_ids = known_student_ids or []
+            self.known_student_info = known_student_info or []
+        if match_threshold is None:
+            # The configured threshold is tuned for dlib's euclidean distance
+            match_threshold = config["match_threshold"] if self.embedding_backend.name == "dlib" \
+                else self.embedding_backend.default_threshold
+        self.match_threshold = match_threshold
         self.process_every_n_frames = max(1, process_every_n_frames if process_every_n_frames is not None else config["process_every_n_frames"])
         self.downscale_factor = downscale_factor if downscale_factor is not None else config["downscale_factor"]
         self.min_detection_interval_ms = max(0, int(min_detection_interval_ms if min_detection_interval_ms is not None else config["min_detection_interval_ms"]))
@@ -174,15 +207,59 @@ class FaceRecognitionEngine:
         self._detection_cache_duration = config["detection_cache_duration"]
         self._last_cache_time = 0.0
         self._use_hog_model = config.get("use_hog_model", True)
+        self.face_detector = create_face_detector(
+            config.get("detector_backend") or ("hog" if self._use_hog_model else "cnn")
+        )
+        
+        # Tracks confirmed as a student reuse their identity between re-verifications
+        self._cache_config = PerformanceConfig.get_identity_cache_config()
+        self._trackers: Dict[str, FaceTracker] = {}
+        self.identity_cache = None
+        if self._cache_config.get("enabled", True):
+            self.identity_cache = TrackIdentityCache(
+                reverify_seconds=self._cache_config.get("reverify_seconds", 3.0),
+                drift_threshold=self.match_threshold * self._cache_config.get("drift_ratio", 0.6),
+                min_margin=self.match_threshold * self._cache_config.get("margin_ratio", 0.15),
+            )
+        
+        # Recently matched students are probed before the full gallery
+        hot_config = PerformanceConfig.get_hot_gallery_config()
+        self.hot_gallery = None
+        if hot_config.get("enabled", True):
+            self.hot_gallery = HotGallery(
+                capacity=hot_config.get("capacity", 32),
+                accept_ratio=hot_config.get("accept_ratio", 0.8),
+                min_margin=self.match_threshold * hot_config.get("margin_ratio", 0.15),
+                cross_check_every=hot_config.get("cross_check_every", 10),
+                rival_rows=hot_config.get("rival_rows", 8),
+            )
+        
+        # Faces confirmed as not enrolled stop triggering full-gallery searches
+        unknown_config = PerformanceConfig.get_negative_cache_config()
+        self.unknown_cache = None
+        if unknown_config.get("enabled", True):
+            self.unknown_cache = UnknownFaceCache(
+                unknown_threshold=self.match_threshold * unknown_config.get("unknown_ratio", 1.2),
+                ttl_seconds=unknown_config.get("ttl_seconds", 10.0),
+                min_frames=unknown_config.get("min_frames", 2),
+                drift_threshold=self.match_threshold * unknown_config.get("drift_ratio", 0.6),
+            )
+        
+        # Reject tiny/blurry/badly lit faces before the expensive encoding step
+        self.quality_gate = FaceQualityGate.from_config(PerformanceConfig.get_quality_gate_config())
         
         # Advanced features
         self.use_advanced_features = use_advanced_features and ADVANCED_FEATURES_AVAILABLE
         
         if self.use_advanced_features:
-            self.preprocessor = ImagePreprocessor()
-            self.confidence_validator = ConfidenceValidator(min_confidence=self.match_threshold)
+            self.gpu_accelerator = TransparentAccelerator()
+            self.preprocessor = ImagePreprocessor(accelerator=self.gpu_accelerator, detector=self.face_detector)
+            self.confidence_validator = ConfidenceValidator(
+                min_confidence=self.match_threshold,
+                distance_fn=self.embedding_backend.distance,
+                match_threshold=self.embedding_backend.default_threshold,
+            )
             self.multi_frame_validator = MultiFrameValidator(required_frames=3)
-            self.gpu_accelerator = GPUAcceleratedRecognition()
             self.performance_monitor = PerformanceMonitor()
             print("✅ Advanced face recognition features enabled")
         else:
@@ -193,6 +270,32 @@ class FaceRecognitionEngine:
             self.performance_monitor = None
             print("ℹ️ Using basic face recognition features")
 
+    @property
+    def known_encodings(self) -> List[np.ndarray]:
+        return self._known_encodings
+
+    @known_encodings.setter
+    def known_encodings(self, encodings: List[np.ndarray]) -> None:
+        # Keep a stacked copy so matching never rebuilds an array from the list
+        self._known_encodings = encodings
+        self._known_matrix = np.array(encodings, dtype=np.float64) if len(encodings) else np.empty((0, 0))
+
+    @property
+    def known_student_ids(self) -> List[str]:
+        return self._known_student_ids
+
+    @known_student_ids.setter
+    def known_student_ids(self, student_ids: List[str]) -> None:
+        self._known_student_ids = student_ids
+        self._known_ids_array = np.array(student_ids, dtype=object)
+        # Cached identities and hot rows point into the old gallery
+        if getattr(self, "identity_cache", None) is not None:
+            self.identity_cache.clear()
+        if getattr(self, "hot_gallery", None) is not None:
+            self.hot_gallery.clear()
+        if getattr(self, "unknown_cache", None) is not None:
+            self.unknown_cache.clear()
+
     def _annotate_frame(self, frame_bgr: np.ndarray, detections: List[Dict], draw_annotations: bool) -> Tuple[np.ndarray, List[Dict]]:
         """Helper method to annotate frame with detections"""
         if not draw_annotations:
@@ -208,7 +311,7 @@ class FaceRecognitionEngine:
                 color,
                 2,
             )
-            label = d["display_name"] if d["is_known"] else "UNKNOWN"
+            label = d["display_name"] if d["is_known"] else d.get("quality_label", "UNKNOWN")
             cv2.rectangle(
                 annotated,
                 (d["left"], d["bottom"] - 35),
@@ -229,47 +332,29 @@ class FaceRecognitionEngine:
         return annotated, detections
 
     def update_known_from_directory(self, students_dir: str) -> None:
-        encs, student_ids, student_info = load_known_faces_from_directory(students_dir)
-        self.known_encodings = encs
-        self.known_student_ids = student_ids
-        self.known_student_info = student_info
+        self.set_gallery(load_known_faces_from_directory(students_dir, self.embedding_backend, self.face_detector))
+
+    def set_gallery(self, gallery: EmbeddingGallery) -> None:
+        """Replace the known faces; raises ValueError if the gallery was built by another backend"""
+        gallery.check_compatible(self.embedding_backend)
+        self.known_encodings, self.known_student_ids, self.known_student_info = gallery
+
+    def _check_dimensions(self, encodings: List[np.ndarray]) -> None:
+        """Untagged encodings can only be checked for their dimension"""
+        for encoding in encodings:
+            if np.shape(encoding) != (self.embedding_backend.dim,):
+                raise ValueError(
+                    f"Encoding of shape {np.shape(encoding)} does not match the "
+                    f"'{self.embedding_backend.name}' backend ({self.embedding_backend.dim}-d)"
+                )
 
-    def recognize_frame(
-        self,
-        frame_bgr: np.ndarray,
-        draw_annotations: bool = True,
-    ) -> Tuple[np.ndarray, List[Dict]]:
+    def detect_face_locations(self, frame_bgr: np.ndarray) -> Tuple[np.ndarray, List[Tuple[int, int, int, int]]]:
         """
-        Enhanced face recognition with advanced features.
+        Preprocess and downscale a frame, then locate faces on it.
 
-        Returns (annotated_frame_bgr, detections)
-        where detections is a list of dicts with enhanced confidence scoring
+        Returns (rgb_small, locations) where locations are (top, right, bottom, left)
+        tuples in the downscaled frame's coordinates.
         """
-        if frame_bgr is None or frame_bgr.size == 0:
-            return frame_bgr, []
-
-        # Performance monitoring
-        if self.performance_monitor:
-            self.performance_monitor.start_frame_timer()
-
-        # Time-based throttle
-        if self.min_detection_interval_ms > 0:
-            now = time.monotonic() * 1000.0
-            if (now - self._last_processed_monotonic) < self.min_detection_interval_ms:
-                return frame_bgr, []
-
-        self._frame_count += 1
-        should_process = (self._frame_count % self.process_every_n_frames) == 0
-
-        # Check cache first
-        now = time.monotonic()
-        if (now - self._last_cache_time) < self._detection_cache_duration and self._last_detections:
-            return self._annotate_frame(frame_bgr, self._last_detections, draw_annotations)
-
-        if not should_process:
-            # Return frame as-is without detections to reduce CPU load
-            return frame_bgr, []
-
         # Enhanced preprocessing if available
         if self.use_advanced_features and self.preprocessor:
             # Apply image enhancement
@@ -280,40 +365,122 @@ class FaceRecognitionEngine:
             processed_frame = frame_bgr
 
         # Downscale for faster processing
-        small_bgr = cv2.resize(
-            processed_frame, (0, 0), fx=self.downscale_factor, fy=self.downscale_factor
-        )
-        rgb_small = cv2.cvtColor(small_bgr, cv2.COLOR_BGR2RGB)
+        if self.gpu_accelerator:
+            rgb_small = self.gpu_accelerator.downscale_to_rgb(processed_frame, self.downscale_factor)
+        else:
+            small_bgr = cv2.resize(
+                processed_frame, (0, 0), fx=self.downscale_factor, fy=self.downscale_factor
+            )
+            rgb_small = cv2.cvtColor(small_bgr, cv2.COLOR_BGR2RGB)
 
-        # Use HOG model for faster detection (vs CNN) based on config
-        model = "hog" if self._use_hog_model else "cnn"
-        locations = face_recognition.face_locations(rgb_small, model=model)
-        encodings = face_recognition.face_encodings(rgb_small, locations)
-        self._last_processed_monotonic = time.monotonic() * 1000.0
+        # Detector backend selected by the performance mode (HOG by default)
+        locations = self.face_detector.detect(rgb_small)
+        return rgb_small, locations
+
+    def scale_location(self, location: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+        """Scale a (top, right, bottom, left) location back up to original frame coordinates"""
+        scale = int(1.0 / self.downscale_factor)
+        top, right, bottom, left = location
+        return top * scale, right * scale, bottom * scale, left * scale
+
+    def identify_faces(
+        self,
+        frame_bgr: np.ndarray,
+        rgb_small: np.ndarray,
+        locations: List[Tuple[int, int, int, int]],
+        track_keys: Optional[List[Hashable]] = None,
+    ) -> List[Dict]:
+        """
+        Encode the given face locations and match them against the known gallery.
+
+        track_keys (one per location) enable the per-track identity cache:
+        faces of a confirmed track skip the gallery match until re-verification.
+        """
+        if not locations:
+            return []
+
+        # Quality gate on the grayscale crops; rejected faces never reach dlib
+        gray_small = cv2.cvtColor(rgb_small, cv2.COLOR_RGB2GRAY)
+        rejections = self.quality_gate.filter(gray_small, locations, scale=1.0 / self.downscale_factor)
+        if self.performance_monitor:
+            self.performance_monitor.update_counters("quality_gate", self.quality_gate.get_stats())
+
+        accepted = [loc for loc, reason in zip(locations, rejections) if reason is None]
+        # Landmarks come from the encoder's own alignment pass, so head pose is nearly free;
+        # detector landmarks (YuNet) let SFace align its chips without another pass
+        alignment = [self.face_detector.landmarks_for(loc) for loc in accepted]
+        encoded, landmark_sets = self.embedding_backend.encode_with_landmarks(rgb_small, accepted, alignment)
+        encodings = iter(zip(encoded, landmark_sets))
 
         detections: List[Dict] = []
 
-        for enc, (top, right, bottom, left) in zip(encodings, locations):
+        for index, (location, reason) in enumerate(zip(locations, rejections)):
             # Scale back up to original frame coordinates
-            scale = int(1.0 / self.downscale_factor)
-            top_scaled, right_scaled, bottom_scaled, left_scaled = (
-                top * scale,
-                right * scale,
-                bottom * scale,
-                left * scale,
-            )
+            top_scaled, right_scaled, bottom_scaled, left_scaled = self.scale_location(location)
+
+            if reason is not None:
+                detections.append(self._rejected_detection(
+                    (top_scaled, right_scaled, bottom_scaled, left_scaled), reason
+                ))
+                continue
+
+            enc, landmarks = next(encodings)
+            head_pose = estimate_head_pose(landmarks, rgb_small.shape) if landmarks is not None else None
+            scaled = (top_scaled, right_scaled, bottom_scaled, left_scaled)
+            track_key = track_keys[index] if track_keys is not None else None
+
+            # A track confirmed recently (and not drifting) keeps its identity without a gallery match
+            if track_key is not None and self.identity_cache is not None:
+                cached = self.identity_cache.lookup(track_key, enc, self.embedding_backend.distance)
+                if cached is not None:
+                    detections.append(self._build_detection(
+                        scaled, cached.student_id, cached.student_info, cached.distance,
+                        cached.confidence, True, head_pose, identity_source="track_cache",
+                    ))
+                    continue
+
+            # A track already found to be unknown skips the gallery search until its entry expires
+            if track_key is not None and self.unknown_cache is not None:
+                cached_distance = self.unknown_cache.lookup(track_key, enc, self.embedding_backend.distance)
+                if cached_distance is not None:
+                    detections.append(self._build_detection(
+                        scaled, None, None, cached_distance, max(0, 1 - cached_distance), False, head_pose,
+                        identity_source="negative_cache",
+                    ))
+                    continue
 
             # Basic recognition
             student_id = None
             student_info = None
             best_distance = 1.0
+            best_idx = -1
+            margin = 0.0
             is_known = False
             confidence = 0.0
-
-            if self.known_encodings:
-                distances = face_recognition.face_distance(self.known_encodings, enc)
-                best_idx = int(np.argmin(distances))
-                best_distance = float(distances[best_idx])
+            identity_source = "gallery"
+            validator_gallery = self._known_matrix
+
+            if len(self._known_matrix):
+                # Recently seen students first; the full gallery only on a miss,
+                # an ambiguous hot match, or a periodic cross-check
+                hot = None
+                if self.hot_gallery is not None:
+                    hot = self.hot_gallery.probe(enc, self._known_matrix, self.embedding_backend.distance,
+                                                 self.match_threshold)
+                if hot is not None and not self.hot_gallery.cross_check_due():
+                    best_idx, best_distance, margin = hot
+                    identity_source = "hot_gallery"
+                    validator_gallery = self._known_matrix[best_idx:best_idx + 1]
+                else:
+                    distances = self.embedding_backend.distance(self._known_matrix, enc)
+                    best_idx = int(np.argmin(distances))
+                    best_distance = float(distances[best_idx])
+                    margin = match_margin(distances, self._known_ids_array, best_idx)
+                    if hot is not None:
+                        hot_student = self.known_student_ids[hot[0]]
+                        self.hot_gallery.record_cross_check(
+                            hot_student, self.known_student_ids[best_idx] == hot_student
+                        )
                 confidence = max(0, 1 - best_distance)
 
                 if best_distance <= self.match_threshold:
@@ -325,7 +492,7 @@ class FaceRecognitionEngine:
             if self.use_advanced_features and self.confidence_validator:
                 face_region = (left_scaled, top_scaled, right_scaled - left_scaled, bottom_scaled - top_scaled)
                 confidence_result = self.confidence_validator.calculate_advanced_confidence(
-                    enc, self.known_encodings, face_region, frame_bgr
+                    enc, validator_gallery, face_region, frame_bgr, head_pose
                 )
                 
                 # Update confidence with advanced scoring
@@ -345,27 +512,152 @@ class FaceRecognitionEngine:
                     }
                     self.multi_frame_validator.add_detection(self._frame_count, detection_data)
 
-            # Create display name
-            display_name = "UNKNOWN"
-            if student_info:
-                first_name = student_info.get('first_name', '')
-                last_name = student_info.get('last_name', '')
-                display_name = f"{first_name} {last_name}".strip()
-
-            detections.append(
-                {
-                    "top": top_scaled,
-                    "right": right_scaled,
-                    "bottom": bottom_scaled,
-                    "left": left_scaled,
-                    "student_id": student_id,
-                    "student_info": student_info,
-                    "display_name": display_name,
-                    "distance": best_distance,
-                    "confidence": confidence,
-                    "is_known": is_known,
-                }
+            if is_known and self.hot_gallery is not None:
+                self.hot_gallery.touch(student_id, self._known_ids_array, self._known_matrix,
+                                       self.embedding_backend.distance)
+
+            if track_key is not None and self.unknown_cache is not None:
+                if is_known:
+                    self.unknown_cache.forget(track_key)
+                elif identity_source == "gallery" and len(self._known_matrix):
+                    self.unknown_cache.observe(track_key, enc, best_distance)
+
+            if track_key is not None and self.identity_cache is not None:
+                if is_known:
+                    self.identity_cache.confirm(
+                        track_key, best_idx, student_id, student_info, best_distance, confidence, margin, enc
+                    )
+                else:
+                    self.identity_cache.forget(track_key)
+
+            detections.append(self._build_detection(
+                scaled, student_id, student_info, best_distance, confidence, is_known, head_pose,
+                identity_source=identity_source,
+            ))
+
+        if self.performance_monitor:
+            if self.identity_cache is not None:
+                self.performance_monitor.update_counters("identity_cache", self.identity_cache.get_stats())
+            if self.hot_gallery is not None:
+                self.performance_monitor.update_counters("hot_gallery", self.hot_gallery.get_stats())
+            if self.unknown_cache is not None:
+                self.performance_monitor.update_counters("unknown_cache", self.unknown_cache.get_stats())
+
+        return detections
+
+    @staticmethod
+    def _build_detection(location: Tuple[int, int, int, int], student_id: Optional[str],
+                         student_info: Optional[Dict], distance: float, confidence: float,
+                         is_known: bool, head_pose=None, identity_source: str = "gallery") -> Dict:
+        """Detection entry for an encoded face"""
+        top, right, bottom, left = location
+        display_name = "UNKNOWN"
+        if student_info:
+            first_name = student_info.get('first_name', '')
+            last_name = student_info.get('last_name', '')
+            display_name = f"{first_name} {last_name}".strip()
+        return {
+            "top": top,
+            "right": right,
+            "bottom": bottom,
+            "left": left,
+            "student_id": student_id,
+            "student_info": student_info,
+            "display_name": display_name,
+            "distance": distance,
+            "confidence": confidence,
+            "is_known": is_known,
+            "head_pose": head_pose.as_dict() if head_pose else None,
+            "identity_source": identity_source,
+        }
+
+    @staticmethod
+    def _rejected_detection(location: Tuple[int, int, int, int], reason: str) -> Dict:
+        """Detection entry for a face the quality gate kept away from the encoder"""
+        top, right, bottom, left = location
+        return {
+            "top": top,
+            "right": right,
+            "bottom": bottom,
+            "left": left,
+            "student_id": None,
+            "student_info": None,
+            "display_name": "UNKNOWN",
+            "distance": 1.0,
+            "confidence": 0.0,
+            "is_known": False,
+            "rejected_reason": reason,
+            "quality_label": REJECTION_LABELS.get(reason, "UNKNOWN"),
+        }
+
+    def analyze_frame(self, frame_bgr: np.ndarray, stream_id: str = "default") -> List[Dict]:
+        """
+        Run detection and recognition on a single frame.
+
+        Unlike recognize_frame, this applies no frame skipping, throttling or
+        caching, so batch callers (offline video, multi-camera) control pacing.
+        Faces are tracked per stream_id so confirmed tracks can reuse their identity.
+        """
+        if frame_bgr is None or frame_bgr.size == 0:
+            return []
+        rgb_small, locations = self.detect_face_locations(frame_bgr)
+        tracking = self.identity_cache is not None or self.unknown_cache is not None
+        track_keys = self._track_faces(stream_id, locations) if tracking else None
+        return self.identify_faces(frame_bgr, rgb_small, locations, track_keys)
+
+    def _track_faces(self, stream_id: str, locations: List[Tuple[int, int, int, int]]) -> List[Hashable]:
+        """Assign faces to per-stream tracks and drop cached identities of ended tracks"""
+        tracker = self._trackers.get(stream_id)
+        if tracker is None:
+            tracker = self._trackers[stream_id] = FaceTracker(
+                iou_threshold=self._cache_config.get("tracker_iou", 0.3),
+                max_missed=self._cache_config.get("tracker_max_missed", 5),
             )
+        tracks = tracker.update(list(locations), time.monotonic())
+        for ended in tracker.ended_tracks:
+            for cache in (self.identity_cache, self.unknown_cache):
+                if cache is not None:
+                    cache.forget((stream_id, ended.track_id))
+        return [(stream_id, track.track_id) for track in tracks]
+
+    def recognize_frame(
+        self,
+        frame_bgr: np.ndarray,
+        draw_annotations: bool = True,
+    ) -> Tuple[np.ndarray, List[Dict]]:
+        """
+        Enhanced face recognition with advanced features.
+
+        Returns (annotated_frame_bgr, detections)
+        where detections is a list of dicts with enhanced confidence scoring
+        """
+        if frame_bgr is None or frame_bgr.size == 0:
+            return frame_bgr, []
+
+        # Performance monitoring
+        if self.performance_monitor:
+            self.performance_monitor.start_frame_timer()
+
+        # Time-based throttle
+        if self.min_detection_interval_ms > 0:
+            now = time.monotonic() * 1000.0
+            if (now - self._last_processed_monotonic) < self.min_detection_interval_ms:
+                return frame_bgr, []
+
+        self._frame_count += 1
+        should_process = (self._frame_count % self.process_every_n_frames) == 0
+
+        # Check cache first
+        now = time.monotonic()
+        if (now - self._last_cache_time) < self._detection_cache_duration and self._last_detections:
+            return self._annotate_frame(frame_bgr, self._last_detections, draw_annotations)
+
+        if not should_process:
+            # Return frame as-is without detections to reduce CPU load
+            return frame_bgr, []
+
+        detections = self.analyze_frame(frame_bgr)
+        self._last_processed_monotonic = time.monotonic() * 1000.0
 
         # Cache the detections
         self._last_detections = detections
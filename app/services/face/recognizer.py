@@ -1,10 +1,8 @@
-import cv2
+from app.services.face.model_registry import ModelRegistry
 
 
 def load_recognizer():
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read("app/services/face/trainer.yml")
-    return recognizer
+    return ModelRegistry.get_lbph()
 
 
 def recognize_face(gray_frame, face, recognizer):
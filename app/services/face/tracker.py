@@ -0,0 +1,125 @@
+"""
+Lightweight IoU face tracker for following faces across frames
+"""
+from typing import List, Dict, Tuple, Optional
+import itertools
+
+
+Box = Tuple[int, int, int, int]  # (top, right, bottom, left)
+
+
+def box_iou(a: Box, b: Box) -> float:
+    """Intersection-over-union of two (top, right, bottom, left) boxes"""
+    top = max(a[0], b[0])
+    right = min(a[1], b[1])
+    bottom = min(a[2], b[2])
+    left = max(a[3], b[3])
+    if right <= left or bottom <= top:
+        return 0.0
+    intersection = (right - left) * (bottom - top)
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    union = area_a + area_b - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class FaceTrack:
+    """A single face followed across frames"""
+
+    def __init__(self, track_id: int, box: Box, timestamp: float):
+        self.track_id = track_id
+        self.box = box
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.hits = 1
+        self.misses = 0
+        self.votes: Dict[str, int] = {}
+        self.best_confidence: Dict[str, float] = {}
+        self.student_info: Dict[str, Dict] = {}
+        # Identity the caller has confirmed for this track (None until confirmed)
+        self.identity: Optional[str] = None
+
+    def update(self, box: Box, timestamp: float):
+        """Move the track to a newly matched box"""
+        self.box = box
+        self.last_seen = timestamp
+        self.hits += 1
+        self.misses = 0
+
+    def add_vote(self, student_id: str, confidence: float, student_info: Optional[Dict] = None):
+        """Record one recognition result for this track"""
+        self.votes[student_id] = self.votes.get(student_id, 0) + 1
+        self.best_confidence[student_id] = max(self.best_confidence.get(student_id, 0.0), confidence)
+        if student_info is not None:
+            self.student_info[student_id] = student_info
+
+    def leading_identity(self) -> Tuple[Optional[str], int]:
+        """Return (student_id, votes) for the identity with the most votes"""
+        if not self.votes:
+            return None, 0
+        student_id = max(self.votes, key=self.votes.get)
+        return student_id, self.votes[student_id]
+
+
+class FaceTracker:
+    """
+    Greedy IoU tracker.
+
+    Frames only hold a handful of faces, so a greedy best-IoU assignment is
+    enough and keeps the tracker dependency-free.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_missed: int = 5):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks: Dict[int, FaceTrack] = {}
+        self.ended_tracks: List[FaceTrack] = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes: List[Box], timestamp: float) -> List[FaceTrack]:
+        """
+        Assign each box to an existing or new track.
+
+        Returns the tracks in the same order as boxes. Tracks that went unmatched
+        for more than max_missed updates are moved to ended_tracks.
+        """
+        self.ended_tracks = []
+        pairs = []
+        for box_idx, box in enumerate(boxes):
+            for track_id, track in self.tracks.items():
+                iou = box_iou(box, track.box)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, box_idx, track_id))
+        pairs.sort(reverse=True)
+
+        assigned: List[Optional[FaceTrack]] = [None] * len(boxes)
+        used_tracks = set()
+        for _, box_idx, track_id in pairs:
+            if assigned[box_idx] is not None or track_id in used_tracks:
+                continue
+            track = self.tracks[track_id]
+            track.update(boxes[box_idx], timestamp)
+            assigned[box_idx] = track
+            used_tracks.add(track_id)
+
+        for track_id, track in list(self.tracks.items()):
+            if track_id in used_tracks:
+                continue
+            track.misses += 1
+            if track.misses > self.max_missed:
+                self.ended_tracks.append(self.tracks.pop(track_id))
+
+        for box_idx, box in enumerate(boxes):
+            if assigned[box_idx] is None:
+                track = FaceTrack(next(self._ids), box, timestamp)
+                self.tracks[track.track_id] = track
+                assigned[box_idx] = track
+
+        return assigned
+
+    def reset(self) -> List[FaceTrack]:
+        """End all tracks and return them"""
+        ended = list(self.tracks.values())
+        self.tracks.clear()
+        self.ended_tracks = ended
+        return ended
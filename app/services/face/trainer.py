@@ -1,6 +1,7 @@
 import cv2
 import os
 import numpy as np
+from app.services.face.model_registry import ModelRegistry
 
 
 def train_recognizer(data_dir="data/faces"):
@@ -16,4 +17,5 @@ def train_recognizer(data_dir="data/faces"):
             ids.append(user_id)
     recognizer.train(faces, np.array(ids))
     recognizer.save("app/services/face/trainer.yml")
+    ModelRegistry.invalidate_lbph()
     return True
@@ -0,0 +1,306 @@
+"""
+Offline video-file attendance processing
+
+Runs the recognition pipeline over recorded footage as fast as possible:
+- frame skipping: only every sample_every_s seconds of video is decoded
+- tracking: once a track is confirmed, its face is no longer re-encoded
+- worker parallelism: videos are split into segments processed in a process pool
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional, Callable
+
+import cv2
+import numpy as np
+
+from app.services.face.recognition_algorithm import FaceRecognitionEngine, load_known_faces_from_directory
+from app.services.face.embedding_backends import EmbeddingGallery
+from app.services.face.tracker import FaceTracker
+from app.services.attendance_events import AttendanceEvent, AttendanceDeduplicator
+
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".m4v", ".wmv")
+
+
+@dataclass
+class VideoSegment:
+    """A frame range of one video file, processed by a single worker"""
+    path: str
+    start_frame: int
+    end_frame: int
+    fps: float
+    clip_start: datetime
+
+
+def list_video_files(path: str) -> List[str]:
+    """Return the video file itself, or all video files in a directory (sorted)"""
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Video file or folder not found: {path}")
+    return sorted(
+        os.path.join(path, name)
+        for name in os.listdir(path)
+        if name.lower().endswith(VIDEO_EXTENSIONS)
+    )
+
+
+def probe_video(path: str) -> Tuple[float, int]:
+    """Return (fps, frame_count) for a video file"""
+    cap = cv2.VideoCapture(path)
+    try:
+        if not cap.isOpened():
+            raise ValueError(f"Unable to open video: {path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    finally:
+        cap.release()
+    if fps <= 0:
+        fps = 30.0  # Some containers do not report fps
+    return fps, frame_count
+
+
+def resolve_clip_start(path: str, duration_s: float, start_time: Optional[datetime] = None) -> datetime:
+    """
+    Wall-clock time of the first frame.
+
+    Recorders close the file when the clip ends, so without an explicit
+    start_time the file's modification time minus its duration is used.
+    """
+    if start_time is not None:
+        return start_time
+    return datetime.fromtimestamp(os.path.getmtime(path)) - timedelta(seconds=duration_s)
+
+
+def plan_segments(paths: List[str], segment_seconds: float = 300,
+                  start_time: Optional[datetime] = None) -> List[VideoSegment]:
+    """Split videos into segments of roughly segment_seconds each"""
+    segments: List[VideoSegment] = []
+    clip_start = start_time
+    for path in paths:
+        fps, frame_count = probe_video(path)
+        if frame_count <= 0:
+            print(f"⚠️ Skipping video with unknown length: {path}")
+            continue
+        duration_s = frame_count / fps
+        this_start = resolve_clip_start(path, duration_s, clip_start)
+        # An explicit start time applies to the first clip; following clips continue from it
+        if start_time is not None:
+            clip_start = this_start + timedelta(seconds=duration_s)
+
+        frames_per_segment = max(1, int(segment_seconds * fps))
+        for start_frame in range(0, frame_count, frames_per_segment):
+            segments.append(VideoSegment(
+                path=path,
+                start_frame=start_frame,
+                end_frame=min(frame_count, start_frame + frames_per_segment),
+                fps=fps,
+                clip_start=this_start,
+            ))
+    return segments
+
+
+# ========== WORKER SIDE ==========
+
+_worker_engine: Optional[FaceRecognitionEngine] = None
+
+
+def _init_worker(gallery: Tuple[List[np.ndarray], List[str], List[Dict]],
+                 performance_mode: str, use_advanced_features: bool,
+                 thread_allocation: Optional[Dict] = None):
+    """Build one engine per worker process from the shared gallery"""
+    global _worker_engine
+    # Each worker gets its share of OpenCV and BLAS/OpenMP threads instead of one
+    # per core, sized for the actual worker count. Workers inherit the parent's
+    # OMP_*/BLAS env vars (set before numpy loads in process_video.py);
+    # threadpoolctl resizes pools already loaded.
+    from app.utils.performance_config import PerformanceConfig
+    PerformanceConfig.apply_thread_budget(dict(thread_allocation) if thread_allocation else None)
+
+    encodings, student_ids, student_info = gallery
+    _worker_engine = FaceRecognitionEngine(
+        # A tagged gallery selects the matching embedding backend
+        known_encodings=gallery if isinstance(gallery, EmbeddingGallery) else encodings,
+        known_student_ids=student_ids,
+        known_student_info=student_info,
+        embedding_backend=gallery.backend if isinstance(gallery, EmbeddingGallery) else None,
+        process_every_n_frames=1,
+        min_detection_interval_ms=0,
+        performance_mode=performance_mode,
+        use_advanced_features=use_advanced_features,
+    )
+
+
+def process_segment(segment: VideoSegment, sample_every_s: float = 0.5,
+                    min_votes: int = 2) -> Tuple[List[AttendanceEvent], Dict[str, int]]:
+    """Process one segment and return (events, stats)"""
+    engine = _worker_engine
+    stats = {"frames_read": 0, "frames_sampled": 0, "faces": 0, "encoded": 0}
+    events: List[AttendanceEvent] = []
+
+    cap = cv2.VideoCapture(segment.path)
+    if not cap.isOpened():
+        print(f"⚠️ Unable to open video: {segment.path}")
+        return events, stats
+
+    step = max(1, int(round(segment.fps * sample_every_s)))
+    # End a track after ~2 seconds without a matching face
+    tracker = FaceTracker(iou_threshold=0.3, max_missed=max(1, int(round(2.0 / sample_every_s))))
+    source = os.path.basename(segment.path)
+
+    try:
+        if segment.start_frame > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, segment.start_frame)
+
+        for frame_idx in range(segment.start_frame, segment.end_frame):
+            # grab() advances without decoding; only sampled frames are decoded
+            if (frame_idx - segment.start_frame) % step:
+                if not cap.grab():
+                    break
+                stats["frames_read"] += 1
+                continue
+
+            ok, frame_bgr = cap.read()
+            if not ok or frame_bgr is None:
+                break
+            stats["frames_read"] += 1
+            stats["frames_sampled"] += 1
+
+            video_seconds = frame_idx / segment.fps
+            rgb_small, locations = engine.detect_face_locations(frame_bgr)
+            stats["faces"] += len(locations)
+            tracks = tracker.update([engine.scale_location(loc) for loc in locations], video_seconds)
+
+            # Confirmed tracks are followed by position alone, skipping the encoder
+            pending = [(loc, track) for loc, track in zip(locations, tracks) if track.identity is None]
+            if not pending:
+                continue
+
+            detections = engine.identify_faces(frame_bgr, rgb_small, [loc for loc, _ in pending])
+            stats["encoded"] += sum(1 for d in detections if not d.get("rejected_reason"))
+
+            for detection, (_, track) in zip(detections, pending):
+                student_info = detection.get("student_info") or {}
+                if not detection.get("is_known") or student_info.get("id") is None:
+                    continue
+                track.add_vote(str(student_info["id"]), detection.get("confidence", 0.0), student_info)
+                student_id, votes = track.leading_identity()
+                if votes < min_votes:
+                    continue
+
+                track.identity = student_id
+                events.append(AttendanceEvent(
+                    student_pk=int(track.student_info[student_id]["id"]),
+                    timestamp=segment.clip_start + timedelta(seconds=track.first_seen),
+                    source=f"{source}@{timedelta(seconds=int(track.first_seen))}",
+                    confidence=track.best_confidence[student_id],
+                    student_info=track.student_info[student_id],
+                ))
+    finally:
+        cap.release()
+
+    return events, stats
+
+
+# ========== COORDINATOR ==========
+
+class OfflineVideoProcessor:
+    """
+    Headless batch processor for recorded footage.
+
+    Reuses FaceRecognitionEngine in each worker and sends deduplicated
+    attendance events (stamped with video time) to AttendanceService.
+    """
+
+    def __init__(
+        self,
+        students_dir: Optional[str] = None,
+        gallery: Optional[Tuple[List[np.ndarray], List[str], List[Dict]]] = None,
+        performance_mode: str = "fast",
+        workers: Optional[int] = None,
+        sample_every_s: float = 0.5,
+        min_votes: int = 2,
+        segment_seconds: float = 300,
+        use_advanced_features: bool = False,
+    ):
+        if gallery is None:
+            if students_dir is None:
+                raise ValueError("Either students_dir or gallery is required")
+            gallery = load_known_faces_from_directory(students_dir)
+        self.gallery = gallery
+        self.performance_mode = performance_mode
+        if workers is None:
+            from app.utils.performance_config import PerformanceConfig
+            workers = PerformanceConfig.compute_thread_allocation()["recognition_workers"]
+        self.workers = max(1, workers)
+        self.sample_every_s = sample_every_s
+        self.min_votes = max(1, min_votes)
+        self.segment_seconds = segment_seconds
+        self.use_advanced_features = use_advanced_features
+
+    def process(
+        self,
+        path: str,
+        start_time: Optional[datetime] = None,
+        record: bool = True,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict:
+        """
+        Process a video file or a folder of clips.
+
+        Returns a summary dict including the deduplicated events. When record is
+        True, events are written in batches with AttendanceService.create_attendance_batch.
+        """
+        started = time.monotonic()
+        paths = list_video_files(path)
+        segments = plan_segments(paths, self.segment_seconds, start_time)
+
+        dedup = AttendanceDeduplicator()
+        totals = {"frames_read": 0, "frames_sampled": 0, "faces": 0, "encoded": 0}
+        from app.utils.performance_config import PerformanceConfig
+        allocation = PerformanceConfig.compute_thread_allocation(workers=self.workers)
+        init_args = (self.gallery, self.performance_mode, self.use_advanced_features, allocation)
+
+        def collect(result, done):
+            events, stats = result
+            for key in totals:
+                totals[key] += stats.get(key, 0)
+            for event in events:
+                dedup.offer_earliest(event)
+            if progress:
+                progress(done, len(segments))
+
+        if self.workers == 1 or len(segments) <= 1:
+            _init_worker(*init_args)
+            for done, segment in enumerate(segments, start=1):
+                collect(process_segment(segment, self.sample_every_s, self.min_votes), done)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                     initargs=init_args) as pool:
+                futures = [
+                    pool.submit(process_segment, segment, self.sample_every_s, self.min_votes)
+                    for segment in segments
+                ]
+                for done, future in enumerate(as_completed(futures), start=1):
+                    collect(future.result(), done)
+
+        events = dedup.events()
+        recorded = 0
+        if record and events:
+            from app.services.attendance_service import AttendanceService
+            for start in range(0, len(events), 100):
+                written = AttendanceService.create_attendance_batch(events[start:start + 100])
+                recorded += len(written or [])
+
+        video_seconds = sum((s.end_frame - s.start_frame) / s.fps for s in segments)
+        return {
+            "videos": len(paths),
+            "segments": len(segments),
+            "video_seconds": round(video_seconds, 1),
+            "elapsed_s": round(time.monotonic() - started, 1),
+            **totals,
+            "events": events,
+            "recorded": recorded,
+        }
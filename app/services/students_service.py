@@ -4,7 +4,7 @@ Built on top of DataService for reusable database operations
 Now with pagination support!
 """
 
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from app.services.data_service import DataService
 from app.services.pagination import PaginationParams, PaginationResult, PaginationService, get_pagination_defaults
 from app.services.image_service import list_student_images, save_student_image_from_bytes, delete_student_image
@@ -17,6 +17,27 @@ class StudentsService:
         """Get all students ordered by student number"""
         return DataService.get_all("students", order_by)
     
+    @staticmethod
+    def iter_students(order_by: str = "student_id", batch_size: int = 500) -> Iterator[Dict]:
+        """Stream all students without loading the table into memory (raises on database errors)"""
+        return DataService.iter_all("students", order_by, batch_size)
+    
+    @staticmethod
+    def get_students_by_last_name(last_names: Iterable[str]) -> Dict[str, Dict]:
+        """
+        Map each given last name (upper-cased) to its first matching student
+        
+        One streamed pass over the students table; only matches are kept.
+        Used by the face gallery loaders to match image folders to students.
+        """
+        wanted = {name.upper() for name in last_names}
+        matches: Dict[str, Dict] = {}
+        for student in StudentsService.iter_students():
+            key = (student.get("last_name") or "").upper()
+            if key in wanted and key not in matches:
+                matches[key] = student
+        return matches
+    
     @staticmethod
     def get_student_by_id(student_id: int) -> Optional[Dict]:
         """Get student by ID"""
@@ -86,19 +107,21 @@ class StudentsService:
     @staticmethod
     def get_students_for_table() -> List[List]:
         """Get students data formatted for table display"""
-        students = StudentsService.get_all_students()
-        
-        # Convert to list of lists for table display
+        # Convert to list of lists for table display (streamed: no intermediate list of dicts)
         table_data = []
-        for student in students:
-            row = [
-                student.get("id", ""),
-                student.get("student_id", ""),
-                f"{student.get('first_name', '')} {student.get('last_name', '')}".strip(),
-                student.get("section", ""),
-                student.get("created_at", "").strftime("%Y-%m-%d") if student.get("created_at") else ""
-            ]
-            table_data.append(row)
+        try:
+            for student in StudentsService.iter_students():
+                row = [
+                    student.get("id", ""),
+                    student.get("student_id", ""),
+                    f"{student.get('first_name', '')} {student.get('last_name', '')}".strip(),
+                    student.get("section", ""),
+                    student.get("created_at", "").strftime("%Y-%m-%d") if student.get("created_at") else ""
+                ]
+                table_data.append(row)
+        except Exception as e:
+            print(f"❌ Could not load students: {e}")
+            return []
         
         return table_data
     
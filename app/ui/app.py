@@ -330,4 +330,10 @@ class Root(ctk.CTk):
         return default
 
 def run_app():
+    # Parse cascades and load dlib models once, before the first camera frame
+    try:
+        from app.services.face.model_registry import ModelRegistry
+        ModelRegistry.warm_up()
+    except Exception as e:
+        print(f"⚠️ Model warm-up skipped: {e}")
     Root().run()
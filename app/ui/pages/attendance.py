@@ -3,11 +3,16 @@ from datetime import datetime
 from app.ui.widget.gradient_button import GradientButton
 from app.ui.widget.data_table import DataTable
 from app.services.attendance_service import AttendanceService
+from app.services.attendance_events import AttendanceEvent
+from app.services.attendance_recorder import AttendanceRecorder
+from app.services.attendance_journal import AttendanceJournal
+from app.services.attendance_state import AttendanceDayState
 from app.ui.app import LUSH_FOREST_COLORS
 import threading
 import cv2
 from PIL import Image, ImageTk
 from app.services.face.detector import detect_faces
+from app.services.face.model_registry import ModelRegistry
 from app.services.face.recognition_algorithm import (
     FaceRecognitionEngine,
 )
@@ -29,7 +34,18 @@ class AttendancePage(ctk.CTkFrame):
             self._students_dir = self._resolve_students_dir()
             self._init_recognition_engine()
             self._student_info_cache = {}
-            self._last_logged_at_by_student_id = {}
+            # Students already marked today, so repeat recognitions skip the database
+            self._attendance_state = AttendanceDayState()
+            self._attendance_state.load_async()
+            # Attendance is journaled locally, then written by a background writer,
+            # never on the camera thread
+            self._journal = AttendanceJournal()
+            self._recorder = AttendanceRecorder(
+                on_recorded=self._on_attendance_recorded,
+                on_already_recorded=lambda event: self._attendance_state.mark(event.student_pk, event.attendance_date),
+                journal=self._journal,
+            )
+            self._recorder.start()
             self._detected_card_ids = set()
             self._build()
         except Exception as e:
@@ -210,6 +226,8 @@ class AttendancePage(ctk.CTkFrame):
 
         def run_loop():
             try:
+                # Cascades are per thread: parse them here, not on the first frame
+                ModelRegistry.warm_up_thread()
                 self._camera_loop()
             except Exception as e:
                 print(f"❌ Camera loop error: {e}")
@@ -247,6 +265,9 @@ class AttendancePage(ctk.CTkFrame):
             self._camera_thread.join(timeout=2.0)
         self._camera_thread = None
         
+        # Write queued attendance now instead of waiting for the next flush
+        self._flush_recorder_async()
+        
         # Clear image references to prevent memory leaks
         self._latest_photo = None
         
@@ -341,18 +362,18 @@ class AttendancePage(ctk.CTkFrame):
                 if section or student_no:
                     label_text = f"{display_name} | {student_no or section}"
                 
-                # Log attendance with cooldown (60s per student)
+                # Log attendance once per day; the in-memory state answers repeat sightings
                 try:
                     student_pk = student_info.get("id")
                     if student_pk:
-                        now = time.time()
-                        last = self._last_logged_at_by_student_id.get(student_pk, 0)
-                        if now - last > 60:  # 60 second cooldown
-                            if AttendanceService.create_today_once(student_pk, "present"):
-                                self._last_logged_at_by_student_id[student_pk] = now
-                                print(f"✅ Logged attendance for {display_name} (ID: {student_pk})")
-                                
-                                # No need to refresh table or stats since we removed them
+                        if not self._attendance_state.is_marked(student_pk):
+                            self._recorder.submit(AttendanceEvent(
+                                student_pk=student_pk,
+                                timestamp=datetime.now(),
+                                source="attendance_page",
+                                confidence=d.get("confidence", 0.0),
+                                student_info=student_info,
+                            ))
                         
                         # Push a one-time UI card for this student in this session
                         if student_pk and student_pk not in self._detected_card_ids:
@@ -370,9 +391,16 @@ class AttendancePage(ctk.CTkFrame):
                 color = (128, 128, 128)
                 cv2.rectangle(annotated, (left, top), (right, bottom), color, 2)
                 cv2.rectangle(annotated, (left, bottom - 35), (right, bottom), color, cv2.FILLED)
-                cv2.putText(annotated, "UNKNOWN", (left + 6, bottom - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, lineType=cv2.LINE_AA)
+                cv2.putText(annotated, d.get("quality_label", "UNKNOWN"), (left + 6, bottom - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, lineType=cv2.LINE_AA)
         return annotated
 
+    def _on_attendance_recorded(self, event):
+        """Called on the recorder's writer thread once a record is in the database"""
+        self._attendance_state.mark(event.student_pk, event.attendance_date)
+        info = event.student_info or {}
+        name = f"{info.get('first_name', '')} {info.get('last_name', '')}".strip() or "student"
+        print(f"✅ Logged attendance for {name} (ID: {event.student_pk})")
+
     def _resolve_students_dir(self):
         """Resolve default path to Images/Students from project root."""
         # attendance.py -> app/ui/pages/attendance.py
@@ -461,36 +489,66 @@ class AttendancePage(ctk.CTkFrame):
             # Remove from detected card IDs set to allow re-detection
             if student_pk and student_pk in self._detected_card_ids:
                 self._detected_card_ids.remove(student_pk)
+                self._recorder.forget(student_pk)
+                self._attendance_state.unmark(student_pk)
                 print(f"✅ Removed card for student ID {student_pk} - can be detected again")
             
             # Optional: Remove the attendance record from database
             # This allows the student to be marked present again
             if student_pk:
-                try:
-                    # Get today's attendance record for this student
-                    today = datetime.now().date()
-                    query = """
-                        SELECT id FROM attendance
-                        WHERE student_id = %s AND DATE(timestamp) = %s
-                        ORDER BY timestamp DESC
-                        LIMIT 1
-                    """
-                    from app.services.data_service import DataService
-                    attendance_record = DataService.execute_query(query, (student_pk, today))
-                    
-                    if attendance_record:
-                        attendance_id = attendance_record[0]['id']
-                        # Delete the attendance record
-                        delete_query = "DELETE FROM attendance WHERE id = %s"
-                        DataService.execute_query(delete_query, (attendance_id,))
-                        print(f"✅ Removed attendance record for student ID {student_pk}")
-                        
-                except Exception as e:
-                    print(f"⚠️ Failed to remove attendance record: {e}")
+                self._remove_attendance_record(student_pk)
             
         except Exception as e:
             print(f"⚠️ Failed to remove detected card: {e}")
 
+    def _remove_attendance_record(self, student_pk):
+        """Undo today's attendance for a student without blocking the UI thread"""
+        # Still queued: drop it before it reaches the database
+        if self._recorder.cancel(student_pk):
+            print(f"✅ Cancelled queued attendance for student ID {student_pk}")
+            return
+
+        def work():
+            removed = False
+            try:
+                # A batch already taken by the writer may hold the record; let it land first
+                self._recorder.flush(timeout=2.0)
+                day_start, day_end = AttendanceService.day_range(datetime.now().date())
+                query = """
+                    SELECT id FROM attendance
+                    WHERE student_id = %s AND timestamp >= %s AND timestamp < %s
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                """
+                from app.services.data_service import DataService
+                attendance_record = DataService.execute_query(query, (student_pk, day_start, day_end), prepared=True)
+                if attendance_record:
+                    delete_query = "DELETE FROM attendance WHERE id = %s"
+                    removed = bool(DataService.execute_query(delete_query, (attendance_record[0]['id'],), fetch=False))
+            except Exception as e:
+                print(f"⚠️ Failed to remove attendance record: {e}")
+            try:
+                self.after(0, lambda: self._on_attendance_removed(student_pk, removed))
+            except Exception:
+                pass  # Page already destroyed
+
+        threading.Thread(target=work, name="attendance-remove", daemon=True).start()
+
+    def _on_attendance_removed(self, student_pk, removed):
+        """UI thread: the flushed write may have marked the student again"""
+        self._attendance_state.unmark(student_pk)
+        self._recorder.forget(student_pk)
+        if removed:
+            print(f"✅ Removed attendance record for student ID {student_pk}")
+
+    def _flush_recorder_async(self):
+        """Write queued attendance from a worker thread; the outcome is reported on the UI thread"""
+        def work():
+            if not self._recorder.flush(timeout=2.0):
+                self.after(0, lambda: print("⚠️ Attendance still queued; it will be written in the background"))
+
+        threading.Thread(target=work, name="attendance-flush", daemon=True).start()
+
     def _init_recognition_engine(self):
         """Initialize FaceRecognitionEngine by loading encodings if folder exists."""
         try:
@@ -543,9 +601,20 @@ class AttendancePage(ctk.CTkFrame):
                 self._camera_thread.join(timeout=1.0)
             self._camera_thread = None
             self._latest_photo = None
+            # Write what is still queued before the page goes away
+            journal = getattr(self, "_journal", None)
+            if journal is not None:
+                self._journal = None
+                self._recorder.stop()
+                journal.close()
         except Exception as e:
             print(f"⚠️ Error during cleanup: {e}")
     
+    def destroy(self):
+        """Stop the camera and the attendance writer when the page is destroyed"""
+        self.cleanup()
+        super().destroy()
+    
     def __del__(self):
         """Destructor to ensure cleanup"""
         self.cleanup()
@@ -1,3 +1,7 @@
+import os
+
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
 STORAGE_BACKEND = "json"
 
 # MySQL Database Configuration
@@ -6,3 +10,24 @@ DB_USER = "root"
 DB_PASSWORD = ""
 DB_NAME = "school_face_attendance"
 DB_PORT = 3366
+DB_CONNECT_TIMEOUT = 3  # seconds; a dead server must not stall callers for long
+
+# Process-wide connection pool (app/services/db_pool.py)
+DB_POOL_SIZE = 5                   # Open connections kept per process
+DB_POOL_TIMEOUT = 2                # Seconds to wait for a free connection
+DB_POOL_HEALTH_CHECK_SECONDS = 30  # Ping connections idle longer than this before reuse
+DB_STATEMENT_CACHE_SIZE = 32       # Prepared statements kept per pooled connection (LRU)
+
+# Circuit breaker around the connection pool: after DB_BREAKER_FAILURES failed
+# connects or lost connections, stop trying for DB_BREAKER_RESET_SECONDS, then probe once
+DB_BREAKER_FAILURES = 3
+DB_BREAKER_RESET_SECONDS = 15
+
+# Local attendance journal (SQLite). Every attendance event is written here
+# first and replayed into MySQL, so nothing is lost while MySQL is down.
+ATTENDANCE_JOURNAL_PATH = os.path.join(_PROJECT_ROOT, "app", "data", "attendance_journal.db")
+
+# School day cutoffs (HH:MM) used by the end-of-day attendance job
+ATTENDANCE_LATE_AFTER = "08:00"      # "present" records after this become "late"
+ATTENDANCE_LATE_AFTER_BY_SECTION = {}  # e.g. {"BSCPE 2-B": "08:15"}; overrides ATTENDANCE_LATE_AFTER
+ATTENDANCE_ABSENT_AFTER = "17:00"    # Students with no record by now are marked "absent"
@@ -15,6 +15,8 @@ class PerformanceConfig:
         "min_detection_interval_ms": 100,
         "detection_cache_duration": 0.5,  # seconds
         "use_hog_model": True,  # Use HOG instead of CNN for speed
+        "detector_backend": "hog",  # haar, hog, cnn, dnn_ssd, yunet (see detector_backends.py)
+        "embedding_backend": "dlib",  # dlib or sface (see embedding_backends.py); galleries are per backend
     }
     
     # Haar Cascade Settings
@@ -25,6 +27,56 @@ class PerformanceConfig:
         "flags": "CASCADE_SCALE_IMAGE"
     }
     
+    # Pre-encode quality gate (checked on the grayscale face crop before dlib encoding)
+    QUALITY_GATE = {
+        "enabled": True,
+        "min_face_size": 60,      # pixels (shorter side, original frame coordinates)
+        "min_sharpness": 40.0,    # Laplacian variance of the downscaled crop
+        "min_brightness": 40.0,   # mean gray level
+        "max_brightness": 220.0,
+    }
+    
+    # Per-track identity cache (see match_cache.py); thresholds scale with match_threshold
+    IDENTITY_CACHE = {
+        "enabled": True,
+        "reverify_seconds": 3.0,   # Full gallery match for a confirmed track at least this often
+        "drift_ratio": 0.6,        # Re-verify early if the embedding moved > 0.6 x match_threshold
+        "margin_ratio": 0.15,      # Only cache identities beating the runner-up by 0.15 x match_threshold
+        "tracker_iou": 0.3,
+        "tracker_max_missed": 5,   # Processed frames without the face before the track ends
+    }
+    
+    # Recent-arrivals hot gallery, probed before the full gallery (see match_cache.py)
+    HOT_GALLERY = {
+        "enabled": True,
+        "capacity": 32,            # Students kept in the LRU hot set
+        "accept_ratio": 0.8,       # Accept hot matches closer than 0.8 x match_threshold
+        "margin_ratio": 0.15,      # ...that beat other hot students by 0.15 x match_threshold
+        "cross_check_every": 10,   # Every Nth hot match is re-checked against the full gallery
+        "rival_rows": 8,           # Closest other-student rows probed alongside each hot student
+    }
+    
+    # Negative cache for unknown faces, per track (see match_cache.py)
+    NEGATIVE_CACHE = {
+        "enabled": True,
+        "unknown_ratio": 1.2,      # "Confidently unknown": best distance >= 1.2 x match_threshold
+        "min_frames": 2,           # ...on this many consecutive searches
+        "ttl_seconds": 10.0,       # Search again after this long even if the track continues
+        "drift_ratio": 0.6,        # or when the embedding moves > 0.6 x match_threshold
+    }
+    
+    # Thread budget shared by OpenCV, BLAS/OpenMP (numpy, dlib) and our worker pools.
+    # None means "derive from the CPU count"; see compute_thread_allocation().
+    THREAD_BUDGET = {
+        "total_threads": None,        # CPUs the app may use (default: os.cpu_count())
+        "reserved_threads": 1,        # Tk main loop, camera capture and DB threads
+        "recognition_workers": None,  # Recognition processes/threads (default: half the remaining CPUs)
+        "opencv_threads": None,       # cv2.setNumThreads per worker (default: remaining CPUs / workers)
+        "blas_threads": 1,            # OMP/OpenBLAS/MKL threads; >1 oversubscribes with OpenCV's pool
+    }
+    
+    _applied_thread_budget: Dict[str, Any] = {}
+    
     # Camera Settings
     CAMERA = {
         "fps_limit": 30,
@@ -32,6 +84,14 @@ class PerformanceConfig:
         "buffer_size": 1,  # Reduce buffer for lower latency
     }
     
+    # Write-behind attendance recorder (see attendance_recorder.py)
+    ATTENDANCE_RECORDER = {
+        "flush_interval_ms": 250,  # Queued events are written at most this long after submission
+        "max_batch": 100,          # Rows per multi-row INSERT
+        "queue_size": 1000,        # Events waiting for the writer; submit() drops events beyond this
+        "replay_interval_ms": 5000,  # How often journaled events are retried while MySQL is down
+    }
+    
     # Performance Modes
     PERFORMANCE_MODES = {
         "fast": {
@@ -39,6 +99,7 @@ class PerformanceConfig:
             "downscale_factor": 0.3,
             "min_detection_interval_ms": 50,
             "detection_cache_duration": 0.2,
+            "detector_backend": "yunet",  # Falls back to hog if the model file is missing
         },
         "balanced": {
             "process_every_n_frames": 2,
@@ -67,11 +128,103 @@ class PerformanceConfig:
         """Get Haar cascade configuration"""
         return cls.HAAR_CASCADE.copy()
     
+    @classmethod
+    def get_quality_gate_config(cls) -> Dict[str, Any]:
+        """Get pre-encode quality gate configuration"""
+        return cls.QUALITY_GATE.copy()
+    
+    @classmethod
+    def get_identity_cache_config(cls) -> Dict[str, Any]:
+        """Get per-track identity cache configuration"""
+        return cls.IDENTITY_CACHE.copy()
+    
+    @classmethod
+    def get_hot_gallery_config(cls) -> Dict[str, Any]:
+        """Get hot gallery configuration"""
+        return cls.HOT_GALLERY.copy()
+    
+    @classmethod
+    def get_negative_cache_config(cls) -> Dict[str, Any]:
+        """Get unknown-face negative cache configuration"""
+        return cls.NEGATIVE_CACHE.copy()
+    
+    @classmethod
+    def get_thread_budget_config(cls) -> Dict[str, Any]:
+        """Get thread budget configuration"""
+        return cls.THREAD_BUDGET.copy()
+    
+    @classmethod
+    def compute_thread_allocation(cls, cpu_count: int = None, workers: int = None) -> Dict[str, Any]:
+        """
+        Split the CPUs between the UI, recognition workers and the libraries'
+        internal pools so that workers x (opencv + blas) threads fit the budget.
+
+        workers overrides the configured worker count (e.g. --workers N), and
+        the OpenCV threads per worker are sized for it.
+        """
+        budget = cls.get_thread_budget_config()
+        total = budget["total_threads"] or cpu_count or os.cpu_count() or 1
+        available = max(1, total - budget["reserved_threads"])
+        workers = max(1, workers or budget["recognition_workers"] or available // 2)
+        opencv_threads = max(1, budget["opencv_threads"] or available // workers)
+        blas_threads = max(1, budget["blas_threads"])
+        return {
+            "cpu_count": total,
+            "reserved_threads": budget["reserved_threads"],
+            "recognition_workers": workers,
+            "opencv_threads": opencv_threads,
+            "blas_threads": blas_threads,
+            # CPU-bound threads; the calling thread of each worker is shared by OpenCV and BLAS
+            "compute_threads": budget["reserved_threads"] + workers * (opencv_threads + blas_threads - 1),
+        }
+    
+    @classmethod
+    def apply_thread_budget(cls, allocation: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Apply the thread budget to this process.
+
+        BLAS/OpenMP read their environment variables when they are first loaded,
+        so call this before numpy, cv2 or face_recognition are imported (main.py
+        does). Variables already set in the environment are left alone.
+        """
+        allocation = allocation or cls.compute_thread_allocation()
+        blas = str(allocation["blas_threads"])
+        for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS"):
+            os.environ.setdefault(var, blas)
+        
+        try:
+            import cv2
+            cv2.setNumThreads(allocation["opencv_threads"])
+            allocation["opencv_threads_effective"] = cv2.getNumThreads()
+        except ImportError:
+            pass
+        
+        # BLAS already loaded (e.g. numpy imported first): resize its pool at runtime if possible
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(allocation["blas_threads"])
+        except ImportError:
+            pass
+        
+        allocation["blas_env"] = os.environ.get("OMP_NUM_THREADS")
+        cls._applied_thread_budget = allocation
+        return allocation
+    
+    @classmethod
+    def get_applied_thread_budget(cls) -> Dict[str, Any]:
+        """The allocation applied to this process (empty if apply_thread_budget was not called)"""
+        return dict(cls._applied_thread_budget)
+    
     @classmethod
     def get_camera_config(cls) -> Dict[str, Any]:
         """Get camera configuration"""
         return cls.CAMERA.copy()
     
+    @classmethod
+    def get_attendance_recorder_config(cls) -> Dict[str, Any]:
+        """Get write-behind attendance recorder configuration"""
+        return cls.ATTENDANCE_RECORDER.copy()
+    
     @classmethod
     def set_performance_mode(cls, mode: str) -> None:
         """Set performance mode by updating environment variable"""
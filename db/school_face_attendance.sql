@@ -35,11 +35,18 @@ CREATE TABLE faces (
 );
 
 -- Attendance Table
+-- One row per student per day, enforced by uq_attendance_student_day.
+-- Date filters use half-open timestamp ranges so the idx_attendance_* indexes apply.
 CREATE TABLE attendance (
     id INT AUTO_INCREMENT PRIMARY KEY,
     student_id INT NOT NULL,
-    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    attendance_date DATE AS (DATE(timestamp)) STORED,
     status ENUM('present', 'late', 'absent') DEFAULT 'present',
+    UNIQUE KEY uq_attendance_student_day (student_id, attendance_date),
+    INDEX idx_attendance_timestamp (timestamp),
+    INDEX idx_attendance_student_timestamp (student_id, timestamp),
+    INDEX idx_attendance_status_timestamp (status, timestamp),
     FOREIGN KEY (student_id) REFERENCES students (id) ON DELETE CASCADE
 );
 
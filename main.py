@@ -1,3 +1,8 @@
+from app.utils.performance_config import PerformanceConfig
+
+# Size OpenCV/BLAS thread pools before numpy, cv2 and dlib are loaded
+PerformanceConfig.apply_thread_budget()
+
 from app.ui.app import run_app
 
 if __name__ == "__main__":
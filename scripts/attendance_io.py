@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Bulk attendance import/export (CSV)
+
+Usage:
+    python scripts/attendance_io.py import <file.csv> [--chunk-size N]
+    python scripts/attendance_io.py export <file.csv> --from YYYY-MM-DD --to YYYY-MM-DD
+
+Examples:
+    python scripts/attendance_io.py import backfill_2026_sem1.csv
+    python scripts/attendance_io.py export attendance_2026.csv --from 2026-01-01 --to 2026-12-31
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.services.attendance_transfer import AttendanceTransferService
+
+
+def _date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk attendance import and export")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = sub.add_parser("import", help="Import attendance rows from CSV")
+    import_parser.add_argument("path", help="CSV with student_no (or student_pk), timestamp, status")
+    import_parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per INSERT/transaction")
+
+    export_parser = sub.add_parser("export", help="Export a date range to CSV")
+    export_parser.add_argument("path", help="Output CSV file")
+    export_parser.add_argument("--from", dest="start", type=_date, required=True, help="First day (YYYY-MM-DD)")
+    export_parser.add_argument("--to", dest="end", type=_date, required=True, help="Last day, inclusive (YYYY-MM-DD)")
+    export_parser.add_argument("--batch-size", type=int, default=1000, help="Rows fetched per round trip")
+    args = parser.parse_args()
+
+    print("📦 Attendance Import/Export")
+    print("=" * 50)
+
+    if args.command == "import":
+        if not os.path.isfile(args.path):
+            print(f"❌ File not found: {args.path}")
+            sys.exit(1)
+        summary = AttendanceTransferService.import_csv(args.path, chunk_size=args.chunk_size)
+        print(f"   Rows read: {summary['rows']} in {summary['elapsed_s']:.2f}s ({summary['chunks']} chunks)")
+        print(f"   Inserted: {summary['inserted']}, already recorded: {summary['skipped']}")
+        print(f"   Unknown students: {summary['unknown_students']}, invalid rows: {summary['invalid']}")
+    else:
+        summary = AttendanceTransferService.export_csv(args.path, args.start, args.end, batch_size=args.batch_size)
+        print(f"   Exported {summary['rows']} rows to {args.path} in {summary['elapsed_s']:.2f}s")
+
+    if summary["error"]:
+        print(f"❌ {summary['error']}")
+        sys.exit(1)
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
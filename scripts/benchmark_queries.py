@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark hot queries as plain text vs. cached server-side prepared statements
+
+Usage:
+    python scripts/benchmark_queries.py [--iterations N]
+
+Examples:
+    python scripts/benchmark_queries.py
+    python scripts/benchmark_queries.py --iterations 5000
+
+Each query runs N times on one pooled connection, first sent as text
+(parsed by the server on every call), then through the connection's
+prepared-statement cache (parsed once). Needs a migrated MySQL database
+with at least one student.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.services.data_service import DataService
+from app.services.attendance_service import AttendanceService
+
+HOT_QUERIES = {
+    "attendance existence check": """
+        SELECT id FROM attendance
+        WHERE student_id = %s AND timestamp >= %s AND timestamp < %s
+        ORDER BY timestamp DESC
+        LIMIT 1
+    """,
+    "get_by_id(students)": "SELECT * FROM students WHERE id = %s",
+    "students page": """
+        SELECT id, student_id, first_name, last_name, section
+        FROM students
+        ORDER BY last_name ASC
+        LIMIT %s OFFSET %s
+    """,
+}
+
+
+def _server_prepares(conn) -> int:
+    cursor = conn.cursor()
+    cursor.execute("SHOW SESSION STATUS LIKE 'Com_stmt_prepare'")
+    value = int(cursor.fetchone()[1])
+    cursor.close()
+    return value
+
+
+def _time_plain(conn, sql, params, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        cursor.close()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+
+def _time_prepared(conn, sql, params, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        cursor = conn.prepared_cursor(sql)
+        cursor.execute(params)
+        cursor.fetchall()
+    return (time.perf_counter() - started) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plain vs. prepared hot query benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Executions per query and mode")
+    args = parser.parse_args()
+
+    print("⏱️ Prepared Statement Benchmark")
+    print("=" * 50)
+
+    students = DataService.execute_query("SELECT id FROM students LIMIT 1")
+    if not students:
+        print("❌ Needs a reachable, migrated database with at least one student")
+        sys.exit(1)
+    student_pk = students[0]["id"]
+    day_start, day_end = AttendanceService.day_range(date.today())
+    params_by_name = {
+        "attendance existence check": (student_pk, day_start, day_end),
+        "get_by_id(students)": (student_pk,),
+        "students page": (20, 0),
+    }
+
+    with DataService.connection() as conn:
+        for name, sql in HOT_QUERIES.items():
+            params = params_by_name[name]
+            plain_ms = _time_plain(conn, sql, params, args.iterations)
+            prepares_before = _server_prepares(conn)
+            prepared_ms = _time_prepared(conn, sql, params, args.iterations)
+            prepares = _server_prepares(conn) - prepares_before
+            saved = (1 - prepared_ms / plain_ms) * 100 if plain_ms else 0.0
+            print(f"📊 {name}")
+            print(f"   text:     {plain_ms:.3f} ms/query ({args.iterations} server parses)")
+            print(f"   prepared: {prepared_ms:.3f} ms/query ({prepares} server parse(s))")
+            print(f"   saved:    {saved:.1f}%")
+
+    stats = DataService.get_pool_stats()
+    print(f"ℹ️ Statement cache: {stats['statements_prepared']} prepared, "
+          f"{stats['statement_cache_hits']} hits, {stats['statements_evicted']} evicted")
+
+
+if __name__ == "__main__":
+    main()
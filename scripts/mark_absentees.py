@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+End-of-day attendance job: late cutoffs and absentees
+
+Usage:
+    python scripts/mark_absentees.py [--date YYYY-MM-DD] [--section NAME ...]
+    python scripts/mark_absentees.py --daily
+
+Examples:
+    python scripts/mark_absentees.py                          # today, all sections
+    python scripts/mark_absentees.py --date 2026-10-16 --section "BSCPE 2-B"
+    python scripts/mark_absentees.py --daily                  # run every day at ATTENDANCE_ABSENT_AFTER
+
+Cutoffs come from ATTENDANCE_LATE_AFTER, ATTENDANCE_LATE_AFTER_BY_SECTION and
+ATTENDANCE_ABSENT_AFTER in app/utils/config.py. Instead of --daily, the
+one-shot form can be scheduled with cron or Task Scheduler.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.services.attendance_jobs import AttendanceJobs
+
+
+def _run(target_date, sections):
+    result = AttendanceJobs.mark_day(target_date, sections)
+    if result["error"]:
+        print(f"❌ {result['date']}: {result['error']}")
+        return False
+    print(f"✅ {result['date']}: {result['late']} marked late, {result['absent']} marked absent "
+          f"in {result['elapsed_ms']:.0f} ms")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark late arrivals and absentees for a day")
+    parser.add_argument("--date", type=lambda v: datetime.strptime(v, "%Y-%m-%d").date(),
+                        help="Day to process (default: today)")
+    parser.add_argument("--section", action="append", help="Limit to a section (repeatable)")
+    parser.add_argument("--daily", action="store_true", help="Keep running and process each day at the absent cutoff")
+    args = parser.parse_args()
+
+    print("🗓️ End-of-day Attendance")
+    print("=" * 50)
+
+    if not args.daily:
+        sys.exit(0 if _run(args.date, args.section) else 1)
+
+    while True:
+        run_at = AttendanceJobs.next_run_at()
+        print(f"ℹ️ Next run at {run_at:%Y-%m-%d %H:%M}")
+        time.sleep(max(0.0, (run_at - datetime.now()).total_seconds()))
+        _run(run_at.date(), args.section)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ Database Migration CLI - Laravel style
 
 Usage:
     python migrate.py migrate    # Run migrations
+    python migrate.py upgrade    # Apply pending migrations, keeping existing data
     python migrate.py seed       # Run seeders  
     python migrate.py fresh      # Drop, migrate, and seed
 """
@@ -26,6 +27,10 @@ def main():
             print("Running database migration...")
             DatabaseService.migrate()
 
+        elif command == "upgrade":
+            print("Applying pending migrations...")
+            DatabaseService.upgrade()
+
         elif command == "seed":
             print("Running database seeders...")
             DatabaseService.seed()
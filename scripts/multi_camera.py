@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Headless multi-gate attendance: several cameras, one recognition engine
+
+Usage:
+    python scripts/multi_camera.py <source> [<source> ...] [--mode balanced]
+
+Sources are camera indexes (0, 1, ...) or video file paths. Press Ctrl+C to stop.
+"""
+import argparse
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.utils.performance_config import PerformanceConfig
+
+# Size OpenCV/BLAS thread pools before numpy, cv2 and dlib are loaded
+PerformanceConfig.apply_thread_budget()
+
+from app.services.face.recognition_algorithm import FaceRecognitionEngine
+from app.services.face.camera_manager import CameraManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several cameras against one shared gallery")
+    parser.add_argument("sources", nargs="+", help="Camera indexes or video file paths")
+    parser.add_argument("--students-dir", default="app/data/images/students", help="Student images folder")
+    parser.add_argument("--mode", default=PerformanceConfig.get_current_mode(), help="Performance mode")
+    parser.add_argument("--stats-every", type=float, default=5.0, help="Seconds between stats reports")
+    args = parser.parse_args()
+
+    engine = FaceRecognitionEngine(performance_mode=args.mode)
+    engine.update_known_from_directory(args.students_dir)
+    print(f"✅ Loaded {len(engine.known_encodings)} face encodings (shared by all cameras)")
+
+    manager = CameraManager(engine)
+    for source in args.sources:
+        spec = int(source) if source.isdigit() else source
+        camera_id = manager.add_camera(spec)
+        if camera_id:
+            print(f"📷 Camera started: {camera_id}")
+
+    if not manager.sources:
+        print("❌ No camera could be opened")
+        sys.exit(1)
+
+    manager.start()
+    try:
+        while any(camera.is_running for camera in manager.sources.values()):
+            time.sleep(args.stats_every)
+            print("\n📊 Camera stats:")
+            for camera_id, stats in manager.get_stats().items():
+                print(f"   {camera_id}: {stats['fps']} fps, latency {stats['latency_ms']} ms "
+                      f"(p95 {stats['latency_p95_ms']} ms), skipped {stats['frames_skipped']} frames")
+    except KeyboardInterrupt:
+        print("\n🔄 Stopping cameras...")
+    finally:
+        manager.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """
 Performance tuning script for face recognition system
 """
+import json
 import time
 import cv2
 import numpy as np
@@ -21,6 +22,10 @@ def benchmark_face_recognition(performance_mode="balanced", test_duration=10):
         print(f"❌ Students directory not found: {students_dir}")
         return
     
+    allocation = PerformanceConfig.apply_thread_budget()
+    print(f"🧵 {allocation['opencv_threads']} OpenCV / {allocation['blas_threads']} BLAS threads "
+          f"({allocation['cpu_count']} CPUs)")
+    
     # Initialize engine
     engine = FaceRecognitionEngine(performance_mode=performance_mode)
     engine.update_known_from_directory(students_dir)
@@ -53,6 +58,22 @@ def benchmark_face_recognition(performance_mode="balanced", test_duration=10):
     print(f"   Total frames processed: {frame_count}")
     print(f"   Total detections: {detection_count}")
     print(f"   Average detections per frame: {detection_count/frame_count:.2f}")
+    gate_stats = engine.quality_gate.get_stats()
+    print(f"   Quality gate: {gate_stats['checked']} checked, {gate_stats['encodes_saved']} encodes saved "
+          f"({gate_stats['rejected']})")
+    if engine.identity_cache is not None:
+        cache_stats = engine.identity_cache.get_stats()
+        print(f"   Track identity cache: {cache_stats['hits']}/{cache_stats['lookups']} matches avoided "
+              f"({cache_stats['hit_rate']:.0%}), {cache_stats['reverifications']} re-verifications, "
+              f"{cache_stats['drift_invalidations']} drift invalidations")
+    if engine.hot_gallery is not None:
+        hot_stats = engine.hot_gallery.get_stats()
+        print(f"   Hot gallery: {hot_stats['hit_ratio']:.0%} hit ratio over {hot_stats['probes']} probes, "
+              f"{hot_stats['cross_check_failures']}/{hot_stats['cross_checks']} cross-checks disagreed")
+    if engine.unknown_cache is not None:
+        unknown_stats = engine.unknown_cache.get_stats()
+        print(f"   Unknown-face cache: {unknown_stats['hits']} gallery searches skipped "
+              f"({unknown_stats['hit_rate']:.0%} of lookups)")
     print()
 
 def compare_performance_modes():
@@ -65,6 +86,177 @@ def compare_performance_modes():
     for mode in modes:
         benchmark_face_recognition(mode, test_duration=5)
 
+def load_benchmark_images(images_dir="app/data/images/students", max_images=50, with_paths=False):
+    """
+    Load enrollment photos (one face each) as RGB images for detector benchmarks.
+    With with_paths, returns (path relative to images_dir, image) pairs instead.
+    """
+    images = []
+    for root, _, files in os.walk(images_dir):
+        for file_name in sorted(files):
+            if not file_name.lower().endswith((".jpg", ".jpeg", ".png")):
+                continue
+            path = os.path.join(root, file_name)
+            image = cv2.imread(path)
+            if image is not None:
+                rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+                images.append((os.path.relpath(path, images_dir).replace(os.sep, "/"), rgb) if with_paths else rgb)
+            if len(images) >= max_images:
+                return images
+    return images
+
+def load_face_boxes(annotations_path):
+    """
+    Read face box annotations: a JSON object mapping image paths (relative to
+    the images folder, '/'-separated) to lists of [top, right, bottom, left].
+    """
+    with open(annotations_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {path: [tuple(int(v) for v in box) for box in boxes] for path, boxes in data.items()}
+
+def benchmark_detectors(images_dir="app/data/images/students", annotations_path=None):
+    """Compare face detector backends by latency per megapixel and recall"""
+    from app.services.face.detector_backends import DETECTOR_BACKENDS, available_backends, create_face_detector, benchmark_detector
+    
+    print("🔍 Face Detector Backend Comparison")
+    print("=" * 50)
+    
+    loaded = load_benchmark_images(images_dir, with_paths=True)
+    if not loaded:
+        print(f"❌ No images found in {images_dir}")
+        return
+    
+    available = available_backends()
+    annotations_path = annotations_path or os.path.join(images_dir, "face_boxes.json")
+    reference = None
+    if os.path.isfile(annotations_path):
+        # Hand-labelled boxes: every backend, HOG included, gets a real recall
+        boxes_by_path = load_face_boxes(annotations_path)
+        loaded = [(path, image) for path, image in loaded if path in boxes_by_path]
+        images = [image for _, image in loaded]
+        ground_truth = [boxes_by_path[path] for path, _ in loaded]
+        if not images:
+            print(f"❌ None of the images are listed in {annotations_path}")
+            return
+        print(f"✅ Loaded {len(images)} annotated images ({annotations_path})")
+    else:
+        # No annotations: dlib HOG (the previous default) supplies the reference
+        # box. Photos where it finds no single face still count as one face each,
+        # found by any detection, so faces HOG misses are still scored
+        reference = "hog"
+        if reference not in available:
+            print(f"❌ No annotations at {annotations_path} and the reference detector "
+                  "(dlib HOG via face_recognition) is not installed")
+            return
+        reference_detector = create_face_detector(reference)
+        images = [image for _, image in loaded]
+        ground_truth = []
+        for image in images:
+            boxes = reference_detector.detect(image)
+            ground_truth.append(boxes if len(boxes) == 1 else None)
+        unboxed = sum(1 for boxes in ground_truth if boxes is None)
+        print(f"✅ Loaded {len(images)} enrollment images (1 face each, boxes from '{reference}', "
+              f"{unboxed} without a reference box)")
+        print(f"ℹ️ No annotations at {annotations_path}; HOG recall cannot be measured against itself")
+    print("ℹ️ Recall counts a face as found when a box overlaps the expected one with IoU >= 0.5\n")
+    
+    print(f"{'Backend':<10} {'ms/MP':>10} {'Recall':>8}")
+    for name in DETECTOR_BACKENDS:
+        if name not in available:
+            print(f"{name:<10} {'n/a':>10} {'n/a':>8}   (model files not installed)")
+            continue
+        if name == "cnn":
+            continue  # Impractically slow on CPU
+        result = benchmark_detector(create_face_detector(name), images, ground_truth, repeats=3)
+        if name == reference:
+            print(f"{name:<10} {result['ms_per_megapixel']:>10} {'n/a':>8}   (reference)")
+        else:
+            print(f"{name:<10} {result['ms_per_megapixel']:>10} {result['recall']:>8.1%}")
+    
+    print("\n💡 Pick the fastest backend whose recall is still acceptable and set it as")
+    print("   'detector_backend' for the performance mode in app/utils/performance_config.py")
+
+def benchmark_embeddings(images_dir="app/data/images/students"):
+    """Compare embedding backends by throughput and identification accuracy"""
+    from app.services.face.detector_backends import create_face_detector
+    from app.services.face.embedding_backends import (
+        EMBEDDING_BACKENDS, available_embedding_backends, create_embedding_backend, benchmark_embedding_backend
+    )
+    
+    print("🧬 Face Embedding Backend Comparison")
+    print("=" * 50)
+    
+    # Same face boxes (and alignment landmarks) for every backend: largest detection per
+    # photo from the configured detector, as the engine would find it, labelled by folder
+    detector = create_face_detector(PerformanceConfig.get_config().get("detector_backend") or "hog")
+    samples, alignment = [], []
+    for student in sorted(os.listdir(images_dir)) if os.path.isdir(images_dir) else []:
+        for image in load_benchmark_images(os.path.join(images_dir, student), max_images=20):
+            locations = detector.detect(image)
+            if locations:
+                largest = max(locations, key=lambda l: (l[1] - l[3]) * (l[2] - l[0]))
+                samples.append((image, largest, student))
+                alignment.append(detector.landmarks_for(largest))
+    if not samples:
+        print(f"❌ No faces found in {images_dir}")
+        return
+    print(f"✅ {len(samples)} faces of {len(set(s[2] for s in samples))} students (detector: {detector.name})\n")
+    
+    available = available_embedding_backends()
+    print(f"{'Backend':<8} {'Faces/s':>10} {'Accuracy':>10}")
+    for name in EMBEDDING_BACKENDS:
+        if name not in available:
+            print(f"{name:<8} {'n/a':>10} {'n/a':>10}   (not installed)")
+            continue
+        result = benchmark_embedding_backend(create_embedding_backend(name), samples, alignment=alignment)
+        print(f"{name:<8} {result['faces_per_second']:>10} {result['accuracy']:>10.1%}")
+    
+    print("\n💡 Set 'embedding_backend' in app/utils/performance_config.py; galleries must be")
+    print("   rebuilt after switching, since embeddings from different backends do not mix")
+
+def print_thread_budget():
+    """Show how the CPUs are split between the UI, workers and library thread pools"""
+    allocation = PerformanceConfig.compute_thread_allocation()
+    print(f"\n🧵 Thread Budget ({allocation['cpu_count']} CPUs):")
+    print(f"   Reserved (UI, capture, DB): {allocation['reserved_threads']}")
+    print(f"   Recognition workers:        {allocation['recognition_workers']}")
+    print(f"   OpenCV threads per worker:  {allocation['opencv_threads']}")
+    print(f"   BLAS/OpenMP threads:        {allocation['blas_threads']}")
+    print(f"   CPU-bound threads:          {allocation['compute_threads']}")
+    if allocation["compute_threads"] > allocation["cpu_count"]:
+        print("   ⚠️  Budget exceeds the CPU count - expect erratic latency; lower THREAD_BUDGET values")
+    else:
+        print("   ✅ Budget fits the available CPUs")
+
+def benchmark_transparent_api(frames=50):
+    """Time the preprocessing/detection pipeline with plain ndarrays and with cv2.UMat"""
+    from app.services.face.gpu_acceleration import TransparentAccelerator
+    
+    print("⚡ Transparent API (UMat/OpenCL) Benchmark")
+    print("=" * 50)
+    
+    images = load_benchmark_images(max_images=10)
+    test_frames = [cv2.resize(cv2.cvtColor(img, cv2.COLOR_RGB2BGR), (640, 480)) for img in images] \
+        or [np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)]
+    
+    results = {}
+    for mode in ("numpy", "umat"):
+        accelerator = TransparentAccelerator(mode)
+        accelerator.detect_faces(test_frames[0])  # Warm-up: OpenCL kernels compile on first use
+        started = time.perf_counter()
+        for i in range(frames):
+            frame = test_frames[i % len(test_frames)]
+            normalized = accelerator.equalize_lightness(frame, clip_limit=3.0)
+            accelerator.downscale_to_rgb(normalized, 0.5)
+            accelerator.detect_faces(normalized)
+        results[mode] = (time.perf_counter() - started) * 1000 / frames
+        print(f"   {accelerator.backend_name:<24} {results[mode]:7.1f} ms/frame")
+    
+    speedup = results["numpy"] / results["umat"] if results["umat"] else 0.0
+    print(f"\n📊 UMat speedup: {speedup:.2f}x")
+    if speedup < 1.0:
+        print("   ℹ️  No OpenCL device or slow transfers - the 'auto' mode keeps plain ndarrays here")
+
 def optimize_for_your_system():
     """Provide optimization recommendations"""
     print("💡 Optimization Recommendations:")
@@ -93,6 +285,8 @@ def optimize_for_your_system():
     except ImportError:
         print("   ℹ️  Install psutil for detailed system analysis")
     
+    print_thread_budget()
+    
     print("\n🎯 Recommended Settings:")
     print("   For real-time applications: 'fast' mode")
     print("   For accuracy-critical tasks: 'accurate' mode")
@@ -123,18 +317,30 @@ if __name__ == "__main__":
             benchmark_face_recognition(mode)
         elif command == "compare":
             compare_performance_modes()
+        elif command == "detectors":
+            images_dir = sys.argv[2] if len(sys.argv) > 2 else "app/data/images/students"
+            annotations_path = sys.argv[3] if len(sys.argv) > 3 else None
+            benchmark_detectors(images_dir, annotations_path)
+        elif command == "embeddings":
+            images_dir = sys.argv[2] if len(sys.argv) > 2 else "app/data/images/students"
+            benchmark_embeddings(images_dir)
+        elif command == "tapi":
+            benchmark_transparent_api()
         elif command == "optimize":
             optimize_for_your_system()
         elif command == "set":
             mode = sys.argv[2] if len(sys.argv) > 2 else "balanced"
             set_performance_mode(mode)
         else:
-            print("❌ Unknown command. Use: benchmark, compare, optimize, or set")
+            print("❌ Unknown command. Use: benchmark, compare, detectors, embeddings, tapi, optimize, or set")
     else:
         print("🔧 Face Recognition Performance Tuner")
         print("Usage:")
         print("  python performance_tuner.py benchmark [mode]  - Benchmark specific mode")
         print("  python performance_tuner.py compare           - Compare all modes")
+        print("  python performance_tuner.py detectors [dir]   - Compare face detector backends")
+        print("  python performance_tuner.py embeddings [dir]  - Compare face embedding backends")
+        print("  python performance_tuner.py tapi              - Benchmark UMat/OpenCL vs NumPy path")
         print("  python performance_tuner.py optimize          - Get optimization tips")
         print("  python performance_tuner.py set [mode]        - Set performance mode")
         print("\nModes: fast, balanced, accurate")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Offline attendance from recorded camera footage
+
+Usage:
+    python scripts/process_video.py <video-or-folder> [options]
+
+Examples:
+    python scripts/process_video.py recordings/gate1_2026-10-16.mp4
+    python scripts/process_video.py recordings/ --start "2026-10-16 06:30:00" --workers 4
+    python scripts/process_video.py recordings/ --dry-run
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from app.utils.performance_config import PerformanceConfig
+
+# Size OpenCV/BLAS thread pools before numpy, cv2 and dlib are loaded; worker
+# processes inherit the environment variables
+PerformanceConfig.apply_thread_budget()
+
+from app.services.face.video_batch import OfflineVideoProcessor
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process recorded footage into attendance records")
+    parser.add_argument("path", help="Video file or folder of clips")
+    parser.add_argument("--students-dir", default="app/data/images/students", help="Student images folder")
+    parser.add_argument("--start", help="Wall-clock time of the first frame (YYYY-MM-DD HH:MM:SS); "
+                                        "defaults to file modification time minus duration")
+    parser.add_argument("--mode", default="fast", help="Performance mode: fast, balanced, accurate")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: thread budget in PerformanceConfig)")
+    parser.add_argument("--sample-every", type=float, default=0.5, help="Seconds of video between analysed frames")
+    parser.add_argument("--min-votes", type=int, default=2, help="Matches needed before a track counts")
+    parser.add_argument("--segment-seconds", type=float, default=300, help="Video seconds per worker task")
+    parser.add_argument("--advanced", action="store_true", help="Enable advanced preprocessing and validation")
+    parser.add_argument("--dry-run", action="store_true", help="Print events without writing attendance")
+    args = parser.parse_args()
+
+    start_time = datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S") if args.start else None
+
+    print("🎞️ Offline Attendance Processing")
+    print("=" * 50)
+
+    processor = OfflineVideoProcessor(
+        students_dir=args.students_dir,
+        performance_mode=args.mode,
+        workers=args.workers,
+        sample_every_s=args.sample_every,
+        min_votes=args.min_votes,
+        segment_seconds=args.segment_seconds,
+        use_advanced_features=args.advanced,
+    )
+    print(f"✅ Loaded {len(processor.gallery[0])} face encodings, using {processor.workers} worker(s)")
+
+    def progress(done, total):
+        print(f"   🔄 Segments processed: {done}/{total}")
+
+    try:
+        summary = processor.process(args.path, start_time=start_time, record=not args.dry_run, progress=progress)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("\n📋 Attendance events:")
+    for event in summary["events"]:
+        info = event.student_info or {}
+        name = f"{info.get('first_name', '')} {info.get('last_name', '')}".strip()
+        print(f"   {event.timestamp:%Y-%m-%d %H:%M:%S}  {name} (ID: {event.student_pk})  [{event.source}]")
+
+    speedup = summary["video_seconds"] / summary["elapsed_s"] if summary["elapsed_s"] else 0
+    print("\n📊 Summary:")
+    print(f"   Videos: {summary['videos']} ({summary['segments']} segments)")
+    print(f"   Footage: {summary['video_seconds']:.0f}s processed in {summary['elapsed_s']:.1f}s ({speedup:.1f}x real time)")
+    print(f"   Frames read: {summary['frames_read']}, analysed: {summary['frames_sampled']}")
+    print(f"   Faces detected: {summary['faces']}, encoded: {summary['encoded']}")
+    print(f"   Events: {len(summary['events'])}, recorded: {summary['recorded']}"
+          + (" (dry run)" if args.dry_run else ""))
+
+
+if __name__ == "__main__":
+    main()
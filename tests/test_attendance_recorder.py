@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test the write-behind AttendanceRecorder with an in-memory writer (no database)
+"""
+import sys
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.attendance_events import AttendanceEvent, AttendanceDeduplicator
+from app.services.attendance_recorder import AttendanceRecorder
+from app.services.attendance_state import AttendanceDayState
+from app.services.attendance_journal import AttendanceJournal
+from app.services.circuit_breaker import CircuitBreaker
+
+
+class FakeWriter:
+    """Records batches; optionally slow or failing"""
+
+    def __init__(self, delay=0.0, fail=False, existing=()):
+        self.delay = delay
+        self.fail = fail
+        self.existing = set(existing)
+        self.batches = []
+
+    def __call__(self, events):
+        time.sleep(self.delay)
+        if self.fail:
+            return None
+        self.batches.append(list(events))
+        return [e for e in events if e.student_pk not in self.existing]
+
+
+def _event(student_pk, when=None):
+    return AttendanceEvent(student_pk=student_pk, timestamp=when or datetime.now())
+
+
+def test_events_are_batched_and_deduplicated():
+    writer = FakeWriter()
+    recorded = []
+    recorder = AttendanceRecorder(flush_interval_ms=50, writer=writer, on_recorded=recorded.append)
+    recorder.start()
+    for student_pk in [1, 2, 3, 1, 2, 3, 4]:
+        recorder.submit(_event(student_pk))
+    assert recorder.flush(timeout=2.0)
+    recorder.stop()
+
+    assert sorted(e.student_pk for e in recorded) == [1, 2, 3, 4]
+    assert len(writer.batches) == 1
+    assert recorder.get_stats()['duplicates'] == 3
+
+
+def test_next_day_is_a_new_event():
+    recorder = AttendanceRecorder(writer=FakeWriter())
+    today = datetime.now()
+    assert recorder.submit(_event(1, today))
+    assert not recorder.submit(_event(1, today))
+    assert recorder.submit(_event(1, today + timedelta(days=1)))
+
+
+def test_dedup_drops_earlier_days():
+    dedup = AttendanceDeduplicator()
+    today = datetime.now()
+    for student_pk in range(50):
+        assert dedup.offer(_event(student_pk, today))
+    assert len(dedup) == 50
+    assert dedup.offer(_event(1, today + timedelta(days=1)))  # Rollover: yesterday's keys go
+    assert len(dedup) == 1
+    assert not dedup.offer(_event(1, today + timedelta(days=1)))
+    dedup.offer(_event(2, today + timedelta(days=2)))
+    assert dedup.prune((today + timedelta(days=3)).date()) == 1 and len(dedup) == 0
+
+
+def test_submit_does_not_wait_for_slow_database():
+    writer = FakeWriter(delay=0.5)
+    recorder = AttendanceRecorder(flush_interval_ms=10, writer=writer)
+    recorder.start()
+    recorder.submit(_event(1))
+    time.sleep(0.05)  # Writer is now busy with the first batch
+    started = time.perf_counter()
+    for student_pk in range(2, 200):
+        recorder.submit(_event(student_pk))
+    elapsed = time.perf_counter() - started
+    recorder.stop()
+
+    assert elapsed < 0.1, f"submit blocked for {elapsed:.3f}s"
+    assert sum(len(b) for b in writer.batches) == 199
+
+
+def test_queued_event_can_be_cancelled():
+    writer = FakeWriter()
+    recorder = AttendanceRecorder(flush_interval_ms=5000, writer=writer)  # Not started: events stay queued
+    recorder.submit(_event(1))
+    recorder.submit(_event(2))
+    assert recorder.cancel(1)
+    assert not recorder.cancel(1)  # Nothing left to cancel
+    assert recorder.get_stats()["queued"] == 1
+    assert recorder.submit(_event(1))  # Can be detected again
+    recorder.start()
+    assert recorder.flush(timeout=2.0)
+    recorder.stop()
+    assert sorted(e.student_pk for e in writer.batches[0]) == [1, 2]
+    assert recorder.get_stats()["cancelled"] == 1
+
+
+def test_failed_batch_can_be_resubmitted():
+    errors = []
+    writer = FakeWriter(fail=True)
+    recorder = AttendanceRecorder(flush_interval_ms=10, writer=writer,
+                                  on_error=lambda batch, exc: errors.append(len(batch)))
+    recorder.start()
+    recorder.submit(_event(1))
+    recorder.flush(timeout=2.0)
+    assert errors == [1]
+
+    writer.fail = False
+    assert recorder.submit(_event(1))
+    recorder.flush(timeout=2.0)
+    recorder.stop()
+    assert recorder.get_stats()['written'] == 1
+
+
+def test_already_recorded_students_are_not_reported():
+    recorded = []
+    recorder = AttendanceRecorder(flush_interval_ms=10, writer=FakeWriter(existing={2}),
+                                  on_recorded=recorded.append)
+    recorder.start()
+    recorder.submit(_event(1))
+    recorder.submit(_event(2))
+    recorder.stop()
+    assert [e.student_pk for e in recorded] == [1]
+    assert recorder.get_stats()['already_recorded'] == 1
+
+
+def test_day_state_answers_from_memory_and_rolls_over():
+    days = [datetime(2026, 10, 16).date()]
+    loads = []
+
+    def loader(day):
+        loads.append(day)
+        return {1, 2} if day == days[0] else {7}
+
+    state = AttendanceDayState(loader=loader, today=lambda: days[-1])
+    assert state.load()
+    for _ in range(100):
+        assert state.is_marked(1)
+    assert not state.is_marked(3)
+    state.mark(3)
+    assert state.is_marked(3)
+    assert len(loads) == 1  # Repeat checks never hit the loader
+
+    days.append(datetime(2026, 10, 17).date())
+    assert not state.is_marked(1)  # Midnight: yesterday's marks are gone
+    deadline = time.time() + 2.0
+    while not state.loaded and time.time() < deadline:
+        time.sleep(0.01)
+    assert state.is_marked(7)
+    assert state.get_stats()['rollovers'] == 1
+
+
+def test_outage_is_journaled_and_replayed():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'journal.db')
+        writer = FakeWriter(fail=True)
+        recorded = []
+        recorder = AttendanceRecorder(flush_interval_ms=10, writer=writer, journal=AttendanceJournal(path),
+                                      on_recorded=recorded.append)
+        recorder.replay_interval = 0.05
+        recorder.start()
+        for student_pk in (1, 2, 3):
+            recorder.submit(_event(student_pk))
+        recorder.flush(timeout=2.0)
+        recorder.stop()
+        assert recorded == []
+        assert AttendanceJournal(path).pending_count() == 3  # Survives the process
+
+        # Next session: MySQL is back and the journal is replayed
+        writer = FakeWriter(existing={3})
+        recorder = AttendanceRecorder(flush_interval_ms=10, writer=writer, journal=AttendanceJournal(path),
+                                      on_recorded=recorded.append)
+        recorder.start()
+        time.sleep(0.1)
+        recorder.stop()
+        assert sorted(e.student_pk for e in recorded) == [1, 2]
+        assert recorder.get_stats()['journal_pending'] == 0
+
+
+def test_circuit_breaker_opens_and_probes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()  # Open: refuse without trying
+    time.sleep(0.06)
+    assert breaker.allow()      # Half-open: one probe
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+
+
+if __name__ == "__main__":
+    print("🧪 Testing write-behind AttendanceRecorder")
+    print("=" * 50)
+    for test in (test_events_are_batched_and_deduplicated, test_next_day_is_a_new_event, test_dedup_drops_earlier_days,
+                 test_submit_does_not_wait_for_slow_database, test_queued_event_can_be_cancelled,
+                 test_failed_batch_can_be_resubmitted,
+                 test_already_recorded_students_are_not_reported,
+                 test_day_state_answers_from_memory_and_rolls_over, test_outage_is_journaled_and_replayed,
+                 test_circuit_breaker_opens_and_probes):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
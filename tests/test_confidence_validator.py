@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test ConfidenceValidator's vectorized scoring against the per-pair loop it replaced, and its cost per face
+"""
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.face.confidence_validator import ConfidenceValidator
+
+GALLERY_SIZE = 500  # A school's enrolled photos
+BUDGET_MS = 1.0
+
+
+def _naive_consistency(history, encoding):
+    """The old per-pair loop: mean cosine similarity with each remembered encoding"""
+    if not history:
+        return 0.5
+    similarities = [
+        float(np.dot(encoding, prev) / (np.linalg.norm(encoding) * np.linalg.norm(prev)))
+        for prev in history
+    ]
+    return float(np.mean(similarities))
+
+
+def test_temporal_consistency_matches_naive_loop():
+    rng = np.random.default_rng(0)
+    validator = ConfidenceValidator(temporal_window=5)
+    history = []
+    # More updates than the window, so the ring matrix wraps around
+    for _ in range(12):
+        encoding = rng.normal(size=128)
+        expected = _naive_consistency(history, encoding)
+        assert abs(validator._calculate_temporal_consistency(encoding) - expected) < 1e-9
+        validator.update_temporal_history(encoding, 0.9)
+        history = (history + [encoding])[-5:]
+    assert len(validator.detection_history) == 5
+
+
+def test_advanced_confidence_is_under_a_millisecond():
+    rng = np.random.default_rng(1)
+    gallery = rng.normal(size=(GALLERY_SIZE, 128))
+    frame = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+    region = (200, 150, 150, 150)
+    validator = ConfidenceValidator()
+    for _ in range(validator.temporal_window):
+        validator.update_temporal_history(rng.normal(size=128), 0.9)
+
+    timings = []
+    for _ in range(200):
+        face = gallery[rng.integers(GALLERY_SIZE)] + rng.normal(scale=0.05, size=128)
+        started = time.perf_counter()
+        validator.calculate_advanced_confidence(face, gallery, region, frame)
+        timings.append((time.perf_counter() - started) * 1000)
+    median_ms = float(np.median(timings))
+    print(f"   calculate_advanced_confidence: {median_ms:.3f} ms/face ({GALLERY_SIZE}-face gallery)")
+    assert median_ms < BUDGET_MS, f"{median_ms:.3f} ms per face"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing ConfidenceValidator scoring")
+    print("=" * 50)
+    for test in (test_temporal_consistency_matches_naive_loop, test_advanced_confidence_is_under_a_millisecond):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
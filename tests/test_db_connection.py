@@ -52,6 +52,11 @@ def main():
     except Exception as e:
         print(f"   ❌ Attendance service error: {e}")
     
+    # Connection pool usage
+    stats = DataService.get_pool_stats()
+    print(f"\n4. Connection pool: {stats['open']}/{stats['size']} open, {stats['checkouts']} checkouts, "
+          f"{stats['created']} connects, avg wait {stats['wait_ms_avg']} ms, avg use {stats['use_ms_avg']} ms")
+    
     print("\n🎉 Database test completed!")
     print("If all tests passed, your app should work properly.")
     print("If any test failed, fix the database connection first.")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Test the ConnectionPool with fake connections (no database)
+"""
+import sys
+import os
+import threading
+import time
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from mysql.connector import errors
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.data_service import DataService
+from app.services.db_pool import ConnectionPool, PoolTimeout
+
+
+class FakeCursor:
+    """Counts server-side prepares (re-prepares for a new SQL object); streams conn.rows"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.executed = None
+        self.closed = False
+        self.remaining = []
+
+    def execute(self, sql, params=()):
+        if self.conn.fail_with is not None:
+            raise self.conn.fail_with
+        if sql is not self.executed:
+            self.conn.prepares += 1
+            self.executed = sql
+        self.remaining = list(self.conn.rows)
+        self.conn.unread_result = bool(self.remaining)
+
+    def fetchmany(self, size):
+        rows, self.remaining = self.remaining[:size], self.remaining[size:]
+        self.conn.fetched += len(rows)
+        self.conn.unread_result = bool(self.remaining)
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self.remaining))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    """Counts resets and closes; ping fails once marked dead"""
+
+    def __init__(self):
+        self.unread_result = False
+        self.in_transaction = False
+        self.autocommit = True
+        self.resets = 0
+        self.prepares = 0
+        self.rows = []
+        self.fetched = 0
+        self.fail_with = None
+        self.closed = False
+        self.dead = False
+
+    def cursor(self, prepared=False, dictionary=False, buffered=None):
+        return FakeCursor(self)
+
+    def consume_results(self):
+        self.unread_result = False
+
+    def reset_session(self):
+        self.resets += 1
+
+    def ping(self, reconnect=False):
+        if self.dead:
+            raise errors.InterfaceError("gone")
+
+    def close(self):
+        self.closed = True
+
+
+def _pool(size=2, timeout=0.2, health_check_seconds=30):
+    created = []
+
+    def factory():
+        created.append(FakeConnection())
+        return created[-1]
+
+    return ConnectionPool(factory, size=size, timeout=timeout, health_check_seconds=health_check_seconds), created
+
+
+def test_connections_are_reused_and_reset():
+    pool, created = _pool()
+    for _ in range(10):
+        conn = pool.acquire()
+        conn.close()
+        conn.close()  # Closing twice is harmless
+    assert len(created) == 1
+    assert created[0].resets == 0  # Session untouched: no reset needed
+    assert not created[0].closed
+    stats = pool.get_stats()
+    assert stats["checkouts"] == 10 and stats["created"] == 1 and stats["idle"] == 1
+
+    conn = pool.acquire()
+    conn.autocommit = False
+    conn.close()
+    assert created[0].resets == 1
+
+
+def test_prepared_statements_are_cached_per_connection():
+    pool, created = _pool(size=1)
+    pool.statement_cache_size = 2
+    for _ in range(5):
+        with pool.connection() as conn:
+            # A fresh str each time, as callers building SQL would pass
+            conn.prepared_cursor("".join(["SELECT 1"])).execute(())
+    assert created[0].prepares == 1
+
+    with pool.connection() as conn:
+        first = conn.prepared_cursor("SELECT 1")
+        conn.prepared_cursor("SELECT 2")
+        conn.prepared_cursor("SELECT 3")  # Evicts SELECT 1 (least recently used)
+    assert first.cursor.closed
+    stats = pool.get_stats()
+    assert stats["statements_prepared"] == 3 and stats["statements_evicted"] == 1
+    assert stats["statement_cache_hits"] == 5
+
+    with pool.connection() as conn:
+        cached = conn.prepared_cursor("SELECT 3")
+        conn.autocommit = False  # Session reset on return drops the server's statements
+    assert cached.cursor.closed
+
+
+def test_returned_connection_cannot_be_used():
+    pool, _ = _pool()
+    conn = pool.acquire()
+    conn.close()
+    try:
+        conn.cursor()
+    except errors.InterfaceError:
+        return
+    raise AssertionError("use after close was allowed")
+
+
+def test_waits_for_a_free_connection_then_times_out():
+    pool, created = _pool(size=1, timeout=0.5)
+    held = pool.acquire()
+    threading.Timer(0.05, held.close).start()
+    with pool.connection() as conn:  # Waits for the timer to release it
+        assert conn.raw is created[0]
+    assert pool.get_stats()["wait_ms_max"] >= 40
+
+    held = pool.acquire()
+    started = time.perf_counter()
+    try:
+        pool.acquire(timeout=0.05)
+        raise AssertionError("acquire did not time out")
+    except PoolTimeout:
+        assert time.perf_counter() - started < 0.5
+    held.close()
+    assert pool.get_stats()["timeouts"] == 1
+
+
+def test_broken_and_dead_connections_are_replaced():
+    pool, created = _pool(health_check_seconds=0)
+    try:
+        with pool.connection():
+            raise errors.OperationalError("lost connection")
+    except errors.OperationalError:
+        pass
+    assert created[0].closed  # Discarded instead of returned
+
+    conn = pool.acquire()
+    conn.close()
+    created[1].dead = True
+    conn = pool.acquire()  # Health check fails, a new connection is opened
+    assert conn.raw is created[2]
+    conn.close()
+    stats = pool.get_stats()
+    assert stats["discarded"] == 2 and stats["health_check_failures"] == 1 and stats["open"] == 1
+
+
+def test_stream_fetches_in_batches_and_releases_connection():
+    pool, created = _pool(size=1)
+    original_pool = DataService.pool
+    DataService.pool = staticmethod(lambda: pool)
+    try:
+        pool.acquire().close()
+        created[0].rows = [{"id": i} for i in range(10)]
+
+        batches = list(DataService.stream("SELECT id FROM students", batch_size=4, batches=True))
+        assert [len(b) for b in batches] == [4, 4, 2]
+        assert pool.get_stats()["idle"] == 1  # Released once exhausted
+
+        rows = DataService.stream("SELECT id FROM students", batch_size=4)
+        assert next(rows) == {"id": 0}
+        assert pool.get_stats()["idle"] == 0  # Held while streaming
+        rows.close()  # Stopping early closes the connection instead of draining it
+        stats = pool.get_stats()
+        assert stats["idle"] == 0 and stats["open"] == 0 and stats["discarded"] == 1
+        assert created[0].closed
+        assert created[0].fetched == 14  # Only one batch read on the early stop
+    finally:
+        DataService.pool = original_pool
+
+
+def test_query_errors_return_the_connection():
+    pool, created = _pool(size=1)
+    original_pool = DataService.pool
+    DataService.pool = staticmethod(lambda: pool)
+    try:
+        pool.acquire().close()
+        created[0].fail_with = TypeError("not all arguments converted")
+        for prepared in (False, True, False):
+            try:
+                DataService.execute_query("SELECT %s", ("a", "b"), prepared=prepared)
+                raise AssertionError("error was swallowed")
+            except TypeError:
+                pass
+        stats = pool.get_stats()
+        assert stats["idle"] == 1 and stats["open"] == 1  # Slot not leaked
+
+        created[0].fail_with = None
+        created[0].rows = [{"id": 1}]
+        assert DataService.execute_query("SELECT id FROM students") == [{"id": 1}]
+    finally:
+        DataService.pool = original_pool
+
+
+def test_lost_connections_open_the_breaker():
+    pool, created = _pool(size=2)
+    pool.breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    for _ in range(2):  # Queries failing on already-open connections
+        try:
+            with pool.connection():
+                raise errors.OperationalError("Lost connection to MySQL server during query")
+        except errors.OperationalError:
+            pass
+    started = time.perf_counter()
+    try:
+        pool.acquire()
+        raise AssertionError("acquire allowed while the breaker is open")
+    except errors.PoolError:
+        assert time.perf_counter() - started < 0.05  # Refused without waiting
+
+    time.sleep(0.06)
+    with pool.connection():  # Half-open probe; a healthy return closes the breaker
+        pass
+    assert pool.breaker.state == "closed"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing database ConnectionPool")
+    print("=" * 50)
+    for test in (test_connections_are_reused_and_reset, test_prepared_statements_are_cached_per_connection,
+                 test_returned_connection_cannot_be_used,
+                 test_waits_for_a_free_connection_then_times_out, test_broken_and_dead_connections_are_replaced,
+                 test_stream_fetches_in_batches_and_releases_connection, test_query_errors_return_the_connection,
+                 test_lost_connections_open_the_breaker):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test the gallery-skipping caches in match_cache.py with small synthetic galleries
+"""
+import sys
+import os
+
+import numpy as np
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.face.match_cache import HotGallery, TrackIdentityCache, UnknownFaceCache, match_margin
+
+
+def euclidean(gallery, embedding):
+    return np.linalg.norm(np.asarray(gallery) - embedding, axis=1)
+
+
+def _gallery():
+    """Students A and B near each other, C far away; two rows each"""
+    gallery = np.array([
+        [0.00, 0.0], [0.02, 0.0],   # A
+        [0.30, 0.0], [0.32, 0.0],   # B
+        [5.00, 5.0], [5.02, 5.0],   # C
+    ])
+    ids = np.array(["A", "A", "B", "B", "C", "C"], dtype=object)
+    return gallery, ids
+
+
+def test_match_margin():
+    distances = np.array([0.1, 0.2, 0.5, 0.4])
+    ids = np.array(["A", "A", "B", "C"], dtype=object)
+    assert abs(match_margin(distances, ids, 0) - 0.3) < 1e-9
+    assert match_margin(distances[:2], ids[:2], 0) == float("inf")  # No other student
+
+
+def test_hot_probe_accepts_clear_match():
+    gallery, ids = _gallery()
+    hot = HotGallery(accept_ratio=0.8, min_margin=0.05)
+    assert hot.probe(np.array([0.0, 0.0]), gallery, euclidean, threshold=0.5) is None  # Empty: miss
+    hot.touch("A", ids, gallery, euclidean)
+    index, distance, margin = hot.probe(np.array([0.01, 0.0]), gallery, euclidean, threshold=0.5)
+    assert ids[index] == "A" and distance < 0.02
+    assert margin > 0.2  # Measured against B's rows, found as rivals
+
+
+def test_lone_hot_student_does_not_hide_a_closer_one():
+    gallery, ids = _gallery()
+    hot = HotGallery(accept_ratio=0.8, min_margin=0.05, rival_rows=2)
+    hot.touch("A", ids, gallery, euclidean)
+    # Within 0.8 x threshold of A, but B (not hot) is closer
+    assert hot.probe(np.array([0.25, 0.0]), gallery, euclidean, threshold=0.5) is None
+    # Between A and B: too close to call
+    assert hot.probe(np.array([0.15, 0.0]), gallery, euclidean, threshold=0.5) is None
+    stats = hot.get_stats()
+    assert stats["hits"] == 0 and stats["ambiguous"] == 1
+
+
+def test_hot_probe_rejects_far_faces():
+    gallery, ids = _gallery()
+    hot = HotGallery(accept_ratio=0.8)
+    hot.touch("C", ids, gallery, euclidean)
+    assert hot.probe(np.array([5.45, 5.0]), gallery, euclidean, threshold=0.5) is None  # 0.43 > 0.4
+
+
+def test_cross_check_disagreement_evicts_student():
+    gallery, ids = _gallery()
+    hot = HotGallery(min_margin=0.05, cross_check_every=2)
+    hot.touch("C", ids, gallery, euclidean)
+    face = np.array([5.01, 5.0])
+    assert hot.probe(face, gallery, euclidean, threshold=0.5) is not None
+    assert not hot.cross_check_due()
+    assert hot.probe(face, gallery, euclidean, threshold=0.5) is not None
+    assert hot.cross_check_due()  # Second hit: the caller runs the full gallery
+    hot.record_cross_check("C", agreed=False)
+    assert hot.probe(face, gallery, euclidean, threshold=0.5) is None
+    assert hot.get_stats()["students"] == 0 and hot.get_stats()["cross_check_failures"] == 1
+
+
+def test_hot_set_is_lru_bounded():
+    gallery, ids = _gallery()
+    hot = HotGallery(capacity=2)
+    for student_id in ("A", "B", "C"):
+        hot.touch(student_id, ids, gallery, euclidean)
+    assert hot.get_stats()["students"] == 2
+    # A was evicted: a face on A is now closest to a rival row, so it is a miss
+    assert hot.probe(np.array([0.0, 0.0]), gallery, euclidean, threshold=0.5) is None
+
+
+def _confirm(cache, key=("cam0", 1), margin=0.2, embedding=(0.0, 0.0), now=0.0):
+    return cache.confirm(key, 0, "A", {"id": 1}, 0.1, 0.9, margin, np.array(embedding), now=now)
+
+
+def test_track_identity_is_reused_until_reverification():
+    cache = TrackIdentityCache(reverify_seconds=3.0, drift_threshold=0.3, min_margin=0.08)
+    assert _confirm(cache, now=100.0)
+    face = np.array([0.05, 0.0])
+    assert cache.lookup(("cam0", 1), face, euclidean, now=101.0).student_id == "A"
+    assert cache.lookup(("cam0", 2), face, euclidean, now=101.0) is None  # Other track
+    # Stale: the caller must run the full gallery and confirm again
+    assert cache.lookup(("cam0", 1), face, euclidean, now=103.0) is None
+    assert _confirm(cache, now=103.0)
+    assert cache.lookup(("cam0", 1), face, euclidean, now=104.0) is not None
+    stats = cache.get_stats()
+    assert stats["hits"] == 2 and stats["reverifications"] == 1
+
+
+def test_track_identity_drift_invalidates():
+    cache = TrackIdentityCache(drift_threshold=0.3)
+    _confirm(cache, now=0.0)
+    # Another face on the same track (e.g. a track switch)
+    assert cache.lookup(("cam0", 1), np.array([0.5, 0.0]), euclidean, now=1.0) is None
+    assert cache.lookup(("cam0", 1), np.array([0.0, 0.0]), euclidean, now=1.0) is None  # Entry gone
+    assert cache.get_stats()["drift_invalidations"] == 1
+
+
+def test_track_identity_refuses_small_margins():
+    cache = TrackIdentityCache(min_margin=0.08)
+    assert not _confirm(cache, margin=0.079)
+    assert cache.lookup(("cam0", 1), np.array([0.0, 0.0]), euclidean, now=0.0) is None
+    assert _confirm(cache, margin=0.08)
+    # A later ambiguous confirmation drops the cached identity
+    assert not _confirm(cache, margin=0.01, now=1.0)
+    assert cache.lookup(("cam0", 1), np.array([0.0, 0.0]), euclidean, now=1.0) is None
+
+
+def _unknown_cache():
+    return UnknownFaceCache(unknown_threshold=0.6, ttl_seconds=10.0, min_frames=2, drift_threshold=0.3)
+
+
+def test_unknown_face_is_cached_after_min_frames():
+    cache = _unknown_cache()
+    key, face = ("cam0", 7), np.array([1.0, 1.0])
+    cache.observe(key, face, 0.9, now=0.0)
+    assert cache.lookup(key, face, euclidean, now=0.5) is None  # One frame is not enough
+    cache.observe(key, face, 0.8, now=1.0)
+    assert cache.lookup(key, face, euclidean, now=1.5) == 0.8  # Closest distance seen
+    assert cache.get_stats()["tracks"] == 1 and cache.get_stats()["hits"] == 1
+
+
+def test_unknown_face_expires_after_ttl():
+    cache = _unknown_cache()
+    key, face = ("cam0", 7), np.array([1.0, 1.0])
+    cache.observe(key, face, 0.9, now=0.0)
+    cache.observe(key, face, 0.9, now=1.0)
+    assert cache.lookup(key, face, euclidean, now=10.9) is not None
+    assert cache.lookup(key, face, euclidean, now=11.0) is None  # Searched again
+    assert cache.lookup(key, face, euclidean, now=11.1) is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_unknown_face_drift_invalidates():
+    cache = _unknown_cache()
+    key, face = ("cam0", 7), np.array([1.0, 1.0])
+    cache.observe(key, face, 0.9, now=0.0)
+    cache.observe(key, face, 0.9, now=1.0)
+    # An enrolled student stepping into the same track must not stay hidden
+    assert cache.lookup(key, np.array([1.5, 1.0]), euclidean, now=2.0) is None
+    assert cache.lookup(key, face, euclidean, now=2.0) is None
+    assert cache.get_stats()["drift_invalidations"] == 1
+
+
+def test_ambiguous_distance_clears_unknown_entry():
+    cache = _unknown_cache()
+    key, face = ("cam0", 7), np.array([1.0, 1.0])
+    cache.observe(key, face, 0.9, now=0.0)
+    cache.observe(key, face, 0.55, now=1.0)  # Close to someone: keep searching
+    cache.observe(key, face, 0.9, now=2.0)   # Streak starts over
+    assert cache.lookup(key, face, euclidean, now=2.5) is None
+    cache.observe(key, face, 0.9, now=3.0)
+    assert cache.lookup(key, face, euclidean, now=3.5) is not None
+    cache.observe(key, face, 0.5, now=4.0)  # Cached entry is cleared as well
+    assert cache.lookup(key, face, euclidean, now=4.5) is None
+
+
+if __name__ == "__main__":
+    print("🧪 Testing match caches")
+    print("=" * 50)
+    for test in (test_match_margin, test_hot_probe_accepts_clear_match,
+                 test_lone_hot_student_does_not_hide_a_closer_one, test_hot_probe_rejects_far_faces,
+                 test_cross_check_disagreement_evicts_student, test_hot_set_is_lru_bounded,
+                 test_track_identity_is_reused_until_reverification, test_track_identity_drift_invalidates,
+                 test_track_identity_refuses_small_margins, test_unknown_face_is_cached_after_min_frames,
+                 test_unknown_face_expires_after_ttl, test_unknown_face_drift_invalidates,
+                 test_ambiguous_distance_clears_unknown_entry):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
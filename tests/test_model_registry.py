@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test ModelRegistry's per-thread caches: invalidation and warm-up reach every thread
+"""
+import sys
+import os
+import threading
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.face.model_registry import ModelRegistry, FRONTAL_FACE
+
+
+def _in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_models_are_cached_per_thread():
+    get = lambda: ModelRegistry.get_dnn("test-per-thread", object)
+    model = get()
+    assert get() is model
+    assert _in_thread(get) is not model  # Each thread builds its own copy
+
+
+def test_invalidation_reaches_other_threads():
+    key = ("lbph", "test-model.yml")
+    loads = []
+    worker_ready, invalidated, done = threading.Event(), threading.Event(), threading.Event()
+    seen = []
+
+    def load():
+        loads.append(threading.current_thread().name)
+        return object()
+
+    def worker():
+        seen.append(ModelRegistry._cached(key, load))
+        worker_ready.set()
+        invalidated.wait(1.0)
+        seen.append(ModelRegistry._cached(key, load))
+        done.set()
+
+    threading.Thread(target=worker, name="camera").start()
+    worker_ready.wait(1.0)
+    ModelRegistry.invalidate_lbph("test-model.yml")  # e.g. retraining on the Tk thread
+    invalidated.set()
+    done.wait(1.0)
+    assert seen[0] is not seen[1]  # The camera thread reloaded the retrained model
+    assert loads == ["camera", "camera"]
+
+
+def test_warm_up_thread_preloads_warmed_cascades():
+    ModelRegistry.warm_up(cascades=(FRONTAL_FACE,), dlib_models=False)
+    before = ModelRegistry.get_stats()["cascade_loads"]
+    _in_thread(ModelRegistry.warm_up_thread)
+    assert ModelRegistry.get_stats()["cascade_loads"] == before + 1
+
+
+if __name__ == "__main__":
+    print("🧪 Testing ModelRegistry")
+    print("=" * 50)
+    for test in (test_models_are_cached_per_thread, test_invalidation_reaches_other_threads,
+                 test_warm_up_thread_preloads_warmed_cascades):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test the bounded, time-windowed MultiFrameValidator (incremental statistics and flat memory)
+"""
+import sys
+import os
+import tracemalloc
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+from app.services.face.confidence_validator import MultiFrameValidator
+
+
+def _detection(student_id, confidence):
+    return {'student_id': student_id, 'confidence': confidence, 'face_region': (0, 0, 100, 100)}
+
+
+def test_running_stats_match_numpy():
+    validator = MultiFrameValidator(required_frames=3, max_samples=10, window_seconds=5.0)
+    rng = np.random.default_rng(0)
+    confidences = rng.uniform(0.5, 1.0, 40)
+    timestamps = np.cumsum(rng.uniform(0.1, 0.6, 40))
+    for frame_id, (ts, conf) in enumerate(zip(timestamps, confidences)):
+        validator.add_detection(frame_id, _detection('s1', conf), timestamp=ts)
+
+    # Expected window: last 10 samples, minus anything older than 5 seconds
+    now = timestamps[-1]
+    kept = [c for t, c in list(zip(timestamps, confidences))[-10:] if t >= now - 5.0]
+    window = validator._windows['s1']
+    assert window.count == len(kept)
+    assert abs(window.mean - np.mean(kept)) < 1e-9
+    assert abs(window.std - np.std(kept)) < 1e-9
+
+
+def test_validation_and_expiry():
+    validator = MultiFrameValidator(required_frames=3, confidence_threshold=0.7, window_seconds=2.0)
+    for i in range(3):
+        validator.add_detection(i, _detection('s1', 0.9), timestamp=float(i) * 0.5)
+    assert validator.validate_student('s1', now=1.0)
+    assert 's1' in validator.get_validated_detections(now=1.0)
+
+    # Two seconds later the detections have left the window and the student is forgotten
+    assert not validator.validate_student('s1', now=10.0)
+    assert validator.get_stats()['students'] == 0
+
+
+def test_low_confidence_is_rejected():
+    validator = MultiFrameValidator(required_frames=3, confidence_threshold=0.7)
+    for i in range(5):
+        validator.add_detection(i, _detection('s2', 0.4), timestamp=float(i))
+    assert not validator.validate_student('s2', now=4.0)
+
+
+def test_soak_memory_is_flat():
+    """Simulate a long session: 50 students seen over and over at 10 detections/s"""
+    validator = MultiFrameValidator(required_frames=3, max_samples=30, window_seconds=10.0)
+    students = [f"student_{i}" for i in range(50)]
+
+    def run(start, count):
+        for n in range(start, start + count):
+            ts = n * 0.1
+            validator.add_detection(n, _detection(students[n % len(students)], 0.8), timestamp=ts)
+            if n % 100 == 0:
+                validator.get_validated_detections(now=ts)
+
+    tracemalloc.start()
+    run(0, 20000)
+    warm, _ = tracemalloc.get_traced_memory()
+    run(20000, 200000)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert validator.get_stats()['buffered_detections'] <= 50 * 30
+    # Ten times more detections must not grow memory noticeably
+    assert after - warm < 64 * 1024, f"memory grew by {after - warm} bytes"
+
+
+if __name__ == "__main__":
+    print("🧪 Testing MultiFrameValidator windows and memory")
+    print("=" * 50)
+    for test in (test_running_stats_match_numpy, test_validation_and_expiry,
+                 test_low_confidence_is_rejected, test_soak_memory_is_flat):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError as e:
+            print(f"❌ FAIL | {test.__name__} {e}")
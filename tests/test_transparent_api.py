@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test that the transparent-API (cv2.UMat) accelerator matches the plain NumPy path
+"""
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import cv2
+import numpy as np
+from app.services.face.gpu_acceleration import TransparentAccelerator
+
+# OpenCL kernels may round differently from the CPU code by one gray level
+TOLERANCE = 1
+
+
+def _frame(seed=0):
+    rng = np.random.default_rng(seed)
+    # Smooth gradients plus noise, so CLAHE and resize interpolation have work to do
+    y, x = np.mgrid[0:240, 0:320]
+    base = ((x + y) / 560 * 255).astype(np.uint8)
+    frame = np.dstack([base, np.flipud(base), np.fliplr(base)])
+    return np.clip(frame + rng.integers(0, 20, frame.shape), 0, 255).astype(np.uint8)
+
+
+def _max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+
+def test_umat_matches_numpy():
+    umat, plain = TransparentAccelerator("umat"), TransparentAccelerator("numpy")
+    frame = _frame()
+
+    assert _max_diff(umat.resize(frame, 0.5), plain.resize(frame, 0.5)) <= TOLERANCE
+    assert _max_diff(umat.cvt_color(frame, cv2.COLOR_BGR2GRAY), plain.cvt_color(frame, cv2.COLOR_BGR2GRAY)) <= TOLERANCE
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    assert _max_diff(umat.clahe(gray), plain.clahe(gray)) <= TOLERANCE
+    assert _max_diff(umat.equalize_lightness(frame, 3.0), plain.equalize_lightness(frame, 3.0)) <= TOLERANCE
+    assert _max_diff(umat.downscale_to_rgb(frame, 0.5), plain.downscale_to_rgb(frame, 0.5)) <= TOLERANCE
+
+
+def test_numpy_path_matches_direct_opencv():
+    plain = TransparentAccelerator("numpy")
+    frame = _frame(1)
+    lab = cv2.cvtColor(frame, cv2.COLOR_BGR2LAB)
+    lab[:, :, 0] = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8)).apply(lab[:, :, 0])
+    expected = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    assert np.array_equal(plain.equalize_lightness(frame, 3.0), expected)
+
+    small = cv2.cvtColor(cv2.resize(frame, (0, 0), fx=0.5, fy=0.5), cv2.COLOR_BGR2RGB)
+    assert np.array_equal(plain.downscale_to_rgb(frame, 0.5), small)
+
+
+def test_outputs_are_ndarrays():
+    umat = TransparentAccelerator("umat")
+    frame = _frame()
+    assert isinstance(umat.resize(frame, 0.5), np.ndarray)
+    assert isinstance(umat.detect_faces(frame), list)
+
+
+def test_haar_detection_matches():
+    image_path = os.path.join(os.path.dirname(__file__), '..', 'app', 'data', 'images', 'students')
+    images = []
+    for root, _, files in os.walk(image_path):
+        images += [os.path.join(root, f) for f in sorted(files) if f.lower().endswith(('.jpg', '.png'))][:1]
+    frame = cv2.imread(images[0]) if images else _frame()
+
+    umat, plain = TransparentAccelerator("umat"), TransparentAccelerator("numpy")
+    assert umat.detect_faces(frame) == plain.detect_faces(frame)
+
+
+def test_numpy_mode_leaves_opencl_switch_alone():
+    for initial in (False, True):
+        cv2.ocl.setUseOpenCL(initial)
+        TransparentAccelerator("numpy")
+        assert cv2.ocl.useOpenCL() == (initial and cv2.ocl.haveOpenCL())
+
+
+if __name__ == "__main__":
+    print("🧪 Testing transparent-API (UMat) accelerator against the NumPy path")
+    print("=" * 50)
+    for test in (test_umat_matches_numpy, test_numpy_path_matches_direct_opencv,
+                 test_outputs_are_ndarrays, test_haar_detection_matches,
+                 test_numpy_mode_leaves_opencl_switch_alone):
+        try:
+            test()
+            print(f"✅ PASS | {test.__name__}")
+        except AssertionError:
+            print(f"❌ FAIL | {test.__name__}")